@@ -1,45 +1,47 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import os
 import re
-import plotly.graph_objects as go
-import matplotlib.colors as mcolors  
-
-def rgba_with_opacity(color, alpha=0.15):
-    try:
-        # Convert to rgba using matplotlib
-        rgba = mcolors.to_rgba(color, alpha=alpha)
-        return f"rgba({int(rgba[0]*255)}, {int(rgba[1]*255)}, {int(rgba[2]*255)}, {rgba[3]})"
-    except:
-        # Fallback for any color conversion issues
-        return f"rgba(128, 128, 128, {alpha})"
+import threading
+import time
+from analytics import (
+    MIN_CORRELATION_PAIRS, backtest_forecasts, build_coverage, build_pillar_matrices, build_score_indexes,
+    compute_metric_distributions, correlation_matrices, forecast_trends, format_percentile, get_metric_value, has_data,
+    institutions_with_data, metric_columns, metric_label, panel_slice, percentile_column, position_of, simulate_ranks,
+    strongest_pairs, value_for_position, value_for_published_rank
+)
+from bounded_cache import DEFAULT_CACHE, cache_stats, cached
+from color_registry import assign_colors
+from charts import (
+    build_line_chart, correlation_heatmap, correlation_scatter, cross_agency_figure, gender_bar_figure,
+    rank_band_figure, rank_line_figure
+)
+from dataset import DatasetStore
+from exports import EXPORT_FORMATS, export_bytes
+from query_backend import open_backend
+from tenants import TENANT_FILE
+from name_search import NameIndex
+from render_pipeline import RENDER_WORKERS, FigurePipeline, configure_plotly_json, summarize
+from peer_groups import PeerGroups
+from metric_registry import CHART_METRICS, KPI_METRICS, OVERALL_SCORE_COLUMNS, PILLAR_WEIGHTS, RANK_COLUMNS
 
 st.set_page_config(page_title="University Dashboard", layout="wide")
 st.title("🏛️ University Rankings Dashboard")
 
-@st.cache_data
-def load_data():
-    times_df = pd.read_excel("TIMES.xlsx", sheet_name="Sheet1")
-    qs_df = pd.read_excel("QS.xlsx", sheet_name="Sheet1")
-    usn_df = pd.read_excel("USN.xlsx", sheet_name="Sheet1")
-    washington_df = pd.read_excel("Washington.xlsx", sheet_name="Sheet1")
-    return times_df, qs_df, usn_df, washington_df
-
-@st.cache_data
-def load_peer_groups():
-    try:
-        peer_df = pd.read_csv("peer.csv")
-        return peer_df
-    except FileNotFoundError:
-        st.error("❌ File not found.")
-        return pd.DataFrame(columns=['PEER_TYPE', 'PEER_NAME'])
-
-@st.cache_data
-def get_common_universities(times_df, qs_df, usn_df, washington_df):
-    return set(times_df["IPEDS_Name"]) & set(qs_df["IPEDS_Name"]) & set(usn_df["IPEDS_Name"]) & set(washington_df["IPEDS_Name"])
-
-@st.cache_data
-def get_filtered_combined_df(_combined_df, common_universities, nj_filter):
+DATA_POLL_SECONDS = 5  # how often the watcher checks the workbooks and peer.csv
+# "pandas" filters the in-memory tables; "sqlite" queries one indexed file shared by all workers
+QUERY_BACKEND = os.environ.get("RANKING_QUERY_BACKEND", "pandas")
+# st.plotly_chart encodes figures with plotly.io's engine (render_pipeline.py, RANKING_PLOTLY_JSON)
+configure_plotly_json()
+
+# Derived results live in one byte-budgeted LRU cache (bounded_cache.py, RANKING_CACHE_MB).
+# Every derived cache below takes the dataset version, so a reload never serves stale entries
+@cached
+def get_common_universities(_times_df, _qs_df, _usn_df, _washington_df, data_version):
+    return set(_times_df["IPEDS_Name"]) & set(_qs_df["IPEDS_Name"]) & set(_usn_df["IPEDS_Name"]) & set(_washington_df["IPEDS_Name"])
+
+@cached
+def get_filtered_combined_df(_combined_df, data_version, common_universities, nj_filter):
     combined_common_df = _combined_df[_combined_df["IPEDS_Name"].isin(common_universities)]
     if nj_filter == "Yes":
         combined_common_df = combined_common_df[combined_common_df["New_Jersey_University"] == "Yes"]
@@ -47,97 +49,276 @@ def get_filtered_combined_df(_combined_df, common_universities, nj_filter):
         combined_common_df = combined_common_df[combined_common_df["New_Jersey_University"] == "No"]
     return combined_common_df
 
-def get_peer_type(university_name, peer_df):
-    match = peer_df[peer_df['PEER_NAME'] == university_name]
-    return match['PEER_TYPE'].iloc[0] if not match.empty else None
-
-def create_color_map(universities_list):
+@cached
+def get_metric_distributions(_df, agency, data_version):
+    # Summary stats for the whole agency table, computed once per agency
+    return compute_metric_distributions(_df)
+
+@cached
+def get_forecasts(_df, agency, data_version):
+    # Next-year projections for every institution, one batched fit per metric
+    forecasts = forecast_trends(_df, CHART_METRICS[agency])
+    forecasts.update(forecast_trends(_df, [RANK_COLUMNS[agency]], clip_min=1))
+    return forecasts
+
+@cached
+def get_forecast_backtest(_df, agency, data_version):
+    return backtest_forecasts(_df, [RANK_COLUMNS[agency]], clip_min=1)
+
+@cached
+def get_coverage(_df, agency, data_version):
+    # Which (institution, metric, year) cells hold a value, so rendering never scans for gaps
+    return build_coverage(_df, metric_columns(_df))
+
+@cached
+def get_pillar_matrices(_df, agency, data_version):
+    # One (institutions x pillars) matrix per year for the what-if simulator
+    return build_pillar_matrices(_df, list(PILLAR_WEIGHTS[agency]))
+
+@cached
+def get_score_indexes(_df, agency, data_version):
+    # Sorted per-(year, metric) scores for the gap-to-target panel
+    metrics = [OVERALL_SCORE_COLUMNS[agency]] + list(PILLAR_WEIGHTS[agency])
+    return build_score_indexes(_df, metrics, RANK_COLUMNS[agency])
+
+@cached
+def get_correlations(_panel, data_version):
+    # Pearson and Spearman matrices of every pair of metrics, per year, over all institutions
+    return correlation_matrices(_panel.metrics)
+
+def create_color_map(universities_list, focal_name, registry=None):
     """Create consistent color map where each university always gets the same color"""
-    # Fixed color assignment based on university name - using HEX colors only
-    university_color_mapping = {
-        NJIT_NAME: "#E10600",  # NJIT - Red
-        # Benchmark Peers
-        "Clarkson University": "#FF7F0E",  # Orange
-        "Colorado School of Mines": "#2CA02C",  # Green
-        "Florida Institute of Technology": "#D62728",  # Red
-        "Illinois Institute of Technology": "#9467BD",  # Purple
-        "Michigan Technological University": "#8C564B",  # Brown
-        "Missouri University of Science and Technology": "#E377C2",  # Pink
-        "Rensselaer Polytechnic Institute": "#7F7F7F",  # Gray
-        "Stevens Institute of Technology": "#BCBD22",  # Yellow-Green
-        "Worcester Polytechnic Institute": "#17BECF",  # Cyan
-        # Aspirational Peers
-        "California Institute of Technology": "#FF9896",  # Light Red
-        "Carnegie Mellon University": "#98DF8A",  # Light Green
-        "Georgia Institute of Technology-Main Campus": "#FFBB78",  # Light Orange
-        "Massachusetts Institute of Technology": "#C5B0D5",  # Light Purple
-        # NJ Peers
-        "Montclair State University": "#C49C94",  # Tan
-        "Rowan University": "#F7B6D2",  # Light Pink
-        "Rutgers University-New Brunswick": "#1F77B4",  # Blue
-        "Rutgers University-Newark": "#C7C7C7",  # Light Gray
-        "Seton Hall University": "#DBDB8D"  # Light Yellow
-    }
-    
-    color_map = {}
-    for uni in universities_list:
-        if uni in university_color_mapping:
-            color_map[uni] = university_color_mapping[uni]
-        else:
-            fallback_colors = [
-                "#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
-                "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf",
-                "#aec7e8", "#ffbb78", "#98df8a", "#ff9896", "#c5b0d5",
-                "#c49c94", "#f7b6d2", "#c7c7c7", "#dbdb8d", "#9edae5"
-            ]
-            color_map[uni] = fallback_colors[hash(uni) % len(fallback_colors)]
-    
-    return color_map
+    # Same colors in every worker and after restarts (color_registry.py), so equal views share cached figures
+    return assign_colors(dataset.colors if registry is None else registry, universities_list, focal_name)
+
+def warm_dataset_caches(dataset):
+    """Build a new dataset version's derived indexes and preset views before it is swapped in"""
+    get_query_backend(dataset, dataset.version)
+    for agency, df in dataset.tables.items():
+        get_coverage(df, agency, dataset.version)
+        if agency in PILLAR_WEIGHTS:
+            get_pillar_matrices(df, agency, dataset.version)
+            get_score_indexes(df, agency, dataset.version)
+    get_correlations(dataset.panel, dataset.version)
+    prewarm_dataset_views(dataset)
+
+def apply_peer_group_changes(dataset, changes):
+    """Drop only the cached views built for the edited groups, then rewarm their presets"""
+    backend = get_query_backend(dataset, dataset.version)
+    backend.update_peer_groups(dataset.peer_groups)
+    for group_changes in changes.values():
+        for change in group_changes:
+            if change.before:
+                DEFAULT_CACHE.invalidate(change.before)
+    threading.Thread(
+        target=prewarm_peer_changes, args=(dataset, changes), name="peer-group-prewarmer", daemon=True
+    ).start()
+
+# The filter, KPI and series queries go through the backend of the dataset version
+@st.cache_resource(show_spinner=False, max_entries=2)  # current and previous version
+def get_query_backend(_dataset, data_version):
+    return open_backend(_dataset, QUERY_BACKEND)
+
+# Institution-name search index of the dataset version, with the tenants' short names as aliases
+@st.cache_resource(show_spinner=False, max_entries=2)  # current and previous version
+def get_name_index(_dataset, data_version):
+    names = set().union(*(set(df["IPEDS_Name"]) for df in _dataset.tables.values()))
+    return NameIndex(names, {tenant.focal: [tenant.short_name] for tenant in _dataset.tenants.values()})
+
+@st.cache_resource
+def get_dataset_store():
+    # Workbooks are parsed concurrently, keeping only the columns the dashboard uses
+    store = DatasetStore(".", on_reload=warm_dataset_caches, on_peer_change=apply_peer_group_changes)
+    store.watch(DATA_POLL_SECONDS)
+    return store
+
+# One dataset version per rerun: a reload swapped in mid-rerun shows up on the next rerun
+dataset_store = get_dataset_store()
+dataset = dataset_store.current()
+data_version = dataset.version
+times_df, qs_df, usn_df, washington_df = (dataset.tables[a] for a in ["TIMES", "QS", "USN", "Washington"])
+query_backend = get_query_backend(dataset, data_version)
+name_index = get_name_index(dataset, data_version)
+
+SEARCH_RESULTS = 20  # options sent to the browser per picker, besides the current selection
+
+def search_options(label, key, universe, pinned, container=st):
+    """The pinned names plus the search box's top matches in `universe` (its first names when empty)"""
+    query = container.text_input(
+        label, key=f"{key}_search", placeholder="Type a name, e.g. Rutgers Newark or NJIT"
+    )
+    if query.strip():
+        matches = name_index.search(query, allowed=set(universe), limit=SEARCH_RESULTS)
+    else:
+        matches = list(universe[:SEARCH_RESULTS])
+    return list(dict.fromkeys(pinned + matches))
+
+# --- Tenants: ?tenant=<key> picks the focal institution, default comparator and peer file ---
+# All tenants share the dataset; the view caches below are keyed and bounded per tenant
+VIEW_CACHE_ENTRIES = 200  # per cached view and tenant
+
+if "tenant" not in st.session_state:
+    st.session_state["tenant"] = st.query_params.get("tenant", dataset.default_tenant)
+if st.session_state["tenant"] not in dataset.tenants:
+    st.warning(f"Unknown tenant '{st.session_state['tenant']}' (see {TENANT_FILE}); showing the default view.")
+    st.session_state["tenant"] = dataset.default_tenant
+tenant = dataset.tenants[st.session_state["tenant"]]
+tenant_key = tenant.key
+
+peer_index = dataset.peer_groups[tenant.peer_file]
+if peer_index is None:
+    st.error("❌ File not found.")
+    peer_index = PeerGroups({})
+
+FOCAL_NAME = tenant.focal
+DEFAULT_COMPARATOR = tenant.comparator
+
+agency_frames = {"TIMES": times_df, "QS": qs_df, "USN": usn_df, "Washington": washington_df}
+
+# --- Deep links: the view state is mirrored in the URL query parameters ---
+NJ_FILTER_OPTIONS = ["All", "Yes", "No"]
+AGENCY_URL_KEYS = ["times", "qs", "usn", "washington"]
+SECTIONS = {
+    "times": ["📖 Teaching", "🔬 Research Performance", "🌍 Global Engagement & Gender", "🧪 What-If Weights", "🎯 Gap to Target"],
+    "qs": ["🎓 Research & Learning", "🌍 Global Engagement", "🧪 What-If Weights", "🎯 Gap to Target"],
+    "usn": ["🎓 Student Success", "👩‍🏫 Faculty & Financials", "🎯 Admissions & Selectivity", "🎓 Alumni Outcomes"],
+    "washington": ["📊 Social Mobility", "🔬 Research", "🤝 Service"]
+}
 
-times_df, qs_df, usn_df, washington_df = load_data()
-peer_groups_df = load_peer_groups()
+def section_slug(label):
+    # "🔬 Research Performance" -> "Research Performance"
+    return label.split(" ", 1)[-1]
+
+def read_view_state(query_params):
+    return {
+        "years": [int(y) for y in query_params.get_all("years") if y.isdigit()],
+        "nj": query_params.get("nj", "All"),
+        "forecast": query_params.get("forecast") == "1",
+        "peers": query_params.get_all("peers"),
+        "unis": query_params.get_all("unis"),
+        **{key: query_params.get_all(key) for key in AGENCY_URL_KEYS},
+        **{f"{key}_section": query_params.get(f"{key}_section") for key in AGENCY_URL_KEYS},
+        **{f"{key}_all": query_params.get(f"{key}_all") == "1" for key in AGENCY_URL_KEYS},
+    }
 
-for df in [times_df, qs_df, usn_df, washington_df]:
-    df["Year"] = df["Year"].astype(int)
-    df["IPEDS_Name"] = df["IPEDS_Name"].astype(str)
+def section_index(options, key):
+    slug = view_state.get(f"{key}_section")
+    slugs = [section_slug(option) for option in options]
+    return slugs.index(slug) if slug in slugs else 0
 
-NJIT_NAME = "New Jersey Institute of Technology"
-DEFAULT_RUTGERS = "Rutgers University-New Brunswick"
+# The URL only seeds a session once; after that the widgets own the state
+if "url_view_state" not in st.session_state:
+    st.session_state["url_view_state"] = read_view_state(st.query_params)
+view_state = st.session_state["url_view_state"]
 
-common_universities = get_common_universities(times_df, qs_df, usn_df, washington_df)
+common_universities = get_common_universities(times_df, qs_df, usn_df, washington_df, data_version)
 
 st.sidebar.header("🔍 Filters")
+st.sidebar.caption(f"Data version {data_version}, loaded {time.strftime('%Y-%m-%d %H:%M', time.localtime(dataset.loaded_at))}")
+cache_usage = cache_stats()
+st.sidebar.caption(
+    f"Cache {cache_usage.used_bytes / 1024 ** 2:.1f} of {cache_usage.budget_bytes / 1024 ** 2:.0f} MB, "
+    f"{cache_usage.entries} entries, {cache_usage.evictions + cache_usage.expirations} evicted"
+)
+if dataset_store.last_error:
+    st.sidebar.warning(f"Reloading the source files failed ({dataset_store.last_error}); showing the last good version.")
 
 years = sorted(
-    list(
-        set(times_df["Year"].unique()) |
-        set(qs_df["Year"].unique()) |
-        set(usn_df["Year"].unique()) |
-        set(washington_df["Year"].unique())
-    )
+    int(y) for y in
+    set(times_df["Year"].unique()) |
+    set(qs_df["Year"].unique()) |
+    set(usn_df["Year"].unique()) |
+    set(washington_df["Year"].unique())
+)
+selected_years = st.sidebar.multiselect(
+    "Select Years", years, default=[y for y in view_state["years"] if y in years] or years
+)
+selected_years_key = tuple(sorted(selected_years))
+
+nj_filter = st.sidebar.selectbox(
+    "Include Only NJ Universities?", NJ_FILTER_OPTIONS,
+    index=NJ_FILTER_OPTIONS.index(view_state["nj"]) if view_state["nj"] in NJ_FILTER_OPTIONS else 0
+)
+
+show_forecast = st.sidebar.toggle(
+    "📈 Project next year",
+    value=view_state["forecast"],
+    key="show_forecast",
+    help="Extend the charts with a dashed next-year projection from each institution's trend"
 )
-selected_years = st.sidebar.multiselect("Select Years", years, default=years)
 
-nj_filter = st.sidebar.selectbox("Include Only NJ Universities?", ["All", "Yes", "No"])
+show_render_timings = st.sidebar.toggle(
+    "⏱️ Render timings",
+    key="render_timings",
+    help="List how long each figure of this page took to build and draw"
+)
+
+NEW_PEER_GROUP = "➕ New group"
+
+def render_peer_group_editor(peer_index, peer_file):
+    """Create, change or delete a peer group; saved atomically to the tenant's peer file"""
+    with st.sidebar.expander("✏️ Edit peer groups"):
+        editing = st.selectbox("Group", [NEW_PEER_GROUP] + peer_index.types(), key="peer_edit_group")
+        is_new = editing == NEW_PEER_GROUP
+        key = "peer_edit_new" if is_new else f"peer_edit_{editing}"
+        name = st.text_input("Name", value="" if is_new else editing, key=f"{key}_name")
+        members_key = f"{key}_members"
+        pinned = list(st.session_state.get(members_key, () if is_new else peer_index.groups[editing]))
+        st.session_state[members_key] = pinned
+        options = search_options("Search institutions:", key, sorted(name_index.names), pinned)
+        members = st.multiselect("Institutions", options, key=members_key)
+
+        save_col, delete_col = st.columns(2)
+        if save_col.button("Save", key=f"{key}_save", use_container_width=True):
+            try:
+                updated = peer_index.with_group(name, members, name_index.names, previous_name=None if is_new else editing)
+            except ValueError as exc:
+                st.error(str(exc))
+                return
+            dataset_store.save_peer_groups(peer_file, updated)
+            if not is_new and name.strip() != editing:
+                # The group picker is already drawn; it takes the new name before it is drawn on the rerun
+                st.session_state["peer_types_renamed"] = (editing, name.strip())
+            finish_peer_edit(key)
+        if not is_new and delete_col.button("Delete", key=f"{key}_delete", use_container_width=True):
+            dataset_store.save_peer_groups(peer_file, peer_index.without_group(editing))
+            finish_peer_edit(key)
+
+def finish_peer_edit(key):
+    for state_key in [f"{key}_name", f"{key}_members", f"{key}_search", "peer_edit_group"]:
+        st.session_state.pop(state_key, None)
+    st.rerun()
 
 # --- NEW: Peer Group Selection ---
 st.sidebar.markdown("---")
 st.sidebar.header("🎯 Peer Groups")
 
-peer_types = sorted(peer_groups_df['PEER_TYPE'].unique())
+peer_types = peer_index.types()
+
+# Names in the peer file the dataset does not know (a typo in a hand-edited file) would never match a row
+unknown_peers = peer_index.unknown_members(name_index.names)
+if unknown_peers:
+    st.sidebar.warning(
+        f"{tenant.peer_file} lists institutions that are not in the data: {', '.join(unknown_peers)}. "
+        "Fix the names in the file or in the editor below."
+    )
 
+# Keyed, so the selection survives groups being added or renamed in the editor
+selected_before = st.session_state.get("peer_types", view_state["peers"])
+renamed = st.session_state.pop("peer_types_renamed", None)
+if renamed:
+    selected_before = [renamed[1] if p == renamed[0] else p for p in selected_before]
+st.session_state["peer_types"] = [p for p in selected_before if p in peer_types]
 selected_peer_types = st.sidebar.multiselect(
     "Select Peer Groups:",
     options=peer_types,
-    default=[],
-    help="Select peer groups to compare with NJIT"
+    key="peer_types",
+    help=f"Select peer groups to compare with {tenant.short_name}"
 )
 
-peer_group_universities = []
-if selected_peer_types:
-    peer_group_universities = peer_groups_df[
-        peer_groups_df['PEER_TYPE'].isin(selected_peer_types)
-    ]['PEER_NAME'].tolist()
+peer_group_universities = peer_index.members(selected_peer_types)
+
+render_peer_group_editor(peer_index, tenant.peer_file)
 
 st.sidebar.markdown("---")
 st.sidebar.header("🏫 Individual Universities")
@@ -146,31 +327,51 @@ st.sidebar.header("🏫 Individual Universities")
 combined_df = pd.concat([times_df, qs_df, usn_df, washington_df], ignore_index=True)
 
 # Filter Combined Dataset 
-combined_common_df = get_filtered_combined_df(combined_df, common_universities, nj_filter)
+combined_common_df = get_filtered_combined_df(combined_df, data_version, common_universities, nj_filter)
 
-# Final Universities for Dropdown
-common_universities_filtered = sorted([u for u in combined_common_df["IPEDS_Name"].unique() if u != NJIT_NAME])
+# Coverage bitmaps: institutions with any published value in the selected years, per agency
+coverage_maps = {agency: get_coverage(df, agency, data_version) for agency, df in agency_frames.items()}
+with_data = {agency: institutions_with_data(coverage, selected_years) for agency, coverage in coverage_maps.items()}
+
+def manual_option_label(uni):
+    lacking = [agency for agency in with_data if uni not in with_data[agency]]
+    return f"{uni} (no {', '.join(lacking)} data for the selected years)" if lacking else uni
+
+# Final Universities for Dropdown: only those with data in the selected years for at least one agency
+covered_any = set().union(*with_data.values())
+common_universities_filtered = sorted([
+    u for u in combined_common_df["IPEDS_Name"].unique() if u != FOCAL_NAME and u in covered_any
+])
 
 # Filter available universities (excluding those already in peer groups)
-available_for_manual = [u for u in common_universities_filtered if u not in peer_group_universities]
+peer_group_set = set(peer_group_universities)
+available_for_manual = [u for u in common_universities_filtered if u not in peer_group_set]
 
-# Only show Rutgers in manual selection if no peer groups are selected
+# Only show the default comparator in manual selection if no peer groups are selected
 if selected_peer_types:
-    available_for_manual = [u for u in available_for_manual if u != DEFAULT_RUTGERS]
+    available_for_manual = [u for u in available_for_manual if u != DEFAULT_COMPARATOR]
+
+# Picks no longer available (say, now part of a selected peer group) are dropped
+manual_pinned = [
+    u for u in st.session_state.get("manual_unis", view_state["unis"]) if u in available_for_manual
+]
+st.session_state["manual_unis"] = manual_pinned
+manual_options = search_options("Search universities:", "manual", available_for_manual, manual_pinned, st.sidebar)
 
 manual_selected_unis = st.sidebar.multiselect(
     "Add individual universities:",
-    available_for_manual,
-    default=[],
+    manual_options,
+    format_func=manual_option_label,
+    key="manual_unis",
     help="Select additional universities to compare"
 )
 
-# Combine peer groups and manual selections (Rutgers is excluded when peer groups are selected)
-all_selected_unis = list(set(peer_group_universities + manual_selected_unis))
+# Combine peer groups and manual selections (the default comparator is excluded when peer groups are selected)
+all_selected_unis = sorted(set(peer_group_universities + manual_selected_unis))
 
-# Only include Rutgers by default if no peer groups are selected
-if not selected_peer_types and not all_selected_unis and DEFAULT_RUTGERS in common_universities_filtered:
-    all_selected_unis = [DEFAULT_RUTGERS]
+# Only include the default comparator if no peer groups are selected
+if not selected_peer_types and not all_selected_unis and DEFAULT_COMPARATOR in common_universities_filtered:
+    all_selected_unis = [DEFAULT_COMPARATOR]
 
 # Display active peer groups
 if selected_peer_types:
@@ -178,79 +379,398 @@ if selected_peer_types:
     st.sidebar.header("✅ Active Peer Groups")
     for peer_type in selected_peer_types:
         st.sidebar.write(f"**{peer_type}**")
-        peers_in_type = peer_groups_df[peer_groups_df['PEER_TYPE'] == peer_type]['PEER_NAME'].tolist()
+        peers_in_type = peer_index.groups[peer_type]
         for peer in peers_in_type:
             status = "✅" if peer in all_selected_unis else "❌"
             #st.sidebar.write(f"{status} {peer}")
             st.sidebar.write(f"{peer}")
 
-#Extra Universities Per Agency 
-extra_times_unis = sorted([u for u in times_df["IPEDS_Name"].unique() if (u not in common_universities and u != NJIT_NAME)])
-extra_qs_unis = sorted([u for u in qs_df["IPEDS_Name"].unique() if (u not in common_universities and u != NJIT_NAME)])
-extra_usn_unis = sorted([u for u in usn_df["IPEDS_Name"].unique() if (u not in common_universities and u != NJIT_NAME)])
-extra_washington_unis = sorted([u for u in washington_df["IPEDS_Name"].unique() if (u not in common_universities and u != NJIT_NAME)])
-
-# Helper Function for KPIs 
-def get_metric_value(df, university, column):
-    try:
-        val = df[df["IPEDS_Name"] == university][column].values[0]
-        if isinstance(val, (int, float)):
-            return round(val, 2)
-        return val if pd.notna(val) else "N/A"
-    except:
-        return "N/A"
+def option_label(uni, agency):
+    return uni if uni in with_data[agency] else f"{uni} (no data for the selected years)"
+
+#Extra Universities Per Agency (only those with data for the selected years)
+extra_times_unis = sorted([u for u in with_data["TIMES"] if (u not in common_universities and u != FOCAL_NAME)])
+extra_qs_unis = sorted([u for u in with_data["QS"] if (u not in common_universities and u != FOCAL_NAME)])
+extra_usn_unis = sorted([u for u in with_data["USN"] if (u not in common_universities and u != FOCAL_NAME)])
+extra_washington_unis = sorted([u for u in with_data["Washington"] if (u not in common_universities and u != FOCAL_NAME)])
+
+# Cached building blocks shared by the tabs and the prewarmer
+@cached(max_entries=VIEW_CACHE_ENTRIES, selection="universities", partition="tenant_key")
+def get_tab_frame(_backend, agency, data_version, tenant_key, universities, years):
+    # Only the selected years are touched (year partitions or the (IPEDS_Name, Year) index)
+    return _backend.frame(agency, universities, years)
+
+@cached(max_entries=VIEW_CACHE_ENTRIES, selection="universities", partition="tenant_key")
+def get_kpi_values(_backend, agency, data_version, tenant_key, universities, year, metrics):
+    kpi_row = _backend.frame(agency, universities, (year,))
+    # (university, value, percentile-within-year label) per metric
+    return {
+        metric: [
+            (uni, get_metric_value(kpi_row, uni, metric), format_percentile(get_metric_value(kpi_row, uni, percentile_column(metric))))
+            for uni in universities
+        ]
+        for metric in metrics
+    }
+
+# Export files are streamed from the backend's rows and kept for the next download of the same view
+@cached(max_entries=VIEW_CACHE_ENTRIES, selection="universities", partition="tenant_key")
+def get_data_export(_backend, agency, fmt, data_version, tenant_key, universities, years):
+    return export_bytes(_backend.chunks(agency, universities, years), agency_frames[agency].columns, fmt, agency)
+
+@cached(max_entries=VIEW_CACHE_ENTRIES, selection="universities", partition="tenant_key")
+def get_kpi_export(_backend, agency, fmt, data_version, tenant_key, universities, year, metrics):
+    columns = ["IPEDS_Name", "Year"] + [c for metric in metrics for c in (metric, percentile_column(metric))]
+    return export_bytes(_backend.chunks(agency, universities, (year,), columns), columns, fmt, f"{agency} KPIs {year}")
+
+@cached(max_entries=VIEW_CACHE_ENTRIES, selection="color_map", partition="tenant_key")
+def build_chart_sorted(df, metric_col, color_map, height, dist, forecast, tenant_key):
+    return build_line_chart(df, metric_col, color_map, height, dist, forecast)
+
+@cached(max_entries=VIEW_CACHE_ENTRIES, selection="universities", partition="tenant_key")
+def build_rank_band_figure(df, metric_col, title, universities, color_map, forecast, tenant_key):
+    return rank_band_figure(df, metric_col, title, universities, color_map, forecast)
+
+@cached(max_entries=VIEW_CACHE_ENTRIES, selection="color_map", partition="tenant_key")
+def build_rank_line_figure(df, metric_col, title, color_map, forecast, tenant_key):
+    return rank_line_figure(df, metric_col, title, color_map, forecast)
+
+@cached(max_entries=VIEW_CACHE_ENTRIES, partition="tenant_key")
+def build_gender_figure(df, tenant_key):
+    return gender_bar_figure(df)
+
+@cached(max_entries=VIEW_CACHE_ENTRIES, selection="color_map", partition="tenant_key")
+def build_cross_agency_figure(rows, value_field, title, color_map, tenant_key):
+    return cross_agency_figure(rows, value_field, title, color_map)
+
+@cached(max_entries=VIEW_CACHE_ENTRIES)
+def build_correlation_heatmap(_correlations, year, method, data_version):
+    matrices = _correlations[year]
+    return correlation_heatmap(getattr(matrices, method.lower()), f"{method} correlation, {year}")
+
+@cached(max_entries=VIEW_CACHE_ENTRIES, selection="color_map", partition="tenant_key")
+def build_correlation_scatter(points, x_label, y_label, title, color_map, focal_name, tenant_key):
+    return correlation_scatter(points, x_label, y_label, title, color_map, focal_name)
+
+def build_overview_rank_figure(frame, agency, universities, color_map, forecast, tenant_key):
+    if agency in ("TIMES", "QS"):
+        return build_rank_band_figure(frame, RANK_COLUMNS[agency], f"{agency} Rank", universities, color_map, forecast, tenant_key)
+    title = "USN Rank" if agency == "USN" else "Washington Monthly Rank"
+    return build_rank_line_figure(frame, RANK_COLUMNS[agency], title, color_map, forecast, tenant_key)
+
+def visible_forecast(forecasts, metric_col, universities):
+    # Projections continue from the latest year, so only draw them when it is selected
+    if forecasts is None or metric_col not in forecasts:
+        return None
+    forecast = forecasts[metric_col]
+    forecast = forecast[forecast["Year"].isin(selected_years) & forecast.index.isin(universities)]
+    return forecast if not forecast.empty else None
 
 # Shared Chart Function for All Tabs
-def plot_chart_sorted(df, metric_col, title_label, description, color_map, height=400):
-    df = df.copy()
-    df["Year"] = pd.to_numeric(df["Year"], errors="coerce")
-    df = df.sort_values("Year")
-    df["Year"] = df["Year"].astype(str)
-
-    fig = px.line(
-        df,
-        x="Year",
-        y=metric_col,
-        text=metric_col,
-        color="IPEDS_Name",
-        markers=True,
-        color_discrete_map=color_map,
-        title=title_label
-    )
-    fig.update_traces(
-        textposition="top center",
-        texttemplate="%{text:.2f}",
-        textfont_size=10,
-        connectgaps=True
-    )
-    fig.update_layout(
-        height=height,
-        margin=dict(t=30, b=70, l=30, r=30),
-        title_font=dict(size=15, color="#333"),
-        title_x=0.0,
-        xaxis=dict(type='category'),
-        xaxis_title="Year",
-        yaxis_title=title_label,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=-0.35,
-            xanchor="center",
-            x=0.5,
-            font=dict(size=9),
-            bgcolor='rgba(0,0,0,0)',
-            title_text=None
-        )
-    )
-    st.plotly_chart(fig, use_container_width=True)
+def drop_uncovered(df, metric_col, universities, coverage, years):
+    """`df` without the institutions that have no number for `metric_col` in `years`, and those institutions"""
+    missing = [uni for uni in universities if not has_data(coverage, uni, metric_col, years, numeric=True)]
+    return (df[~df["IPEDS_Name"].isin(missing)] if missing else df), missing
+
+def plot_chart_sorted(df, metric_col, title_label, description, color_map, height=400, distributions=None, forecasts=None, coverage=None):
+    missing = []
+    if coverage is not None:
+        # Drop institutions with no value in the selected years instead of drawing empty traces
+        df, missing = drop_uncovered(df, metric_col, color_map, coverage, selected_years)
+        if len(missing) == len(color_map):
+            st.info(f"{title_label}: no data for the selected universities and years.")
+            return
+
+    dist = None
+    if distributions is not None and metric_col in distributions:
+        dist = distributions[metric_col]
+        dist = dist[dist["Year"].isin(selected_years)]
+    forecast = visible_forecast(forecasts, metric_col, df["IPEDS_Name"].unique())
+
+    def build():
+        fig = build_chart_sorted(df, metric_col, color_map, height, dist, forecast, tenant_key)
+        fig.update_layout(title_text=title_label, yaxis_title=title_label)
+        return fig
+
+    # Built now (or on the figure pool, if configured); drawn here by figure_pipeline.flush()
+    chart = st.empty()
+    figure_pipeline.submit(title_label, build, lambda fig: chart.plotly_chart(fig, use_container_width=True))
 
     # Chart Description Below
+    if missing:
+        description += f"<br><span style='font-weight:normal; color:#888;'>No data: {', '.join(missing)}</span>"
     st.markdown(f"""
         <div style='text-align:center; font-size:0.85rem; font-weight:bold; color:#555; margin-top:8px; margin-bottom:20px;'>
             {description}
         </div>
     """, unsafe_allow_html=True)
 
+def kpi_value_html(uni, val, pct, color_map, covered):
+    if not covered:
+        return f"<div class='kpi-value kpi-missing'>{uni}: no data</div>"
+    pct_html = f" <span class='kpi-pct'>({pct})</span>" if pct else ""
+    return f"<div class='kpi-value' style='color:{color_map.get(uni)}'>{uni}: {val}{pct_html}</div>"
+
+def render_kpi_boxes(kpi_metrics, kpi_values, year, color_map, coverage):
+    kpi_keys = list(kpi_metrics.keys())
+    for i in range(0, len(kpi_keys), 4):
+        row = st.columns(4)
+        for j in range(4):
+            if i + j < len(kpi_keys):
+                col_key = kpi_keys[i + j]
+                label = kpi_metrics[col_key] + (f" ({year})" if year else "")
+                
+                kpi_html = f"<h4>{label}</h4>"
+                if year:
+                    for uni, val, pct in kpi_values[col_key]:
+                        kpi_html += kpi_value_html(uni, val, pct, color_map, has_data(coverage, uni, col_key, (year,)))
+                
+                with row[j]:
+                    st.markdown(f"<div class='kpi-box'>{kpi_html}</div>", unsafe_allow_html=True)
+
+def render_export_buttons(agency, key, universities, year, metrics):
+    """Download buttons for the tab's filtered rows and KPI table; a file is only built when clicked"""
+    with st.expander("⬇️ Export"):
+        fmt = st.radio("Format", list(EXPORT_FORMATS), horizontal=True, key=f"{key}_export_format")
+        extension, mime = EXPORT_FORMATS[fmt]
+        selection = tuple(sorted(universities))
+        data_col, kpi_col = st.columns(2)
+        data_col.download_button(
+            "📄 Filtered data",
+            data=lambda: get_data_export(query_backend, agency, fmt, data_version, tenant_key, selection, selected_years_key),
+            file_name=f"{key}_data.{extension}",
+            mime=mime,
+            key=f"{key}_export_data",
+            on_click="ignore",
+            use_container_width=True
+        )
+        kpi_col.download_button(
+            f"📊 KPI table ({year})" if year else "📊 KPI table",
+            data=lambda: get_kpi_export(query_backend, agency, fmt, data_version, tenant_key, selection, year, metrics),
+            file_name=f"{key}_kpis_{year}.{extension}",
+            mime=mime,
+            key=f"{key}_export_kpis",
+            on_click="ignore",
+            disabled=year is None,
+            use_container_width=True
+        )
+
+def render_weight_simulator(agency, key, matrices, universities, color_map):
+    sim_years = [y for y in sorted(matrices, reverse=True) if y in selected_years] or sorted(matrices, reverse=True)
+    year = st.selectbox("Methodology year", sim_years, key=f"{key}_whatif_year")
+    matrix = matrices[year]
+    published = matrix.available.any(axis=0)
+
+    pillars = PILLAR_WEIGHTS[agency]
+    weights = []
+    pillar_keys = list(pillars.keys())
+    for i in range(0, len(pillar_keys), 5):
+        row = st.columns(5)
+        for j, pillar in enumerate(pillar_keys[i:i + 5]):
+            with row[j]:
+                weights.append(st.slider(
+                    pillar.replace("_", " "), 0.0, 100.0, float(pillars[pillar]), 0.5,
+                    key=f"{key}_weight_{pillar}"
+                ))
+    if not any(w > 0 for w, used in zip(weights, published) if used):
+        st.warning(f"Give at least one pillar {agency} published in {year} a weight above 0.")
+        return
+
+    start = time.perf_counter()
+    base_scores, base_ranks = simulate_ranks(matrix.values, matrix.available, list(pillars.values()), matrix.complete)
+    sim_scores, sim_ranks = simulate_ranks(matrix.values, matrix.available, weights, matrix.complete)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    ranked_count = int(matrix.complete.sum())
+
+    rows = []
+    for uni in universities:
+        i = matrix.row_index.get(uni)
+        if i is None:
+            continue
+        rows.append({
+            "Institution": uni,
+            "Published weights score": round(base_scores[i], 2),
+            "Simulated score": round(sim_scores[i], 2),
+            "Published weights rank": base_ranks[i],
+            "Simulated rank": sim_ranks[i],
+            "Rank change": base_ranks[i] - sim_ranks[i],
+            "Pillars": "all" if matrix.complete[i] else f"{int(matrix.available[i].sum())} of {int(published.sum())}, unranked",
+        })
+    table = pd.DataFrame(rows)
+    rank_columns = ["Published weights rank", "Simulated rank", "Rank change"]
+    if not table.empty:
+        table[rank_columns] = table[rank_columns].astype("Int64")
+
+    focal = matrix.row_index.get(FOCAL_NAME)
+    if focal is not None:
+        if matrix.complete[focal]:
+            focal_rank = f"{int(sim_ranks[focal])} of {ranked_count} (published weights: {int(base_ranks[focal])})"
+        else:
+            focal_rank = "Unranked (incomplete pillar scores)"
+        kpi_html = (
+            f"<h4>🧪 {tenant.short_name} Simulated Rank ({year})</h4>"
+            f"<div class='kpi-value' style='color:{color_map.get(FOCAL_NAME)}'>{focal_rank}</div>"
+        )
+        st.markdown(f"<div class='kpi-box'>{kpi_html}</div>", unsafe_allow_html=True)
+        if not table.empty and matrix.complete[focal]:
+            table[f"Rank gap vs {tenant.short_name}"] = table["Simulated rank"] - int(sim_ranks[focal])
+
+    if table.empty:
+        st.info(f"No {agency} pillar scores for the selected universities in {year}.")
+    else:
+        st.dataframe(table.sort_values("Simulated rank"), hide_index=True, use_container_width=True)
+
+    st.markdown(f"""
+        <div style='text-align:center; font-size:0.85rem; font-weight:bold; color:#555; margin-top:8px; margin-bottom:20px;'>
+            Ranks are recomputed for the {ranked_count} of {len(matrix.names)} {agency} institutions in {year} that published every pillar ({elapsed_ms:.1f} ms);
+            the others are listed as unranked. A negative gap means ranked above {tenant.short_name}.
+        </div>
+    """, unsafe_allow_html=True)
+
+def render_gap_panel(agency, key, indexes, universities, color_map):
+    index_years = sorted({year for year, _ in indexes}, reverse=True)
+    gap_years = [y for y in index_years if y in selected_years] or index_years
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        focal = st.selectbox("Institution", universities, key=f"{key}_gap_uni")
+    with col2:
+        year = st.selectbox("Year", gap_years, key=f"{key}_gap_year")
+    with col3:
+        metrics = [m for m in [OVERALL_SCORE_COLUMNS[agency]] + list(PILLAR_WEIGHTS[agency]) if (year, m) in indexes]
+        metric = st.selectbox("Metric", metrics, format_func=lambda m: m.replace("_", " "), key=f"{key}_gap_metric")
+
+    index = indexes[(year, metric)]
+    current = index.value_of.get(focal)
+    if current is None:
+        st.info(f"{focal} has no published {metric.replace('_', ' ')} in {agency} {year}.")
+        return
+
+    total = len(index.values_desc)
+    position = position_of(index, current)
+    kpi_html = (
+        f"<h4>🎯 {metric.replace('_', ' ')} ({year})</h4>"
+        f"<div class='kpi-value' style='color:{color_map.get(focal)}'>{focal}: {current:.2f}"
+        f" (position {position} of {total})</div>"
+    )
+    st.markdown(f"<div class='kpi-box'>{kpi_html}</div>", unsafe_allow_html=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        target = st.number_input(
+            "Target position", min_value=1, max_value=total, value=max(1, position // 2), key=f"{key}_gap_target"
+        )
+        targets = sorted({p for p in [1, 10, 25, 50, 100, int(target)] if p < position and p <= total})
+        target_rows = [{
+            "Target": f"Position {p} of {total}",
+            "Required value": round(value_for_position(index, p), 2),
+            "Improvement needed": round(value_for_position(index, p) - current, 2),
+        } for p in targets]
+        if metric == OVERALL_SCORE_COLUMNS[agency]:
+            for rank in [100, 200, 300, 400, 500]:
+                required = value_for_published_rank(index, rank)
+                if required is not None and required > current:
+                    target_rows.append({
+                        "Target": f"Published {agency} rank ≤ {rank}",
+                        "Required value": round(required, 2),
+                        "Improvement needed": round(required - current, 2),
+                    })
+        if target_rows:
+            st.dataframe(pd.DataFrame(target_rows), hide_index=True, use_container_width=True)
+        else:
+            st.success(f"{focal} is already at or above every target.")
+
+    with col2:
+        peer_rows = []
+        for uni in universities:
+            peer_value = index.value_of.get(uni)
+            if uni == focal or peer_value is None:
+                continue
+            peer_rows.append({
+                "Peer": uni,
+                "Peer value": round(peer_value, 2),
+                "Improvement to pass": round(max(peer_value - current, 0.0), 2),
+                "Status": "Behind" if peer_value > current else "Already ahead",
+            })
+        if peer_rows:
+            st.dataframe(pd.DataFrame(peer_rows).sort_values("Peer value", ascending=False), hide_index=True, use_container_width=True)
+        else:
+            st.info("No selected peers have this metric in the chosen year.")
+
+    st.markdown(f"""
+        <div style='text-align:center; font-size:0.85rem; font-weight:bold; color:#555; margin-top:8px; margin-bottom:20px;'>
+            Positions are among the {total} {agency} institutions in this dataset with a published {metric.replace('_', ' ')} in {year}.
+            Published-rank targets use the lowest score that reached that rank.
+        </div>
+    """, unsafe_allow_html=True)
+
+# --- Cache prewarming for the common presets ---
+PREWARM_YEAR_WINDOWS = [None, 2]  # all years (the default selection) and the latest two
+
+def tenant_presets(tenant, peer_index):
+    # The default comparator alone, then each peer group
+    return ([[tenant.comparator]] if tenant.comparator else []) + [
+        sorted(peer_index.groups[peer_type]) for peer_type in peer_index.types()
+    ]
+
+def prewarm_view_caches(backend, presets, all_years, data_version, tenant, registry, coverage_maps):
+    """Fill one tenant's view caches for each preset so first visitors hit warm entries"""
+    tenant_key = tenant.key
+    year_presets = [tuple(all_years) if window is None else tuple(all_years[-window:]) for window in PREWARM_YEAR_WINDOWS]
+
+    for peers in presets:
+        universities = [tenant.focal] + peers
+        color_map = create_color_map(universities, tenant.focal, registry)
+        for years_key in year_presets:
+            for agency in RANK_COLUMNS:
+                frame = get_tab_frame(backend, agency, data_version, tenant_key, tuple(sorted(universities)), years_key)
+                build_overview_rank_figure(frame, agency, universities, color_map, None, tenant_key)
+                latest_year = max([y for y in years_key if y in frame["Year"].unique()], default=None)
+                if latest_year:
+                    get_kpi_values(backend, agency, data_version, tenant_key, tuple(universities), latest_year, tuple(KPI_METRICS[agency]))
+                for metric in CHART_METRICS[agency]:
+                    if metric not in frame.columns:
+                        continue
+                    # The same coverage filter as plot_chart_sorted, so the keys match
+                    chart_df, missing = drop_uncovered(
+                        frame[["Year", "IPEDS_Name", metric, percentile_column(metric)]],
+                        metric, universities, coverage_maps[agency], years_key
+                    )
+                    if len(missing) < len(universities):
+                        build_chart_sorted(chart_df, metric, color_map, 400, None, None, tenant_key)
+
+def dataset_coverage_maps(dataset):
+    return {agency: get_coverage(df, agency, dataset.version) for agency, df in dataset.tables.items()}
+
+def prewarm_dataset_views(dataset):
+    backend = get_query_backend(dataset, dataset.version)
+    coverage_maps = dataset_coverage_maps(dataset)
+    all_years = sorted(set().union(*(backend.years(agency) for agency in RANK_COLUMNS)))
+    for tenant in dataset.tenants.values():
+        presets = tenant_presets(tenant, dataset.peer_groups[tenant.peer_file] or PeerGroups({}))
+        prewarm_view_caches(backend, presets, all_years, dataset.version, tenant, dataset.colors, coverage_maps)
+
+def prewarm_peer_changes(dataset, changes):
+    backend = get_query_backend(dataset, dataset.version)
+    coverage_maps = dataset_coverage_maps(dataset)
+    all_years = sorted(set().union(*(backend.years(agency) for agency in RANK_COLUMNS)))
+    for tenant in dataset.tenants.values():
+        presets = [sorted(change.after) for change in changes.get(tenant.peer_file, []) if change.after]
+        prewarm_view_caches(backend, presets, all_years, dataset.version, tenant, dataset.colors, coverage_maps)
+
+@st.cache_resource
+def start_cache_prewarmer(_dataset, data_version):
+    # The first version gets the same warm-up as the later ones get before they are swapped in
+    thread = threading.Thread(
+        target=warm_dataset_caches,
+        args=(_dataset,),
+        name="cache-prewarmer",
+        daemon=True
+    )
+    thread.start()
+    return thread
+
+start_cache_prewarmer(dataset, data_version)
+
 # Global KPI Box Styling 
 st.markdown("""
     <style>
@@ -277,6 +797,16 @@ st.markdown("""
         font-weight: 600;
         margin-bottom: 4px;
     }
+    .kpi-box .kpi-missing {
+        color: #AAA;
+        font-weight: 400;
+        font-style: italic;
+    }
+    .kpi-box .kpi-pct {
+        font-size: 0.75rem;
+        font-weight: 400;
+        color: #777;
+    }
     .kpi-label {
         font-size: 0.78rem;
         margin-bottom: 6px;
@@ -296,18 +826,21 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# Figures of this rerun are built concurrently and drawn at the end (render_pipeline.py)
+figure_pipeline = FigurePipeline()
+
 #Setup Tabs 
-tabs = st.tabs(["📊 Overview", "🟣 TIMES", "🟨 QS", "📘 USN", "🔵 Washington"])
+tabs = st.tabs(["📊 Overview", "🟣 TIMES", "🟨 QS", "📘 USN", "🔵 Washington", "🧭 Across Agencies", "🔗 Correlations"])
 
 with tabs[0]:
     st.markdown("""
         <h2 style='text-align: center; color: #4B4B4B;'>Overall Ranking</h2>
     """, unsafe_allow_html=True)
     
-    universities_to_compare = [NJIT_NAME] + all_selected_unis
+    universities_to_compare = [FOCAL_NAME] + all_selected_unis
 
  
-    color_map = create_color_map(universities_to_compare)
+    color_map = create_color_map(universities_to_compare, FOCAL_NAME)
 
     latest_years = {
         "TIMES": max(times_df[times_df["IPEDS_Name"].isin(universities_to_compare)]["Year"].unique(), default=None),
@@ -325,237 +858,59 @@ with tabs[0]:
 
     kpi_cols = st.columns(len(overview_kpi_metrics))
     for idx, (metric, label) in enumerate(overview_kpi_metrics.items()):
-        df_for_kpi = None
-        if metric == "Times_Rank":
-            df_for_kpi = times_df
-        elif metric == "QS_Rank":
-            df_for_kpi = qs_df
-        elif metric == "Rank":
-            df_for_kpi = usn_df
-        elif metric == "Washington_Rank":
-            df_for_kpi = washington_df
-
-        if df_for_kpi is not None:
-            year = latest_years.get(label.split(" ")[0], None)
-            
-            kpi_html = f"<h4>{label} ({year})</h4>"
-            if year:
-                kpi_row = df_for_kpi[df_for_kpi["Year"] == year]
-                for uni in universities_to_compare:
-                    val = get_metric_value(kpi_row, uni, metric)
-                    kpi_html += f"<div class='kpi-value' style='color:{color_map.get(uni)}'>{uni}: {val}</div>"
-            
-            with kpi_cols[idx]:
-                st.markdown(f"<div class='kpi-box'>{kpi_html}</div>", unsafe_allow_html=True)
+        agency = label.split(" ")[0]
+        year = latest_years.get(agency, None)
+        
+        kpi_html = f"<h4>{label} ({year})</h4>"
+        if year:
+            kpi_values = get_kpi_values(query_backend, agency, data_version, tenant_key, tuple(universities_to_compare), year, (metric,))
+            for uni, val, pct in kpi_values[metric]:
+                kpi_html += kpi_value_html(uni, val, pct, color_map, has_data(coverage_maps[agency], uni, metric, (year,)))
+        
+        with kpi_cols[idx]:
+            st.markdown(f"<div class='kpi-box'>{kpi_html}</div>", unsafe_allow_html=True)
                 
     st.divider()
 
-    def parse_rank_range(rank_str):
-        try:
-            parts = str(rank_str).replace("–", "-").split("-")
-            if len(parts) == 2:
-                return (int(parts[0]), int(parts[1]), (int(parts[0]) + int(parts[1])) // 2)
-            else:
-                val = int(rank_str)
-                return (val, val, val)
-        except:
-            return (None, None, None)
-
-    def build_rank_range_df(df, metric_col):
-        df = df.copy()
-        df = df[df[metric_col].notna()]
-        df[["low", "high", "mid"]] = df[metric_col].apply(lambda r: pd.Series(parse_rank_range(str(r))))
-        return df[df["mid"].notna()]
-
     metrics_tabs = st.tabs(["TIMES Rank", "QS Rank", "USN Rank", "Washington Rank"])
-    
-    with metrics_tabs[0]:
-        times_filtered_for_chart = times_df[
-        (times_df["Year"].isin(selected_years)) &
-        (times_df["IPEDS_Name"].isin(universities_to_compare))
-    ]
-        times_ranks = build_rank_range_df(times_filtered_for_chart, "Times_Rank")
-        times_ranks = times_ranks.sort_values("Year")
-
-        fig = go.Figure()
-
-        for uni in universities_to_compare:
-            uni_df = times_ranks[times_ranks["IPEDS_Name"] == uni]
-            base_color = color_map.get(uni)
-
-            fig.add_trace(go.Scatter(
-        x=uni_df["Year"],
-        y=uni_df["high"],
-        mode="lines",
-        line=dict(color=base_color),
-        name=f"{uni} range",
-        showlegend=True,
-    ))
-
-    #Low line with transparent fill
-            fig.add_trace(go.Scatter(
-        x=uni_df["Year"],
-        y=uni_df["low"],
-        mode="lines",
-        line=dict(color=base_color),
-        fill='tonexty',
-        fillcolor=rgba_with_opacity(base_color, alpha=0.15),
-        name=f"{uni} band",
-        showlegend=False
-    ))
-
-    #Text labels
-            fig.add_trace(go.Scatter(
-        x=uni_df["Year"],
-        y=(uni_df["low"] + uni_df["high"]) / 2,
-        mode="text",
-        text=uni_df["Times_Rank"],
-        textposition="middle center",
-        textfont=dict(size=14, color="black"),
-        showlegend=False,
-        hoverinfo="skip"
-    ))
-        
-
-        fig.update_layout(
-        title="TIMES Rank",
-        height=450,
-        margin=dict(t=30, b=30, l=30, r=30),
-        title_font=dict(size=15),
-        title_x=0.0,
-        xaxis=dict(type='category'),
-        yaxis_title="Rank",
-        yaxis_autorange="reversed",
-        legend=dict(orientation="h", y=-0.25, x=0.5, xanchor="center")
-    )
 
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown(
-        "<div style='text-align:center; font-size:0.85rem; margin-top:-5px;'>"
-        "TIMES rankings are shown as shaded ranges with reduced opacity. "
-        "</div>",
-        unsafe_allow_html=True
-    )
-
-    with metrics_tabs[1]:
-        qs_filtered_for_chart = qs_df[
-        (qs_df["Year"].isin(selected_years)) &
-        (qs_df["IPEDS_Name"].isin(universities_to_compare))
-    ]
-        qs_ranks = build_rank_range_df(qs_filtered_for_chart, "QS_Rank")
-        qs_ranks = qs_ranks.sort_values("Year")
-
-        fig = go.Figure()
-
-        for uni in universities_to_compare:
-            uni_df = qs_ranks[qs_ranks["IPEDS_Name"] == uni]
-            base_color = color_map.get(uni)
-
-        # High line 
-            fig.add_trace(go.Scatter(
-            x=uni_df["Year"],
-            y=uni_df["high"],
-            mode="lines",
-            line=dict(color=base_color),
-            name=f"{uni} range",
-            showlegend=True,
-        ))
-
-        #Low line with transparent fill
-            fig.add_trace(go.Scatter(
-            x=uni_df["Year"],
-            y=uni_df["low"],
-            mode="lines",
-            line=dict(color=base_color),
-            fill='tonexty',
-            fillcolor=rgba_with_opacity(base_color, alpha=0.15),
-            name=f"{uni} band",
-            showlegend=False
-        ))
-
-        #Text labels 
-            fig.add_trace(go.Scatter(
-            x=uni_df["Year"],
-            y=(uni_df["low"] + uni_df["high"]) / 2,
-            mode="text",
-            text=uni_df["QS_Rank"],
-            textposition="middle center",
-            textfont=dict(size=14, color="black"),
-            showlegend=False,
-            hoverinfo="skip"
-        ))
-
-        fig.update_layout(
-        title="QS Rank",
-        height=450,
-        margin=dict(t=30, b=30, l=30, r=30),
-        title_font=dict(size=15),
-        title_x=0.0,
-        xaxis=dict(type='category'),
-        yaxis_title="Rank",
-        yaxis_autorange="reversed",
-        legend=dict(orientation="h", y=-0.25, x=0.5, xanchor="center")
-    )
-
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown(
-        "<div style='text-align:center; font-size:0.85rem; margin-top:-5px;'>"
-        "QS rankings are shown as shaded ranges with reduced opacity. "
-        "</div>",
-        unsafe_allow_html=True
-    )
+    rank_captions = {
+        "TIMES": "TIMES rankings are shown as shaded ranges with reduced opacity. ",
+        "QS": "QS rankings are shown as shaded ranges with reduced opacity. ",
+        "USN": "USN ranking is displayed directly. Lower rank indicates better performance",
+        "Washington": "Washington Monthly rankings are plotted yearly. Lower ranks indicate stronger outcomes"
+    }
 
-    with metrics_tabs[2]:
-        usn_filtered_for_chart = usn_df[(usn_df["Year"].isin(selected_years)) & (usn_df["IPEDS_Name"].isin(universities_to_compare))]
-        fig = px.line(
-            usn_filtered_for_chart.sort_values("Year"),
-            x="Year",
-            y="Rank",
-            color="IPEDS_Name",
-            markers=True,
-            text="Rank",
-            color_discrete_map=color_map,
-            title="USN Rank"
-        )
-        fig.update_traces(textposition="top center", texttemplate="%{text}")
-        fig.update_layout(
-            height=450,
-            margin=dict(t=30, b=30, l=30, r=30),
-            title_font=dict(size=15),
-            title_x=0.0,
-            xaxis=dict(type='category'),
-            yaxis_title="Rank",
-            yaxis_autorange="reversed",
-            legend=dict(orientation="h", y=-0.25, x=0.5, xanchor="center")
-        )
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown("<div style='text-align:center; font-size:0.85rem; margin-top:-5px;'>USN ranking is displayed directly. Lower rank indicates better performance</div>", unsafe_allow_html=True)
-
-    with metrics_tabs[3]:
-        washington_filtered_for_chart = washington_df[(washington_df["Year"].isin(selected_years)) & (washington_df["IPEDS_Name"].isin(universities_to_compare))]
-        fig = px.line(
-            washington_filtered_for_chart.sort_values("Year"),
-            x="Year",
-            y="Washington_Rank",
-            color="IPEDS_Name",
-            markers=True,
-            text="Washington_Rank",
-            color_discrete_map=color_map,
-            title="Washington Monthly Rank"
-        )
-        fig.update_traces(textposition="top center", texttemplate="%{text}")
-        fig.update_layout(
-            height=450,
-            margin=dict(t=30, b=30, l=30, r=30),
-            title_font=dict(size=15),
-            title_x=0.0,
-            xaxis=dict(type='category'),
-            yaxis_title="Rank",
-            yaxis_autorange="reversed",
-            legend=dict(orientation="h", y=-0.25, x=0.5, xanchor="center")
-        )
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown("<div style='text-align:center; font-size:0.85rem; margin-top:-5px;'>Washington Monthly rankings are plotted yearly. Lower ranks indicate stronger outcomes</div>", unsafe_allow_html=True)
+    for metrics_tab, agency in zip(metrics_tabs, ["TIMES", "QS", "USN", "Washington"]):
+        with metrics_tab:
+            if not institutions_with_data(coverage_maps[agency], selected_years, RANK_COLUMNS[agency]) & set(universities_to_compare):
+                st.info(f"No {agency} ranks for the selected universities and years.")
+                continue
+            filtered_for_chart = get_tab_frame(
+                query_backend, agency, data_version, tenant_key, tuple(sorted(universities_to_compare)), selected_years_key
+            )
+            rank_forecast = visible_forecast(
+                get_forecasts(agency_frames[agency], agency, data_version) if show_forecast else None,
+                RANK_COLUMNS[agency], universities_to_compare
+            )
+            rank_chart = st.empty()
+            figure_pipeline.submit(
+                f"{agency} Rank",
+                lambda frame=filtered_for_chart, agency=agency, color_map=color_map, forecast=rank_forecast:
+                    build_overview_rank_figure(frame, agency, universities_to_compare, color_map, forecast, tenant_key),
+                lambda fig, chart=rank_chart: chart.plotly_chart(fig, use_container_width=True),
+            )
+            st.markdown(
+                f"<div style='text-align:center; font-size:0.85rem; margin-top:-5px;'>{rank_captions[agency]}</div>",
+                unsafe_allow_html=True
+            )
+            if show_forecast:
+                with st.expander("📉 Projection backtest"):
+                    st.dataframe(get_forecast_backtest(agency_frames[agency], agency, data_version).round(1), hide_index=True, use_container_width=True)
+                    st.caption(
+                        "Each year is projected from the earlier years only and compared with the published rank "
+                        "(error in rank positions, using rank-band midpoints). Naive MAE keeps last year's rank."
+                    )
 
     # Methodology Link for Overview Tab
     # st.markdown("""
@@ -567,19 +922,25 @@ with tabs[0]:
 with tabs[1]:
     st.markdown("<h2 style='text-align: center; color: #4B4B4B;'>TIMES Ranking</h2>", unsafe_allow_html=True)
 
-    # Build full options list (global + extra TIMES)
-    times_options = list(dict.fromkeys(all_selected_unis + extra_times_unis))
+    # Seed this session's manual picks from the URL on first render
+    if "manual_times_selected_unis" not in st.session_state:
+        st.session_state["manual_times_selected_unis"] = [u for u in view_state["times"] if u in all_selected_unis or u in extra_times_unis]
 
     # Get previously selected manual universities for TIMES
     manual_times_selected_unis = st.session_state.get("manual_times_selected_unis", [])
 
     # Merge peer groups + manual selections -> ensures peer groups are always included
-    merged_selected_unis = list(set(all_selected_unis + manual_times_selected_unis))
+    merged_selected_unis = sorted(set(all_selected_unis + manual_times_selected_unis))
+
+    # Earlier picks stay listed (flagged) even when the selected years have no data for them;
+    # the rest of the list is the search box's top matches, never every institution
+    times_options = search_options("Search TIMES institutions", "times", extra_times_unis, merged_selected_unis)
 
     # Multi-select for TIMES
     current_times_selected_unis = st.multiselect(
-        "🔎 Select universities to compare with NJIT:",
+        f"🔎 Select universities to compare with {tenant.short_name}:",
         options=times_options,
+        format_func=lambda uni: option_label(uni, "TIMES"),
         default=merged_selected_unis,
         key="times_optional_unis"
     )
@@ -589,153 +950,114 @@ with tabs[1]:
         uni for uni in current_times_selected_unis if uni not in all_selected_unis
     ]
 
-    # Final unis = NJIT + all selected
-    final_times_unis = [NJIT_NAME] + current_times_selected_unis
+    # Final unis = focal institution + all selected
+    final_times_unis = [FOCAL_NAME] + current_times_selected_unis
 
-    color_map = create_color_map(final_times_unis)
+    color_map = create_color_map(final_times_unis, FOCAL_NAME)
 
     #Filter Data 
-    times_filtered_tab = times_df[
-        (times_df["Year"].isin(selected_years)) &
-        (times_df["IPEDS_Name"].isin(final_times_unis))
-    ]
+    times_filtered_tab = get_tab_frame(query_backend, "TIMES", data_version, tenant_key, tuple(sorted(final_times_unis)), selected_years_key)
 
     latest_times_year = max([y for y in selected_years if y in times_filtered_tab["Year"].unique()], default=None)
 
        #KPI Metrics 
-    kpi_metrics = {
-        "Times_Rank": "🏅 Rank",
-        "Overall": "📊 Overall Score",
-        "Teaching": "📖 Teaching",
-        "Research_Quality": "🔬 Research Quality",
-        "Research_Environment": "🏛️ Research Environment",
-        "International_Students": "🌍 Intl. Students %",
-        "No_of_students_per_staff": "👩‍🏫 Student/Staff Ratio",
-        "No_of_FTE_Students": "🎓 FTE Students"
-    }
-
-    kpi_keys = list(kpi_metrics.keys())
-    for i in range(0, len(kpi_keys), 4):
-        row = st.columns(4)
-        for j in range(4):
-            if i + j < len(kpi_keys):
-                col_key = kpi_keys[i + j]
-                label = kpi_metrics[col_key] + (f" ({latest_times_year})" if latest_times_year else "")
-                
-                kpi_html = f"<h4>{label}</h4>"
-                if latest_times_year:
-                    kpi_row = times_filtered_tab[times_filtered_tab["Year"] == latest_times_year]
-                    for uni in final_times_unis:
-                        val = get_metric_value(kpi_row, uni, col_key)
-                        kpi_html += f"<div class='kpi-value' style='color:{color_map.get(uni)}'>{uni}: {val}</div>"
-                
-                with row[j]:
-                    st.markdown(f"<div class='kpi-box'>{kpi_html}</div>", unsafe_allow_html=True)
+    kpi_metrics = KPI_METRICS["TIMES"]
+    kpi_values = get_kpi_values(query_backend, "TIMES", data_version, tenant_key, tuple(final_times_unis), latest_times_year, tuple(kpi_metrics)) if latest_times_year else {}
+    render_kpi_boxes(kpi_metrics, kpi_values, latest_times_year, color_map, coverage_maps["TIMES"])
+    render_export_buttons("TIMES", "times", final_times_unis, latest_times_year, tuple(kpi_metrics))
 
     st.divider()
 
+    show_all_times = st.toggle(
+        "🌐 Show all institutions",
+        value=view_state["times_all"],
+        key="times_show_all",
+        help="Overlay the selected universities on the per-year distribution of every TIMES-ranked institution"
+    )
+    times_distributions = get_metric_distributions(times_df, "TIMES", data_version) if show_all_times else None
+    times_forecasts = get_forecasts(times_df, "TIMES", data_version) if show_forecast else None
+
     section = st.radio(
         "Choose TIMES Section",
-        ["📖 Teaching", "🔬 Research Performance", "🌍 Global Engagement & Gender"],
+        SECTIONS["times"],
+        index=section_index(SECTIONS["times"], "times"),
         horizontal=True, key="times_section"
     )
 
     if section == "📖 Teaching":
-        teaching_data = times_filtered_tab[["Year", "IPEDS_Name", "Teaching"]]
+        teaching_data = times_filtered_tab[["Year", "IPEDS_Name", "Teaching", "Teaching_pct"]]
         plot_chart_sorted(
             df=teaching_data,
             metric_col="Teaching",
             title_label="📖 Teaching (29.5%)",
             description="Quality of learning environment via teaching reputation and staff ratios",
             color_map=color_map,
+            distributions=times_distributions,
+            forecasts=times_forecasts,
+            coverage=coverage_maps["TIMES"],
         )
 
     elif section == "🔬 Research Performance":
         col1, col2 = st.columns(2)
         with col1:
-            rq_data = times_filtered_tab[["Year", "IPEDS_Name", "Research_Quality"]]
+            rq_data = times_filtered_tab[["Year", "IPEDS_Name", "Research_Quality", "Research_Quality_pct"]]
             plot_chart_sorted(
                 df=rq_data,
                 metric_col="Research_Quality",
                 title_label="🔬 Research Quality (30%)",
                 description="Research excellence through citation impact and scholarly influence",
                 color_map=color_map,
+                distributions=times_distributions,
+                forecasts=times_forecasts,
+                coverage=coverage_maps["TIMES"],
             )
         with col2:
-            re_data = times_filtered_tab[["Year", "IPEDS_Name", "Research_Environment"]]
+            re_data = times_filtered_tab[["Year", "IPEDS_Name", "Research_Environment", "Research_Environment_pct"]]
             plot_chart_sorted(
                 df=re_data,
                 metric_col="Research_Environment",
                 title_label="🏛️ Research Environment (29%)",
                 description="Research funding, reputation, and output volume",
                 color_map=color_map,
+                distributions=times_distributions,
+                forecasts=times_forecasts,
+                coverage=coverage_maps["TIMES"],
             )
 
     elif section == "🌍 Global Engagement & Gender":
         col1, col2 = st.columns(2)
         with col1:
-            intl_data = times_filtered_tab[["Year", "IPEDS_Name", "International_Outlook"]]
+            intl_data = times_filtered_tab[["Year", "IPEDS_Name", "International_Outlook", "International_Outlook_pct"]]
             plot_chart_sorted(
                 df=intl_data,
                 metric_col="International_Outlook",
                 title_label="🌍 International Outlook (7.5%)",
                 description="Global faculty, international students, and collaboration strength",
                 color_map=color_map,
+                distributions=times_distributions,
+                forecasts=times_forecasts,
+                coverage=coverage_maps["TIMES"],
             )
         with col2:
-            industry_data = times_filtered_tab[["Year", "IPEDS_Name", "Industry"]]
+            industry_data = times_filtered_tab[["Year", "IPEDS_Name", "Industry", "Industry_pct"]]
             plot_chart_sorted(
                 df=industry_data,
                 metric_col="Industry",
                 title_label="🏢 Industry Income (4%)",
                 description="Ability to attract industry-sponsored research income",
                 color_map=color_map,
+                distributions=times_distributions,
+                forecasts=times_forecasts,
+                coverage=coverage_maps["TIMES"],
             )
 
         gender_data = times_filtered_tab[["Year", "IPEDS_Name", "Male_Ratio", "Female_Ratio"]]
-        gender_melted = gender_data.melt(
-            id_vars=["Year", "IPEDS_Name"],
-            value_vars=["Male_Ratio", "Female_Ratio"],
-            var_name="Gender",
-            value_name="Percentage"
-        )
-        gender_melted["Year"] = gender_melted["Year"].astype(str)
-
-        fig = px.bar(
-            gender_melted,
-            x="Year",
-            y="Percentage",
-            color="Gender",
-            barmode="group",
-            facet_col="IPEDS_Name",
-            color_discrete_map={
-                "Male_Ratio": "#E10600",
-                "Female_Ratio": "#1F77B4"
-            },
-            text="Percentage",
-            title="👥 Gender Distribution"
-        )
-        fig.for_each_annotation(lambda a: a.update(text=a.text.split("=")[-1] if "=" in a.text else ""))
-        fig.update_traces(textposition="inside", insidetextanchor="middle", textfont_size=10)
-        fig.update_layout(
-            height=450,
-            margin=dict(t=30, b=20, l=30, r=30),
-            title_font=dict(size=15, color="#333"),
-            title_x=0.0,
-            xaxis_title="Year",
-            yaxis_title="Percentage",
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=-0.35,
-                xanchor="center",
-                x=0.5,
-                font=dict(size=9),
-                bgcolor='rgba(0,0,0,0)',
-                title_text=None
-            )
+        gender_chart = st.empty()
+        figure_pipeline.submit(
+            "👥 Gender Distribution",
+            lambda data=gender_data: build_gender_figure(data, tenant_key),
+            lambda fig, chart=gender_chart: chart.plotly_chart(fig, use_container_width=True),
         )
-        st.plotly_chart(fig, use_container_width=True)
 
         st.markdown("""
             <div style='text-align:center; font-size:0.85rem; font-weight:bold; color:#555; margin-top:4px; margin-bottom:8px;'>
@@ -743,6 +1065,12 @@ with tabs[1]:
             </div>
         """, unsafe_allow_html=True)
 
+    elif section == "🧪 What-If Weights":
+        render_weight_simulator("TIMES", "times", get_pillar_matrices(times_df, "TIMES", data_version), final_times_unis, color_map)
+
+    elif section == "🎯 Gap to Target":
+        render_gap_panel("TIMES", "times", get_score_indexes(times_df, "TIMES", data_version), final_times_unis, color_map)
+
     # Methodology Link for TIMES Tab
     st.markdown("""
         <div class='methodology-link'>
@@ -753,15 +1081,22 @@ with tabs[1]:
 with tabs[2]:
     st.markdown("<h2 style='text-align: center; color: #4B4B4B;'>QS Ranking</h2>", unsafe_allow_html=True)
 
-    qs_options = list(dict.fromkeys(all_selected_unis + extra_qs_unis))
+    # Seed this session's manual picks from the URL on first render
+    if "manual_qs_selected_unis" not in st.session_state:
+        st.session_state["manual_qs_selected_unis"] = [u for u in view_state["qs"] if u in all_selected_unis or u in extra_qs_unis]
 
     manual_qs_selected_unis = st.session_state.get("manual_qs_selected_unis", [])
 
-    merged_selected_unis = list(set(all_selected_unis + manual_qs_selected_unis))
+    merged_selected_unis = sorted(set(all_selected_unis + manual_qs_selected_unis))
+
+    # Earlier picks stay listed (flagged) even when the selected years have no data for them;
+    # the rest of the list is the search box's top matches, never every institution
+    qs_options = search_options("Search QS institutions", "qs", extra_qs_unis, merged_selected_unis)
 
     current_qs_selected_unis = st.multiselect(
-        "🔎 Select universities to compare with NJIT:",
+        f"🔎 Select universities to compare with {tenant.short_name}:",
         options=qs_options,
+        format_func=lambda uni: option_label(uni, "QS"),
         default=merged_selected_unis,
         key="qs_optional_unis"
     )
@@ -770,98 +1105,99 @@ with tabs[2]:
         uni for uni in current_qs_selected_unis if uni not in all_selected_unis
     ]
 
-    final_qs_unis = [NJIT_NAME] + current_qs_selected_unis
+    final_qs_unis = [FOCAL_NAME] + current_qs_selected_unis
 
-    color_map = create_color_map(final_qs_unis)
+    color_map = create_color_map(final_qs_unis, FOCAL_NAME)
 
     #Filter Data 
-    qs_filtered_tab = qs_df[
-        (qs_df["Year"].isin(selected_years)) &
-        (qs_df["IPEDS_Name"].isin(final_qs_unis))
-    ]
+    qs_filtered_tab = get_tab_frame(query_backend, "QS", data_version, tenant_key, tuple(sorted(final_qs_unis)), selected_years_key)
 
     latest_qs_year = max([y for y in selected_years if y in qs_filtered_tab["Year"].unique()], default=None)
 
     #KPI Metrics 
-    kpi_metrics = {
-        "QS_Rank": "🏅 QS Rank",
-        "Overall_Score": "📊 Overall Score",
-        "Academic_Reputation": "🎓 Academic Reputation",
-        "Employer_Reputation": "🏢 Employer Reputation",
-        "Citations_per_Faculty": "📖 Citations/Faculty",
-        "Faculty_Student_Ratio": "👩‍🏫 Faculty-Student Ratio",
-        "Employment_Outcomes": "💼 Employment Outcomes",
-        "Sustainability_Score": "🌱 Sustainability Score"
-    }
-
-    kpi_keys = list(kpi_metrics.keys())
-    for i in range(0, len(kpi_keys), 4):
-        row = st.columns(4)
-        for j in range(4):
-            if i + j < len(kpi_keys):
-                col_key = kpi_keys[i + j]
-                label = kpi_metrics[col_key] + (f" ({latest_qs_year})" if latest_qs_year else "")
-                
-                kpi_html = f"<h4>{label}</h4>"
-                if latest_qs_year:
-                    kpi_row = qs_filtered_tab[qs_filtered_tab["Year"] == latest_qs_year]
-                    for uni in final_qs_unis:
-                        val = get_metric_value(kpi_row, uni, col_key)
-                        kpi_html += f"<div class='kpi-value' style='color:{color_map.get(uni)}'>{uni}: {val}</div>"
-                
-                with row[j]:
-                    st.markdown(f"<div class='kpi-box'>{kpi_html}</div>", unsafe_allow_html=True)
+    kpi_metrics = KPI_METRICS["QS"]
+    kpi_values = get_kpi_values(query_backend, "QS", data_version, tenant_key, tuple(final_qs_unis), latest_qs_year, tuple(kpi_metrics)) if latest_qs_year else {}
+    render_kpi_boxes(kpi_metrics, kpi_values, latest_qs_year, color_map, coverage_maps["QS"])
+    render_export_buttons("QS", "qs", final_qs_unis, latest_qs_year, tuple(kpi_metrics))
 
     st.divider()
 
+    show_all_qs = st.toggle(
+        "🌐 Show all institutions",
+        value=view_state["qs_all"],
+        key="qs_show_all",
+        help="Overlay the selected universities on the per-year distribution of every QS-ranked institution"
+    )
+    qs_distributions = get_metric_distributions(qs_df, "QS", data_version) if show_all_qs else None
+    qs_forecasts = get_forecasts(qs_df, "QS", data_version) if show_forecast else None
+
     chart_selection = st.radio(
         "Choose QS Section",
-        ["🎓 Research & Learning", "🌍 Global Engagement"],
+        SECTIONS["qs"],
+        index=section_index(SECTIONS["qs"], "qs"),
         horizontal=True, key="qs_section"
     )
 
     if chart_selection.startswith("🎓"):
         col1, col2 = st.columns(2)
         with col1:
-            ar_data = qs_filtered_tab[["Year", "IPEDS_Name", "Academic_Reputation"]]
+            ar_data = qs_filtered_tab[["Year", "IPEDS_Name", "Academic_Reputation", "Academic_Reputation_pct"]]
             plot_chart_sorted(
                 df=ar_data,
                 metric_col="Academic_Reputation",
                 title_label="🎓 Academic Reputation (30%)",
                 description="Global survey of academic prestige.",
                 color_map=color_map,
+                distributions=qs_distributions,
+                forecasts=qs_forecasts,
+                coverage=coverage_maps["QS"],
             )
         with col2:
-            citations_data = qs_filtered_tab[["Year", "IPEDS_Name", "Citations_per_Faculty"]]
+            citations_data = qs_filtered_tab[["Year", "IPEDS_Name", "Citations_per_Faculty", "Citations_per_Faculty_pct"]]
             plot_chart_sorted(
                 df=citations_data,
                 metric_col="Citations_per_Faculty",
                 title_label="📖 Citations per Faculty (20%)",
                 description="Research strength via faculty citation rates",
                 color_map=color_map,
+                distributions=qs_distributions,
+                forecasts=qs_forecasts,
+                coverage=coverage_maps["QS"],
             )
 
     elif chart_selection.startswith("🌍"):
         col1, col2 = st.columns(2)
         with col1:
-            intl_student_data = qs_filtered_tab[["Year", "IPEDS_Name", "International_Student_Ratio"]]
+            intl_student_data = qs_filtered_tab[["Year", "IPEDS_Name", "International_Student_Ratio", "International_Student_Ratio_pct"]]
             plot_chart_sorted(
                 df=intl_student_data,
                 metric_col="International_Student_Ratio",
                 title_label="🌎 International Student Ratio (5%)",
                 description="Global student diversity at the institution",
                 color_map=color_map,
+                distributions=qs_distributions,
+                forecasts=qs_forecasts,
+                coverage=coverage_maps["QS"],
             )
         with col2:
-            intl_faculty_data = qs_filtered_tab[["Year", "IPEDS_Name", "International_Faculty_Ratio"]]
+            intl_faculty_data = qs_filtered_tab[["Year", "IPEDS_Name", "International_Faculty_Ratio", "International_Faculty_Ratio_pct"]]
             plot_chart_sorted(
                 df=intl_faculty_data,
                 metric_col="International_Faculty_Ratio",
                 title_label="👩‍🏫 International Faculty Ratio (5%)",
                 description="International diversity of faculty members",
                 color_map=color_map,
+                distributions=qs_distributions,
+                forecasts=qs_forecasts,
+                coverage=coverage_maps["QS"],
             )
 
+    elif chart_selection == "🧪 What-If Weights":
+        render_weight_simulator("QS", "qs", get_pillar_matrices(qs_df, "QS", data_version), final_qs_unis, color_map)
+
+    elif chart_selection == "🎯 Gap to Target":
+        render_gap_panel("QS", "qs", get_score_indexes(qs_df, "QS", data_version), final_qs_unis, color_map)
+
     # Methodology Link for QS Tab
     st.markdown("""
         <div class='methodology-link'>
@@ -872,15 +1208,22 @@ with tabs[2]:
 with tabs[3]:
     st.markdown("<h2 style='text-align: center; color: #4B4B4B;'>USN Ranking</h2>", unsafe_allow_html=True)
 
-    usn_options = list(dict.fromkeys(all_selected_unis + extra_usn_unis))
+    # Seed this session's manual picks from the URL on first render
+    if "manual_usn_selected_unis" not in st.session_state:
+        st.session_state["manual_usn_selected_unis"] = [u for u in view_state["usn"] if u in all_selected_unis or u in extra_usn_unis]
 
     manual_usn_selected_unis = st.session_state.get("manual_usn_selected_unis", [])
 
-    merged_selected_unis = list(set(all_selected_unis + manual_usn_selected_unis))
+    merged_selected_unis = sorted(set(all_selected_unis + manual_usn_selected_unis))
+
+    # Earlier picks stay listed (flagged) even when the selected years have no data for them;
+    # the rest of the list is the search box's top matches, never every institution
+    usn_options = search_options("Search USN institutions", "usn", extra_usn_unis, merged_selected_unis)
 
     current_usn_selected_unis = st.multiselect(
-        "🔎 Select universities to compare with NJIT:",
+        f"🔎 Select universities to compare with {tenant.short_name}:",
         options=usn_options,
+        format_func=lambda uni: option_label(uni, "USN"),
         default=merged_selected_unis,
         key="usn_optional_unis"
     )
@@ -889,51 +1232,34 @@ with tabs[3]:
         uni for uni in current_usn_selected_unis if uni not in all_selected_unis
     ]
 
-    final_usn_unis = [NJIT_NAME] + current_usn_selected_unis
+    final_usn_unis = [FOCAL_NAME] + current_usn_selected_unis
 
-    color_map = create_color_map(final_usn_unis)
+    color_map = create_color_map(final_usn_unis, FOCAL_NAME)
 
-    usn_filtered_tab = usn_df[
-        (usn_df["Year"].isin(selected_years)) &
-        (usn_df["IPEDS_Name"].isin(final_usn_unis))
-    ]
+    usn_filtered_tab = get_tab_frame(query_backend, "USN", data_version, tenant_key, tuple(sorted(final_usn_unis)), selected_years_key)
     
     latest_usn_year = max([y for y in selected_years if y in usn_filtered_tab["Year"].unique()], default=None)
     
-    kpi_metrics = {
-    "Rank": "🏅 USN_Rank",
-    "Peer_assessment_score": "🤝 Peer Assessment",
-    "Actual_graduation_rate": "🎓 Graduation Rate", 
-    "Average_first_year_retention_rate": "📚 First-Year Retention",
-    "Faculty_resources_rank": "🏫 Faculty Resources Rank",
-    "Financial_resources_rank": "💰 Financial Resources Rank",
-    "Pell_Graduation_Rate": "🎓 Pell Grad Rate",
-    "College_grad_income_benefit_(%)": "💼 Income Benefit"
-}
-
-    kpi_keys = list(kpi_metrics.keys())
-    for i in range(0, len(kpi_keys), 4):
-        row = st.columns(4)
-        for j in range(4):
-            if i + j < len(kpi_keys):
-                col_key = kpi_keys[i + j]
-                label = kpi_metrics[col_key] + (f" ({latest_usn_year})" if latest_usn_year else "")
-                
-                kpi_html = f"<h4>{label}</h4>"
-                if latest_usn_year:
-                    kpi_row = usn_filtered_tab[usn_filtered_tab["Year"] == latest_usn_year]
-                    for uni in final_usn_unis:
-                        val = get_metric_value(kpi_row, uni, col_key)
-                        kpi_html += f"<div class='kpi-value' style='color:{color_map.get(uni)}'>{uni}: {val}</div>"
-                
-                with row[j]:
-                    st.markdown(f"<div class='kpi-box'>{kpi_html}</div>", unsafe_allow_html=True)
+    kpi_metrics = KPI_METRICS["USN"]
+    kpi_values = get_kpi_values(query_backend, "USN", data_version, tenant_key, tuple(final_usn_unis), latest_usn_year, tuple(kpi_metrics)) if latest_usn_year else {}
+    render_kpi_boxes(kpi_metrics, kpi_values, latest_usn_year, color_map, coverage_maps["USN"])
+    render_export_buttons("USN", "usn", final_usn_unis, latest_usn_year, tuple(kpi_metrics))
 
     st.divider()
 
+    show_all_usn = st.toggle(
+        "🌐 Show all institutions",
+        value=view_state["usn_all"],
+        key="usn_show_all",
+        help="Overlay the selected universities on the per-year distribution of every USN-ranked institution"
+    )
+    usn_distributions = get_metric_distributions(usn_df, "USN", data_version) if show_all_usn else None
+    usn_forecasts = get_forecasts(usn_df, "USN", data_version) if show_forecast else None
+
     chart_selection = st.radio(
         "Choose USN Section",
-        ["🎓 Student Success", "👩‍🏫 Faculty & Financials", "🎯 Admissions & Selectivity", "🎓 Alumni Outcomes"],
+        SECTIONS["usn"],
+        index=section_index(SECTIONS["usn"], "usn"),
         horizontal=True, key="usn_section"
     )
 
@@ -941,66 +1267,87 @@ with tabs[3]:
         col1, col2 = st.columns(2)
         with col1:
             plot_chart_sorted(
-                df=usn_filtered_tab[["Year", "IPEDS_Name", "Graduation_and_retention_rank"]],
+                df=usn_filtered_tab[["Year", "IPEDS_Name", "Graduation_and_retention_rank", "Graduation_and_retention_rank_pct"]],
                 metric_col="Graduation_and_retention_rank",
                 title_label="🎯 Graduation & Retention Rank",
                 description="Combined ranking on student graduation and retention success.",
                 color_map=color_map,
+                distributions=usn_distributions,
+                forecasts=usn_forecasts,
+                coverage=coverage_maps["USN"],
             )
         with col2:
             plot_chart_sorted(
-                df=usn_filtered_tab[["Year", "IPEDS_Name", "Pell_Graduation_Rate"]],
+                df=usn_filtered_tab[["Year", "IPEDS_Name", "Pell_Graduation_Rate", "Pell_Graduation_Rate_pct"]],
                 metric_col="Pell_Graduation_Rate",
                 title_label="🎓 Pell Graduation Rate",
                 description="Graduation rate of low-income Pell Grant students.",
                 color_map=color_map,
+                distributions=usn_distributions,
+                forecasts=usn_forecasts,
+                coverage=coverage_maps["USN"],
             )
 
     elif chart_selection == "👩‍🏫 Faculty & Financials":
         col1, col2 = st.columns(2)
         with col1:
             plot_chart_sorted(
-                df=usn_filtered_tab[["Year", "IPEDS_Name", "Percent_of_full-time_faculty"]],
+                df=usn_filtered_tab[["Year", "IPEDS_Name", "Percent_of_full-time_faculty", "Percent_of_full-time_faculty_pct"]],
                 metric_col="Percent_of_full-time_faculty",
                 title_label="👩‍🏫 % Full-Time Faculty",
                 description="Ratio of full-time instructional faculty.",
                 color_map=color_map,
+                distributions=usn_distributions,
+                forecasts=usn_forecasts,
+                coverage=coverage_maps["USN"],
             )
         with col2:
             plot_chart_sorted(
-                df=usn_filtered_tab[["Year", "IPEDS_Name", "Faculty_resources_rank"]],
+                df=usn_filtered_tab[["Year", "IPEDS_Name", "Faculty_resources_rank", "Faculty_resources_rank_pct"]],
                 metric_col="Faculty_resources_rank",
                 title_label="🏛️ Faculty Resources Rank",
                 description="Ranking based on class size, salary, and staff ratios.",
                 color_map=color_map,
+                distributions=usn_distributions,
+                forecasts=usn_forecasts,
+                coverage=coverage_maps["USN"],
             )
 
     elif chart_selection == "🎯 Admissions & Selectivity":
         col1, col2 = st.columns(2)
         with col1:
             plot_chart_sorted(
-                df=usn_filtered_tab[["Year", "IPEDS_Name", "Top_10%_of_HS_Class"]],
+                df=usn_filtered_tab[["Year", "IPEDS_Name", "Top_10%_of_HS_Class", "Top_10%_of_HS_Class_pct"]],
                 metric_col="Top_10%_of_HS_Class",
                 title_label="📘 Top 10% HS Class",
                 description="Percentage of students in top decile of their class.",
                 color_map=color_map,
+                distributions=usn_distributions,
+                forecasts=usn_forecasts,
+                coverage=coverage_maps["USN"],
             )
         with col2:
             plot_chart_sorted(
-                df=usn_filtered_tab[["Year", "IPEDS_Name", "%_students_submitting_SAT_scores"]],
+                df=usn_filtered_tab[["Year", "IPEDS_Name", "%_students_submitting_SAT_scores", "%_students_submitting_SAT_scores_pct"]],
                 metric_col="%_students_submitting_SAT_scores",
                 title_label="📝 % Submitted SAT",
                 description="SAT submission ratio indicating selectivity.",
                 color_map=color_map,
+                distributions=usn_distributions,
+                forecasts=usn_forecasts,
+                coverage=coverage_maps["USN"],
             )
 
     elif chart_selection == "🎓 Alumni Outcomes":
         plot_chart_sorted(
-            df=usn_filtered_tab[["Year", "IPEDS_Name", "Alumni_Giving"]],
+            df=usn_filtered_tab[["Year", "IPEDS_Name", "Alumni_Giving", "Alumni_Giving_pct"]],
             metric_col="Alumni_Giving",
             title_label="🎓 Alumni Giving Rate",
             description="Measures alumni engagement through donations.",
             color_map=color_map,
+            distributions=usn_distributions,
+            forecasts=usn_forecasts,
+            coverage=coverage_maps["USN"],
         )
 
     # Methodology Link for USN Tab
@@ -1013,15 +1360,22 @@ with tabs[3]:
 with tabs[4]:
     st.markdown("<h2 style='text-align: center; color: #4B4B4B;'>Washington Ranking</h2>", unsafe_allow_html=True)
 
-    washington_options = list(dict.fromkeys(all_selected_unis + extra_washington_unis))
+    # Seed this session's manual picks from the URL on first render
+    if "manual_washington_selected_unis" not in st.session_state:
+        st.session_state["manual_washington_selected_unis"] = [u for u in view_state["washington"] if u in all_selected_unis or u in extra_washington_unis]
 
     manual_washington_selected_unis = st.session_state.get("manual_washington_selected_unis", [])
 
-    merged_selected_unis = list(set(all_selected_unis + manual_washington_selected_unis))
+    merged_selected_unis = sorted(set(all_selected_unis + manual_washington_selected_unis))
+
+    # Earlier picks stay listed (flagged) even when the selected years have no data for them;
+    # the rest of the list is the search box's top matches, never every institution
+    washington_options = search_options("Search Washington institutions", "washington", extra_washington_unis, merged_selected_unis)
 
     current_washington_selected_unis = st.multiselect(
-        "🔎 Select universities to compare with NJIT:",
+        f"🔎 Select universities to compare with {tenant.short_name}:",
         options=washington_options,
+        format_func=lambda uni: option_label(uni, "Washington"),
         default=merged_selected_unis,
         key="washington_optional_unis"
     )
@@ -1030,51 +1384,34 @@ with tabs[4]:
         uni for uni in current_washington_selected_unis if uni not in all_selected_unis
     ]
 
-    final_washington_unis = [NJIT_NAME] + current_washington_selected_unis
+    final_washington_unis = [FOCAL_NAME] + current_washington_selected_unis
 
-    color_map = create_color_map(final_washington_unis)
+    color_map = create_color_map(final_washington_unis, FOCAL_NAME)
 
-    washington_filtered_tab = washington_df[
-        (washington_df["Year"].isin(selected_years)) &
-        (washington_df["IPEDS_Name"].isin(final_washington_unis))
-    ]
+    washington_filtered_tab = get_tab_frame(query_backend, "Washington", data_version, tenant_key, tuple(sorted(final_washington_unis)), selected_years_key)
 
     latest_wash_year = max([y for y in selected_years if y in washington_filtered_tab["Year"].unique()], default=None)
     
-    kpi_metrics = {
-    "Washington_Rank": "🏅 Washington_Rank",
-    "8-year_graduation_rate": "🎓 8-Year_Graduation_Rate",
-    "Pell/non-Pell_graduation_gap": "📚 Pell_vs_Non-Pell_Grad_Gap",
-    "Affordability_rank": "💸 Affordability_Rank",  
-    "Earnings_after_9_years": "💼 Earnings_after_9_years",
-    "Service-oriented_majors_%": "🔬 Service-Oriented_Majors_%",  
-    "Work-study_service_%": "🎓 Work-Study_Service %",  
-    "Net_price_rank": "🏆 Net_Price_Rank"
-    }
-
-    kpi_keys = list(kpi_metrics.keys())
-    for i in range(0, len(kpi_keys), 4):
-        row = st.columns(4)
-        for j in range(4):
-            if i + j < len(kpi_keys):
-                col_key = kpi_keys[i + j]
-                label = kpi_metrics[col_key] + (f" ({latest_wash_year})" if latest_wash_year else "")
-                
-                kpi_html = f"<h4>{label}</h4>"
-                if latest_wash_year:
-                    kpi_row = washington_filtered_tab[washington_filtered_tab["Year"] == latest_wash_year]
-                    for uni in final_washington_unis:
-                        val = get_metric_value(kpi_row, uni, col_key)
-                        kpi_html += f"<div class='kpi-value' style='color:{color_map.get(uni)}'>{uni}: {val}</div>"
-                
-                with row[j]:
-                    st.markdown(f"<div class='kpi-box'>{kpi_html}</div>", unsafe_allow_html=True)
+    kpi_metrics = KPI_METRICS["Washington"]
+    kpi_values = get_kpi_values(query_backend, "Washington", data_version, tenant_key, tuple(final_washington_unis), latest_wash_year, tuple(kpi_metrics)) if latest_wash_year else {}
+    render_kpi_boxes(kpi_metrics, kpi_values, latest_wash_year, color_map, coverage_maps["Washington"])
+    render_export_buttons("Washington", "washington", final_washington_unis, latest_wash_year, tuple(kpi_metrics))
     
     st.divider()
 
+    show_all_washington = st.toggle(
+        "🌐 Show all institutions",
+        value=view_state["washington_all"],
+        key="washington_show_all",
+        help="Overlay the selected universities on the per-year distribution of every Washington-ranked institution"
+    )
+    washington_distributions = get_metric_distributions(washington_df, "Washington", data_version) if show_all_washington else None
+    washington_forecasts = get_forecasts(washington_df, "Washington", data_version) if show_forecast else None
+
     chart_selection = st.radio(
         "Choose Washington Monthly Section",
-        ["📊 Social Mobility", "🔬 Research", "🤝 Service"],
+        SECTIONS["washington"],
+        index=section_index(SECTIONS["washington"], "washington"),
         horizontal=True, key="washington_section"
     )
 
@@ -1082,111 +1419,147 @@ with tabs[4]:
         col1, col2 = st.columns(2)
         with col1:
             plot_chart_sorted(
-                df=washington_filtered_tab[["Year", "IPEDS_Name", "8-year_graduation_rate"]],
+                df=washington_filtered_tab[["Year", "IPEDS_Name", "8-year_graduation_rate", "8-year_graduation_rate_pct"]],
                 metric_col="8-year_graduation_rate",
                 title_label="🎓 8-Year Graduation Rate",
                 description="Percentage of students graduating within 8 years",
                 color_map=color_map,
+                distributions=washington_distributions,
+                forecasts=washington_forecasts,
+                coverage=coverage_maps["Washington"],
             )
         with col2:
             plot_chart_sorted(
-                df=washington_filtered_tab[["Year", "IPEDS_Name", "Pell/non-Pell_graduation_gap"]],
+                df=washington_filtered_tab[["Year", "IPEDS_Name", "Pell/non-Pell_graduation_gap", "Pell/non-Pell_graduation_gap_pct"]],
                 metric_col="Pell/non-Pell_graduation_gap",
                 title_label="📚 Pell vs Non-Pell Grad Gap",
                 description="Gap in graduation rates between Pell and non-Pell students",
                 color_map=color_map,
+                distributions=washington_distributions,
+                forecasts=washington_forecasts,
+                coverage=coverage_maps["Washington"],
             )
         st.divider()
         col1, col2 = st.columns(2)
         with col1:
             plot_chart_sorted(
-                df=washington_filtered_tab[["Year", "IPEDS_Name", "Actual_vs._predicted_Pell_enrollment"]],
+                df=washington_filtered_tab[["Year", "IPEDS_Name", "Actual_vs._predicted_Pell_enrollment", "Actual_vs._predicted_Pell_enrollment_pct"]],
                 metric_col="Actual_vs._predicted_Pell_enrollment",
                 title_label="📈 Pell Enrollment Performance",
                 description="Difference between actual and predicted Pell student enrollment",
                 color_map=color_map,
+                distributions=washington_distributions,
+                forecasts=washington_forecasts,
+                coverage=coverage_maps["Washington"],
             )
         with col2:
             plot_chart_sorted(
-                df=washington_filtered_tab[["Year", "IPEDS_Name", "Net_price_of_attendance_for_families_below_$75,000_income"]],
+                df=washington_filtered_tab[["Year", "IPEDS_Name", "Net_price_of_attendance_for_families_below_$75,000_income", "Net_price_of_attendance_for_families_below_$75,000_income_pct"]],
                 metric_col="Net_price_of_attendance_for_families_below_$75,000_income",
                 title_label="💸 Net Price for <$75k Income",
                 description="Average net price for low-income families",
                 color_map=color_map,
+                distributions=washington_distributions,
+                forecasts=washington_forecasts,
+                coverage=coverage_maps["Washington"],
             )
 
     elif chart_selection == "🔬 Research":
         col1, col2 = st.columns(2)
         with col1:
             plot_chart_sorted(
-                df=washington_filtered_tab[["Year", "IPEDS_Name", "Research_expenditures_(M)"]],
+                df=washington_filtered_tab[["Year", "IPEDS_Name", "Research_expenditures_(M)", "Research_expenditures_(M)_pct"]],
                 metric_col="Research_expenditures_(M)",
                 title_label="🔬 Research Expenditures (M$)",
                 description="Total institutional research spending in millions",
                 color_map=color_map,
+                distributions=washington_distributions,
+                forecasts=washington_forecasts,
+                coverage=coverage_maps["Washington"],
             )
         with col2:
             plot_chart_sorted(
-                df=washington_filtered_tab[["Year", "IPEDS_Name", "Science_&_engineering_PhDs_awarded"]],
+                df=washington_filtered_tab[["Year", "IPEDS_Name", "Science_&_engineering_PhDs_awarded", "Science_&_engineering_PhDs_awarded_pct"]],
                 metric_col="Science_&_engineering_PhDs_awarded",
                 title_label="🎓 S&E PhDs Awarded",
                 description="Number of science and engineering PhDs awarded",
                 color_map=color_map,
+                distributions=washington_distributions,
+                forecasts=washington_forecasts,
+                coverage=coverage_maps["Washington"],
             )
         st.divider()
         col1, col2 = st.columns(2)
         with col1:
             plot_chart_sorted(
-                df=washington_filtered_tab[["Year", "IPEDS_Name", "Bachelor's_to_PhD_rank"]],
+                df=washington_filtered_tab[["Year", "IPEDS_Name", "Bachelor's_to_PhD_rank", "Bachelor's_to_PhD_rank_pct"]],
                 metric_col="Bachelor's_to_PhD_rank",
                 title_label="🎓 Alumni Earning PhDs",
                 description="Rank of undergraduate alumni earning PhDs relative to size",
                 color_map=color_map,
+                distributions=washington_distributions,
+                forecasts=washington_forecasts,
+                coverage=coverage_maps["Washington"],
             )
         with col2:
             plot_chart_sorted(
-                df=washington_filtered_tab[["Year", "IPEDS_Name", "Faculty_receiving_significant_awards"]],
+                df=washington_filtered_tab[["Year", "IPEDS_Name", "Faculty_receiving_significant_awards", "Faculty_receiving_significant_awards_pct"]],
                 metric_col="Faculty_receiving_significant_awards",
                 title_label="🏆 Faculty Awards",
                 description="Number of faculty receiving prestigious awards",
                 color_map=color_map,
+                distributions=washington_distributions,
+                forecasts=washington_forecasts,
+                coverage=coverage_maps["Washington"],
             )
 
     elif chart_selection == "🤝 Service":
         col1, col2 = st.columns(2)
         with col1:
             plot_chart_sorted(
-                df=washington_filtered_tab[["Year", "IPEDS_Name", "Work-study_service_%"]],
+                df=washington_filtered_tab[["Year", "IPEDS_Name", "Work-study_service_%", "Work-study_service_%_pct"]],
                 metric_col="Work-study_service_%",
                 title_label="🧰 Fed Work-Study for Service",
                 description="Percentage of work-study funds spent on service",
                 color_map=color_map,
+                distributions=washington_distributions,
+                forecasts=washington_forecasts,
+                coverage=coverage_maps["Washington"],
             )
         with col2:
             plot_chart_sorted(
-                df=washington_filtered_tab[["Year", "IPEDS_Name", "Service-oriented_majors_%"]],
+                df=washington_filtered_tab[["Year", "IPEDS_Name", "Service-oriented_majors_%", "Service-oriented_majors_%_pct"]],
                 metric_col="Service-oriented_majors_%",
                 title_label="📘 Service-Oriented Majors",
                 description="% of students graduating in service-oriented disciplines",
                 color_map=color_map,
+                distributions=washington_distributions,
+                forecasts=washington_forecasts,
+                coverage=coverage_maps["Washington"],
             )
         st.divider()
         col1, col2 = st.columns(2)
         with col1:
             plot_chart_sorted(
-                df=washington_filtered_tab[["Year", "IPEDS_Name", "AmeriCorps/Peace_Corps_rank"]],
+                df=washington_filtered_tab[["Year", "IPEDS_Name", "AmeriCorps/Peace_Corps_rank", "AmeriCorps/Peace_Corps_rank_pct"]],
                 metric_col="AmeriCorps/Peace_Corps_rank",
                 title_label="🌍 AmeriCorps/Peace Corps",
                 description="Rank of participation in AmeriCorps and Peace Corps programs",
                 color_map=color_map,
+                distributions=washington_distributions,
+                forecasts=washington_forecasts,
+                coverage=coverage_maps["Washington"],
             )
         with col2:
             plot_chart_sorted(
-                df=washington_filtered_tab[["Year", "IPEDS_Name", "ROTC_rank"]],
+                df=washington_filtered_tab[["Year", "IPEDS_Name", "ROTC_rank", "ROTC_rank_pct"]],
                 metric_col="ROTC_rank",
                 title_label="🎖️ ROTC Program",
                 description="Rank of ROTC program size relative to enrollment",
                 color_map=color_map,
+                distributions=washington_distributions,
+                forecasts=washington_forecasts,
+                coverage=coverage_maps["Washington"],
             )
 
     # Methodology Link for Washington Tab
@@ -1194,4 +1567,165 @@ with tabs[4]:
         <div class='methodology-link'>
             📚 <a href='#https://washingtonmonthly.com/2024/08/25/a-note-on-methodology-four-year-colleges-and-universities/' target='_blank'>Washington Monthly Methodology</a>
         </div>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+    """, unsafe_allow_html=True)
+
+with tabs[5]:
+    st.markdown("<h2 style='text-align: center; color: #4B4B4B;'>Across Agencies</h2>", unsafe_allow_html=True)
+
+    # Starts from the sidebar selection; the picker then keeps this session's own list
+    cross_pinned = list(st.session_state.get("cross_unis", [FOCAL_NAME] + all_selected_unis))
+    st.session_state["cross_unis"] = cross_pinned
+    cross_options = search_options("Search institutions", "cross", sorted(name_index.names), cross_pinned)
+    cross_unis = st.multiselect("🔎 Institutions to follow across TIMES, QS, USN and Washington:", cross_options, key="cross_unis")
+
+    # One positional slice of the panel aligned at load time, instead of filtering four tables
+    cross_rows = panel_slice(dataset.panel, cross_unis, selected_years_key)
+    if cross_rows.empty:
+        st.info("No rankings for the selected institutions and years.")
+    else:
+        color_map = create_color_map(cross_unis, FOCAL_NAME)
+        col1, col2 = st.columns(2)
+        for col, field, title in [(col1, "Rank_mid", "Rank by agency"), (col2, "Score", "Overall score by agency")]:
+            figure_pipeline.submit(
+                title,
+                lambda field=field, title=title, color_map=color_map:
+                    build_cross_agency_figure(cross_rows, field, title, color_map, tenant_key),
+                lambda fig, chart=col.empty(): chart.plotly_chart(fig, use_container_width=True),
+            )
+        st.markdown(
+            "<div style='text-align:center; font-size:0.85rem; margin-top:-5px;'>"
+            "Rank bands are drawn at their midpoint. Washington Monthly publishes no overall score.</div>",
+            unsafe_allow_html=True
+        )
+        with st.expander("📋 Published ranks"):
+            st.dataframe(cross_rows.xs("Rank", level="Field", axis=1), use_container_width=True)
+
+CORRELATION_PAIR_ROWS = 15  # rows of the strongest-pairs table
+# Scatter shown until a pair is picked: reputation surveys of two agencies
+DEFAULT_CORRELATION_PAIR = [("USN", "Peer_assessment_score"), ("QS", "Academic_Reputation")]
+
+with tabs[6]:
+    st.markdown("<h2 style='text-align: center; color: #4B4B4B;'>Metric Correlations</h2>", unsafe_allow_html=True)
+
+    # Computed once per data version for every year, over every institution an agency published
+    correlations = get_correlations(dataset.panel, data_version)
+    corr_years = [y for y in sorted(correlations) if y in selected_years_key] or sorted(correlations)
+    if st.session_state.get("corr_year") not in corr_years:
+        st.session_state["corr_year"] = corr_years[-1]
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        corr_year = st.selectbox("Year", corr_years, key="corr_year")
+    with col2:
+        corr_method = st.radio("Method", ["Spearman", "Pearson"], horizontal=True, key="corr_method")
+    with col3:
+        corr_across = st.toggle("Only pairs across agencies", value=True, key="corr_across")
+    corr_matrices = correlations[corr_year]
+    corr_matrix = getattr(corr_matrices, corr_method.lower())
+
+    figure_pipeline.submit(
+        "Correlation matrix",
+        lambda year=corr_year, method=corr_method: build_correlation_heatmap(correlations, year, method, data_version),
+        lambda fig, chart=st.empty(): chart.plotly_chart(fig, use_container_width=True),
+    )
+    st.caption(
+        f"Pairs with fewer than {MIN_CORRELATION_PAIRS} institutions publishing both metrics are left blank. "
+        "Spearman ranks each metric once per year, so a pair covering only part of the institutions can differ "
+        "slightly from ranking that pair alone; the scatter below shows the exact value."
+    )
+
+    st.markdown("#### Strongest pairs")
+    corr_pairs = strongest_pairs(corr_matrix, corr_matrices.pairs, CORRELATION_PAIR_ROWS, corr_across)
+    pair_selection = st.dataframe(
+        corr_pairs.assign(
+            **{"Metric A": corr_pairs["Metric A"].map(metric_label), "Metric B": corr_pairs["Metric B"].map(metric_label)}
+        ).round({"r": 3}),
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key="corr_pairs"
+    )
+
+    # Click-through: a newly selected pair becomes the scatter's axes; the pickers still work on their own
+    metric_options = list(corr_matrix.index)
+    picked_rows = pair_selection.selection.rows
+    if picked_rows and picked_rows != st.session_state.get("corr_picked") and picked_rows[0] < len(corr_pairs):
+        st.session_state["corr_x"] = corr_pairs.at[picked_rows[0], "Metric A"]
+        st.session_state["corr_y"] = corr_pairs.at[picked_rows[0], "Metric B"]
+    st.session_state["corr_picked"] = picked_rows
+    for key, default, fallback in zip(["corr_x", "corr_y"], DEFAULT_CORRELATION_PAIR, metric_options[:2]):
+        if st.session_state.get(key) not in metric_options:
+            st.session_state[key] = default if default in metric_options else fallback
+
+    col1, col2 = st.columns(2)
+    with col1:
+        corr_x = st.selectbox("X axis", metric_options, format_func=metric_label, key="corr_x")
+    with col2:
+        corr_y = st.selectbox("Y axis", metric_options, format_func=metric_label, key="corr_y")
+
+    year_metrics = dataset.panel.metrics.xs(corr_year, level="Year")
+    x_label, y_label = metric_label(corr_x), metric_label(corr_y)
+    corr_points = pd.DataFrame({x_label: year_metrics[corr_x], y_label: year_metrics[corr_y]}).dropna()
+    if len(corr_points) < 2:
+        st.info("Too few institutions publish both metrics in this year.")
+    else:
+        # Exact for this pair: Spearman is Pearson on the ranks among the institutions publishing both
+        pair_values = corr_points.rank() if corr_method == "Spearman" else corr_points
+        pair_r = pair_values[x_label].corr(pair_values[y_label])
+        highlighted = [uni for uni in all_selected_unis if uni != FOCAL_NAME] + [FOCAL_NAME]
+        color_map = create_color_map(highlighted, FOCAL_NAME)
+        figure_pipeline.submit(
+            "Correlation scatter",
+            lambda color_map=color_map: build_correlation_scatter(
+                corr_points, x_label, y_label, f"{y_label} vs {x_label}, {corr_year}", color_map, FOCAL_NAME, tenant_key
+            ),
+            lambda fig, chart=st.empty(): chart.plotly_chart(fig, use_container_width=True),
+        )
+        st.markdown(
+            f"<div style='text-align:center; font-size:0.85rem; margin-top:-5px;'>"
+            f"{corr_method} r = {pair_r:.2f} over {len(corr_points)} institutions. "
+            f"{FOCAL_NAME} and the selected peers are highlighted.</div>",
+            unsafe_allow_html=True
+        )
+
+figure_timings = figure_pipeline.flush()
+if show_render_timings:
+    script_seconds, build_seconds = summarize(figure_timings)
+    with st.expander("⏱️ Render timings", expanded=True):
+        st.caption(
+            f"{len(figure_timings)} figures, built "
+            f"{f'on {RENDER_WORKERS} builder threads' if RENDER_WORKERS else 'inline'} in {build_seconds * 1000:.0f} ms; "
+            f"the script then waited for and drew them in {script_seconds * 1000:.0f} ms"
+        )
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "Figure": t.name,
+                    "Build (ms)": round(t.build_seconds * 1000, 1),
+                    "Waited (ms)": round(t.wait_seconds * 1000, 1),
+                    "Render (ms)": round(t.render_seconds * 1000, 1),
+                }
+                for t in figure_timings
+            ]),
+            hide_index=True,
+            use_container_width=True
+        )
+
+# Mirror the current view in the URL so it can be bookmarked and shared
+url_state = {
+    "tenant": [tenant_key] if tenant_key != dataset.default_tenant else [],
+    "years": [str(y) for y in selected_years_key] if list(selected_years_key) != years else [],
+    "nj": [nj_filter] if nj_filter != "All" else [],
+    "forecast": ["1"] if show_forecast else [],
+    "peers": selected_peer_types,
+    "unis": manual_selected_unis,
+}
+for key in AGENCY_URL_KEYS:
+    url_state[key] = st.session_state.get(f"manual_{key}_selected_unis", [])
+    section_label = st.session_state.get(f"{key}_section")
+    url_state[f"{key}_section"] = [section_slug(section_label)] if section_label not in (None, SECTIONS[key][0]) else []
+    url_state[f"{key}_all"] = ["1"] if st.session_state.get(f"{key}_show_all") else []
+url_state = {key: values for key, values in url_state.items() if values}
+
+if url_state != {key: st.query_params.get_all(key) for key in st.query_params}:
+    st.query_params.from_dict(url_state)
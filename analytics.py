@@ -0,0 +1,567 @@
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Columns that are identifiers, not metrics
+NON_METRIC_COLUMNS = {
+    "Year", "IPEDS_ID", "IPEDS_ID.1", "UnitID", "IPEDS_Name", "IPEDS_City", "IPEDS_State",
+    "Institution", "Institution_Name", "Name", "Location", "Country", "State", "Agency",
+    "New_Jersey_University", "Public/Private",
+}
+
+# Numeric columns that annotate other columns (footnote codes, unnamed spreadsheet columns)
+_ANNOTATION_RE = re.compile(r"footnote|_FN$|^Unnamed", re.IGNORECASE)
+
+# Suffix of the precomputed percentile-within-year column next to each metric
+PERCENTILE_SUFFIX = "_pct"
+
+_RANGE_RE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*[–-]\s*(\d+(?:\.\d+)?)\s*$")
+
+
+def _parse_number(value):
+    text = str(value).strip().replace(",", "").replace("%", "").replace("$", "").rstrip("+=")
+    match = _RANGE_RE.match(text)
+    if match:
+        return (float(match.group(1)) + float(match.group(2))) / 2
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+
+def coerce_numeric(series):
+    """Numeric view of a metric column ("7%", "7,148", "35.3–38.7" and "1001+" included)"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    values = pd.to_numeric(series, errors="coerce")
+    unparsed = values.isna() & series.notna()
+    if unparsed.any():
+        # Parse each distinct string once instead of once per row
+        uniques = series[unparsed].astype(str).unique()
+        parsed = {u: _parse_number(u) for u in uniques}
+        values = values.astype(float)
+        values[unparsed] = series[unparsed].astype(str).map(parsed)
+    return values.astype(float)
+
+
+def metric_columns(df):
+    return [
+        c for c in df.columns
+        if c not in NON_METRIC_COLUMNS and not c.endswith(PERCENTILE_SUFFIX) and not _ANNOTATION_RE.search(c)
+    ]
+
+
+def numeric_metric_frame(df):
+    """All metric columns of an agency table as floats, dropping columns with no numbers"""
+    numeric = pd.DataFrame({c: coerce_numeric(df[c]) for c in metric_columns(df)}, index=df.index)
+    return numeric.loc[:, numeric.notna().any()]
+
+
+def percentile_column(metric):
+    return f"{metric}{PERCENTILE_SUFFIX}"
+
+
+def add_percentile_columns(df, lower_is_better=()):
+    """The agency table with a percentile-within-year column after the metric columns.
+
+    Percentiles run from 0 to 100 over every institution published that year,
+    100 being the best; ties share their average rank. For the
+    `lower_is_better` columns (ranks, ratios) the order is reversed. One
+    grouped rank per direction covers every metric at once.
+    """
+    metric_cols = metric_columns(df)
+    numeric = pd.DataFrame({c: coerce_numeric(df[c]) for c in metric_cols}, index=df.index)
+    years = df["Year"].values
+    reversed_cols = [c for c in metric_cols if c in set(lower_is_better)]
+    higher_cols = [c for c in metric_cols if c not in set(reversed_cols)]
+    percentiles = pd.concat([
+        numeric[higher_cols].groupby(years).rank(pct=True),
+        numeric[reversed_cols].groupby(years).rank(pct=True, ascending=False),
+    ], axis=1)[metric_cols] * 100
+    percentiles.columns = [percentile_column(c) for c in metric_cols]
+    return pd.concat([df, percentiles], axis=1)
+
+
+def format_percentile(value):
+    """41 -> "41st pct"; NaN or "N/A" -> "" """
+    if not isinstance(value, (int, float)) or pd.isna(value):
+        return ""
+    value = int(round(value))
+    suffix = "th" if 10 <= value % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(value % 10, "th")
+    return f"{value}{suffix} pct"
+
+
+# Helper Function for KPIs
+def get_metric_value(df, university, column):
+    try:
+        val = df[df["IPEDS_Name"] == university][column].values[0]
+        if isinstance(val, (int, float)):
+            return round(val, 2)
+        return val if pd.notna(val) else "N/A"
+    except:
+        return "N/A"
+
+
+def parse_rank_range(rank_str):
+    try:
+        parts = str(rank_str).replace("–", "-").split("-")
+        if len(parts) == 2:
+            return (int(parts[0]), int(parts[1]), (int(parts[0]) + int(parts[1])) // 2)
+        else:
+            val = int(rank_str)
+            return (val, val, val)
+    except:
+        return (None, None, None)
+
+
+def build_rank_range_df(df, metric_col):
+    df = df.copy()
+    df = df[df[metric_col].notna()]
+    df[["low", "high", "mid"]] = df[metric_col].apply(lambda r: pd.Series(parse_rank_range(str(r))))
+    return df[df["mid"].notna()]
+
+
+def compute_metric_distributions(df):
+    """Per-year box statistics for every numeric metric of a whole agency table"""
+    numeric = numeric_metric_frame(df)
+    grouped = numeric.groupby(df["Year"].values)
+
+    quantiles = grouped.quantile([0.0, 0.25, 0.5, 0.75, 1.0])
+    counts = grouped.count()
+    means = grouped.mean()
+
+    distributions = {}
+    for metric in numeric.columns:
+        stats = quantiles[metric].unstack()
+        stats.columns = ["min", "q1", "median", "q3", "max"]
+        stats["mean"] = means[metric]
+        stats["count"] = counts[metric]
+        stats = stats[stats["count"] > 0]
+        if stats.empty:
+            continue
+        stats.index.name = "Year"
+        distributions[metric] = stats.reset_index()
+    return distributions
+
+
+# Per-year pillar matrix (institutions x pillars) for the methodology simulator
+PillarMatrix = namedtuple("PillarMatrix", [
+    "names",       # institutions with at least one pillar score
+    "row_index",   # institution -> row
+    "values",      # pillar scores, NaN replaced by 0
+    "available",   # 1.0 where the pillar score was published
+    "complete",    # rows publishing every pillar the agency reported that year
+])
+
+
+def build_pillar_matrices(df, pillars):
+    """{year: PillarMatrix} of an agency table.
+
+    Only complete rows are ranked by the simulator: QS publishes a single
+    pillar for much of its 2020/21 lists, and averaging the pillars a row
+    happens to have would rank those rows against full profiles.
+    """
+    matrices = {}
+    for year, year_df in df.groupby("Year"):
+        values = year_df[pillars].apply(coerce_numeric).to_numpy(dtype=float)
+        available = ~np.isnan(values)
+        keep = available.any(axis=1)
+        if not keep.any():
+            continue
+        names = year_df["IPEDS_Name"].to_numpy()[keep]
+        published = available.any(axis=0)
+        matrices[int(year)] = PillarMatrix(
+            names,
+            {name: i for i, name in enumerate(names)},
+            np.nan_to_num(values[keep]),
+            available[keep].astype(float),
+            available[keep][:, published].all(axis=1),
+        )
+    return matrices
+
+
+def simulate_ranks(values, available, weights, ranked=None):
+    """Weighted scores and competition ranks ("1224" style) for every institution.
+
+    A pillar nobody published that year drops out of the weighted average
+    instead of counting as zero, so one matrix-vector product per side does
+    the work. Rows outside `ranked` (a boolean mask), and rows whose pillars
+    all have weight 0, get NaN scores and ranks.
+    """
+    weights = np.asarray(weights, dtype=float)
+    weight_sum = available @ weights
+    scored = weight_sum > 0
+    if ranked is not None:
+        scored &= ranked
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = np.where(scored, (values @ weights) / weight_sum, np.nan)
+    filled = np.where(np.isnan(scores), -np.inf, scores)
+    descending = np.sort(filled)[::-1]
+    # Rank = 1 + number of strictly higher scores, found by binary search
+    ranks = np.searchsorted(-descending, -filled, side="left") + 1
+    return scores, np.where(np.isnan(scores), np.nan, ranks)
+
+
+# Sorted per-(year, metric) scores for logarithmic gap-to-target lookups
+ScoreIndex = namedtuple("ScoreIndex", [
+    "values_desc",      # metric values, best first
+    "names_desc",       # institutions in the same order
+    "value_of",         # institution -> metric value
+    "rank_asc",         # published rank midpoints, best first
+    "rank_min_value",   # lowest metric value achieved at or above each published rank
+])
+
+
+def build_score_indexes(df, metrics, rank_col):
+    """{(year, metric): ScoreIndex} for every year of an agency table"""
+    indexes = {}
+    for year, year_df in df.groupby("Year"):
+        names = year_df["IPEDS_Name"].to_numpy()
+        rank_mid = coerce_numeric(year_df[rank_col]).to_numpy()
+        for metric in metrics:
+            values = coerce_numeric(year_df[metric]).to_numpy()
+            scored = ~np.isnan(values)
+            if not scored.any():
+                continue
+            order = np.argsort(-values[scored], kind="stable")
+            ranked = scored & ~np.isnan(rank_mid)
+            rank_order = np.argsort(rank_mid[ranked], kind="stable")
+            indexes[(int(year), metric)] = ScoreIndex(
+                values_desc=values[scored][order],
+                names_desc=names[scored][order],
+                value_of=dict(zip(names[scored], values[scored])),
+                rank_asc=rank_mid[ranked][rank_order],
+                rank_min_value=np.minimum.accumulate(values[ranked][rank_order]),
+            )
+    return indexes
+
+
+def position_of(index, value):
+    """1-based position a value would take among the indexed institutions"""
+    return int(np.searchsorted(-index.values_desc, -value, side="left")) + 1
+
+
+def value_for_position(index, position):
+    """Metric value needed to be placed at `position` (ties share a position)"""
+    position = min(max(int(position), 1), len(index.values_desc))
+    return float(index.values_desc[position - 1])
+
+
+def value_for_published_rank(index, rank):
+    """Lowest metric value that achieved a published rank of `rank` or better, or None"""
+    i = int(np.searchsorted(index.rank_asc, rank, side="right")) - 1
+    return float(index.rank_min_value[i]) if i >= 0 else None
+
+
+def _trend_slopes(values, years):
+    """Least-squares slope through every row of `values` at once.
+
+    `values` is institutions x years with NaN where nothing was published;
+    each row is fitted on its observed years only. Returns (slopes, points).
+    """
+    observed = ~np.isnan(values)
+    x = np.where(observed, years - years.mean(), 0.0)
+    y = np.where(observed, values, 0.0)
+    n = observed.sum(axis=1)
+    sx, sy = x.sum(axis=1), y.sum(axis=1)
+    sxx, sxy = (x * x).sum(axis=1), (x * y).sum(axis=1)
+    denominator = n * sxx - sx * sx
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slopes = np.where(denominator > 0, (n * sxy - sx * sy) / denominator, 0.0)
+    return slopes, n
+
+
+def _latest_values(values):
+    # Last published value of every row, and the column it came from
+    observed = ~np.isnan(values)
+    last_index = values.shape[1] - 1 - np.argmax(observed[:, ::-1], axis=1)
+    return values[np.arange(len(values)), last_index], last_index
+
+
+def _year_matrix(df, metric):
+    # institutions x years of one metric (duplicate rows averaged)
+    values = coerce_numeric(df[metric])
+    wide = values.groupby([df["IPEDS_Name"].values, df["Year"].astype(int).values]).mean().unstack()
+    return wide.sort_index(axis=1)
+
+
+def _project(values, years, damping, clip_min):
+    slopes, points = _trend_slopes(values, years)
+    latest, last_index = _latest_values(values)
+    # Damped trend from the latest value: year-to-year ranks are noisy, and
+    # the backtest shows a full least-squares extrapolation overshoots
+    projected = latest + damping * slopes * (years[-1] + 1 - years[last_index])
+    if clip_min is not None:
+        projected = np.maximum(projected, clip_min)
+    return projected, latest, points
+
+
+def forecast_trends(df, metrics, min_points=3, damping=0.5, clip_min=None):
+    """Next-year trend projection of every institution for each metric.
+
+    One batched least-squares fit per metric over the institutions x years
+    matrix. Returns {metric: DataFrame indexed by IPEDS_Name with Year, Value
+    (the latest published value), Forecast_Year, Forecast and Points}. Only
+    institutions published in the table's latest year with at least
+    `min_points` years of history get a projection.
+    """
+    forecasts = {}
+    for metric in metrics:
+        wide = _year_matrix(df, metric)
+        if wide.empty:
+            continue
+        years = wide.columns.to_numpy(dtype=float)
+        values = wide.to_numpy(dtype=float)
+        projected, latest, points = _project(values, years, damping, clip_min)
+        keep = (points >= min_points) & ~np.isnan(values[:, -1])
+        forecasts[metric] = pd.DataFrame({
+            "Year": int(years[-1]),
+            "Value": latest[keep],
+            "Forecast_Year": int(years[-1]) + 1,
+            "Forecast": projected[keep],
+            "Points": points[keep],
+        }, index=pd.Index(wide.index[keep], name="IPEDS_Name"))
+    return forecasts
+
+
+def backtest_forecasts(df, metrics, min_points=3, damping=0.5, clip_min=None):
+    """Projection error on past years.
+
+    Every year with at least `min_points` earlier years is held out in turn:
+    the trend is fitted on the earlier years only and compared with what was
+    published. The naive baseline carries the last published value forward.
+    """
+    rows = []
+    for metric in metrics:
+        wide = _year_matrix(df, metric)
+        years = wide.columns.to_numpy(dtype=float)
+        values = wide.to_numpy(dtype=float)
+        for i in range(min_points, len(years)):
+            history = values[:, :i]
+            projected, latest, points = _project(history, years[:i], damping, clip_min)
+            actual = values[:, i]
+            # Same rule as forecast_trends: published in the last history year
+            scored = (points >= min_points) & ~np.isnan(history[:, -1]) & ~np.isnan(actual)
+            if not scored.any():
+                continue
+            errors = np.abs(projected[scored] - actual[scored])
+            rows.append({
+                "Metric": metric,
+                "Year": int(years[i]),
+                "Institutions": int(scored.sum()),
+                "MAE": errors.mean(),
+                "Median AE": np.median(errors),
+                "Naive MAE": np.abs(latest[scored] - actual[scored]).mean(),
+            })
+    return pd.DataFrame(rows, columns=["Metric", "Year", "Institutions", "MAE", "Median AE", "Naive MAE"])
+
+
+# Which (institution, metric, year) cells of an agency table hold a value
+Coverage = namedtuple("Coverage", [
+    "names",         # institutions, sorted
+    "name_index",    # institution -> row of `bits`
+    "metric_index",  # metric -> column of `bits`
+    "years",         # years, sorted
+    "bits",          # bool array, institutions x metrics x years: any published value ("Reporter" included)
+    "numeric_bits",  # same shape: a value coerce_numeric can plot
+])
+
+
+def build_coverage(df, metrics):
+    """Coverage bitmap of an agency table, built once per dataset version"""
+    names = np.sort(df["IPEDS_Name"].unique())
+    years = np.sort(df["Year"].unique())
+    rows = np.searchsorted(names, df["IPEDS_Name"].to_numpy())
+    cols = np.searchsorted(years, df["Year"].to_numpy())
+    bits = np.zeros((len(names), len(metrics), len(years)), dtype=bool)
+    numeric_bits = np.zeros_like(bits)
+    for j, metric in enumerate(metrics):
+        present = df[metric].notna().to_numpy()
+        bits[rows[present], j, cols[present]] = True
+        numeric = coerce_numeric(df[metric]).notna().to_numpy()
+        numeric_bits[rows[numeric], j, cols[numeric]] = True
+    return Coverage(
+        names,
+        {name: i for i, name in enumerate(names)},
+        {metric: j for j, metric in enumerate(metrics)},
+        years,
+        bits,
+        numeric_bits,
+    )
+
+
+def _covered_years(coverage, years):
+    return np.isin(coverage.years, list(years))
+
+
+def has_data(coverage, university, metric, years, numeric=False):
+    """Whether the institution published the metric in `years` (a number, for charts, when `numeric`)"""
+    i = coverage.name_index.get(university)
+    j = coverage.metric_index.get(metric)
+    if i is None or j is None:
+        return False
+    bits = coverage.numeric_bits if numeric else coverage.bits
+    return bool(bits[i, j, _covered_years(coverage, years)].any())
+
+
+def institutions_with_data(coverage, years, metric=None):
+    """Institutions with a value in `years` for `metric`, or for any metric when it is None"""
+    mask = _covered_years(coverage, years)
+    if metric is None:
+        covered = coverage.bits[:, :, mask].any(axis=(1, 2))
+    elif metric in coverage.metric_index:
+        covered = coverage.bits[:, coverage.metric_index[metric], mask].any(axis=1)
+    else:
+        return set()
+    return set(coverage.names[covered])
+
+
+# Fields of each agency in the aligned panel
+PANEL_FIELDS = ["Rank", "Rank_mid", "Rank_pct", "Score", "Score_pct"]
+
+AlignedPanel = namedtuple("AlignedPanel", [
+    "frame",     # one row per (IPEDS_Name, Year), columns (agency, field)
+    "rows",      # {(name, year): row position in frame and metrics}
+    "metrics",   # same rows, columns (agency, metric): every numeric metric of every agency
+])
+
+
+def _rank_label(value):
+    # Published rank as shown: "201–250" stays, 12.0 becomes "12"
+    if pd.isna(value):
+        return None
+    return f"{value:g}" if isinstance(value, (int, float, np.number)) else str(value).strip()
+
+
+def _first_value(df, columns):
+    values = pd.Series(np.nan, index=df.index)
+    for column in columns:
+        if column in df.columns:
+            values = values.fillna(coerce_numeric(df[column]))
+    return values
+
+
+def build_aligned_panel(tables, rank_columns, score_columns):
+    """Every agency's rank and headline score side by side, built once per dataset version.
+
+    The frame has the PANEL_FIELDS of each agency: the published rank, its
+    numeric midpoint and percentile in the year, and the headline score with
+    its percentile (NaN where the agency publishes none). `rows` maps
+    (IPEDS_Name, Year) to a row, so the cross-agency view takes its rows in
+    one positional slice instead of filtering four tables.
+    """
+    parts = {}
+    for agency, df in tables.items():
+        rank_col = rank_columns[agency]
+        scores = score_columns.get(agency, [])
+        part = pd.DataFrame({
+            "Rank": df[rank_col].map(_rank_label),
+            "Rank_mid": coerce_numeric(df[rank_col]),
+            "Rank_pct": _first_value(df, [percentile_column(rank_col)]),
+            "Score": _first_value(df, scores),
+            "Score_pct": _first_value(df, [percentile_column(c) for c in scores]),
+        }, index=df.index)
+        part.index = pd.MultiIndex.from_arrays([df["IPEDS_Name"], df["Year"]])
+        # An institution listed twice in a year: the first row wins, as in get_metric_value
+        parts[agency] = part[~part.index.duplicated()]
+    frame = pd.concat(parts, axis=1, names=["Agency", "Field"]).sort_index()
+    rows = {key: i for i, key in enumerate(frame.index)}
+    return AlignedPanel(frame, rows, build_metric_panel(tables).reindex(frame.index))
+
+
+def build_metric_panel(tables):
+    """Every numeric metric of every agency per (IPEDS_Name, Year), columns (agency, metric)"""
+    parts = {}
+    for agency, df in tables.items():
+        numeric = numeric_metric_frame(df)
+        numeric.index = pd.MultiIndex.from_arrays([df["IPEDS_Name"], df["Year"]])
+        parts[agency] = numeric[~numeric.index.duplicated()]
+    return pd.concat(parts, axis=1, names=["Agency", "Metric"]).sort_index()
+
+
+def panel_slice(panel, universities, years):
+    """Rows of `universities` in `years`, by institution then year; pairs without data are skipped"""
+    keys = ((uni, year) for uni in universities for year in sorted(years))
+    return panel.frame.iloc[[panel.rows[key] for key in keys if key in panel.rows]]
+
+
+# --- Correlations between the metrics of all agencies ---
+
+MIN_CORRELATION_PAIRS = 20  # institutions with both values, below which a correlation is left out
+
+# Per year, DataFrames indexed both ways by (agency, metric)
+CorrelationMatrices = namedtuple("CorrelationMatrices", [
+    "pearson",
+    "spearman",
+    "pairs",     # institutions with both metrics published
+])
+
+
+def metric_label(column):
+    agency, metric = column
+    return f"{agency} · {metric}"
+
+
+def pairwise_correlations(values, min_pairs=MIN_CORRELATION_PAIRS):
+    """Pearson r of every pair of columns over the rows where both are present, and those row counts.
+
+    Pairwise-complete in one pass: with the missing values zeroed and a 0/1
+    presence matrix M, the per-pair counts, sums, sums of squares and cross
+    products are all matrix products (M'M, X'M, (X*X)'M, X'X).
+    """
+    present = ~np.isnan(values)
+    counts = present.sum(axis=0)
+    # Centering first keeps the sums small, so the differences below do not cancel out
+    means = np.where(present, values, 0.0).sum(axis=0) / np.maximum(counts, 1)
+    x = np.where(present, values - means, 0.0)
+    m = present.astype(float)
+    n = m.T @ m
+    sums = x.T @ m           # [i, j]: sum of column i over the rows where j is present too
+    squares = (x * x).T @ m
+    products = x.T @ x
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = products - sums * sums.T / n
+        var = squares - sums ** 2 / n
+        r = cov / np.sqrt(var * var.T)
+    r[(n < min_pairs) | (var <= 0) | (var.T <= 0)] = np.nan
+    return np.clip(r, -1, 1), n.astype(int)
+
+
+def correlation_matrices(metrics, min_pairs=MIN_CORRELATION_PAIRS):
+    """{year: CorrelationMatrices} of the metric panel over every institution published that year.
+
+    Spearman ranks each metric once over the year's published values and
+    correlates the ranks pairwise, instead of re-ranking the rows of every
+    pair as pandas does; the two differ only where metrics cover different
+    institutions.
+    """
+    result = {}
+    for year, frame in metrics.groupby(level="Year"):
+        frame = frame.loc[:, frame.notna().any()]
+        pearson, pairs = pairwise_correlations(frame.to_numpy(dtype=float), min_pairs)
+        spearman, _ = pairwise_correlations(frame.rank().to_numpy(dtype=float), min_pairs)
+        result[int(year)] = CorrelationMatrices(*(
+            pd.DataFrame(matrix, index=frame.columns, columns=frame.columns) for matrix in (pearson, spearman, pairs)
+        ))
+    return result
+
+
+def strongest_pairs(matrix, pairs, limit=20, across_agencies=False):
+    """Metric pairs of a correlation matrix by decreasing |r|, with the institutions behind each"""
+    i, j = np.triu_indices(len(matrix), k=1)
+    r = matrix.to_numpy()[i, j]
+    agencies = matrix.index.get_level_values("Agency").to_numpy()
+    keep = ~np.isnan(r)
+    if across_agencies:
+        keep &= agencies[i] != agencies[j]
+    i, j, r = i[keep], j[keep], r[keep]
+    order = np.argsort(-np.abs(r), kind="stable")[:limit]
+    i, j = i[order], j[order]
+    return pd.DataFrame({
+        "Metric A": [matrix.index[k] for k in i],
+        "Metric B": [matrix.index[k] for k in j],
+        "r": r[order],
+        "Institutions": pairs.to_numpy()[i, j],
+    })
@@ -0,0 +1,50 @@
+"""Backtest of the dashboard's next-year projections.
+
+Holds out each past year in turn, projects it from the earlier years with the
+same batched trend fit the "Project next year" toggle uses, and prints the
+mean absolute error next to the naive "same as last year" baseline for every
+rank and chart metric of every agency:
+
+    python backtest.py
+    python backtest.py --agencies TIMES QS --damping 1.0
+"""
+import argparse
+import os
+
+import pandas as pd
+
+from analytics import backtest_forecasts
+from ingest import load_agency_tables
+from metric_registry import CHART_METRICS, RANK_COLUMNS
+
+
+def run_backtest(tables, damping, min_points):
+    reports = []
+    for agency, df in tables.items():
+        rank_col = RANK_COLUMNS[agency]
+        report = pd.concat([
+            backtest_forecasts(df, [rank_col], min_points, damping, clip_min=1),
+            backtest_forecasts(df, CHART_METRICS[agency], min_points, damping),
+        ], ignore_index=True)
+        report.insert(0, "Agency", agency)
+        reports.append(report)
+    return pd.concat(reports, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest next-year trend projections on past years")
+    parser.add_argument("--data-dir", default=os.path.dirname(os.path.abspath(__file__)))
+    parser.add_argument("--agencies", nargs="+", default=list(RANK_COLUMNS), choices=list(RANK_COLUMNS))
+    parser.add_argument("--damping", type=float, default=0.5, help="share of the fitted yearly slope to apply")
+    parser.add_argument("--min-points", type=int, default=3, help="years of history needed for a projection")
+    args = parser.parse_args()
+
+    tables = load_agency_tables(args.data_dir)
+    report = run_backtest({agency: tables[agency] for agency in args.agencies}, args.damping, args.min_points)
+    report["vs naive"] = report["MAE"] / report["Naive MAE"]
+    with pd.option_context("display.max_rows", None, "display.width", 160):
+        print(report.round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
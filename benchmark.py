@@ -0,0 +1,151 @@
+"""Stage benchmarks for the dashboard's data path at growing data sizes.
+
+Times the per-rerun stages of UNIVERSITY.py (year/selection filter on the
+full table and on year partitions for the latest two years, per-row rank parsing, per-university KPI lookups, per-university rank-band traces,
+line charts, whole-table distributions) on the real workbooks scaled up with
+synthetic_data.py, and prints how each stage grows with the data.
+
+The selection is NJIT plus every NJ-flagged institution (capped by
+--max-selected), so it grows with the data the way an "all NJ" view would.
+
+    python benchmark.py --scales 1 10 100
+    python benchmark.py --scales 1 10x10 --agencies TIMES QS
+"""
+import argparse
+import os
+import statistics
+import time
+
+import pandas as pd
+
+from analytics import build_rank_range_df, compute_metric_distributions, get_metric_value
+from charts import build_line_chart, rank_band_figure, rank_line_figure
+from ingest import partition_by_year
+from metric_registry import CHART_METRICS, KPI_METRICS, RANK_COLUMNS
+from synthetic_data import generate_datasets, load_templates
+from tenants import DEFAULT_TENANT
+
+PALETTE = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f"]
+
+
+def parse_scale(spec):
+    # "10" -> 10x institutions; "10x5" -> 10x institutions and 5x years
+    uni_scale, _, year_scale = spec.partition("x")
+    return float(uni_scale), int(year_scale or 1)
+
+
+def time_stage(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def stage_functions(agency, df, max_selected, focal=DEFAULT_TENANT.focal):
+    nj_unis = df.loc[df["New_Jersey_University"] == "Yes", "IPEDS_Name"].unique().tolist()
+    selected = [focal] + [u for u in nj_unis if u != focal][:max_selected - 1]
+    color_map = {uni: PALETTE[i % len(PALETTE)] for i, uni in enumerate(selected)}
+    years = sorted(df["Year"].unique())
+    rank_col = RANK_COLUMNS[agency]
+    chart_metric = CHART_METRICS[agency][0]
+    kpi_metrics = list(KPI_METRICS[agency])
+
+    def filtered():
+        return df[(df["Year"].isin(years)) & (df["IPEDS_Name"].isin(selected))]
+
+    partitions = partition_by_year(df)
+    latest_two = years[-2:]
+
+    def filtered_latest_two():
+        return df[(df["Year"].isin(latest_two)) & (df["IPEDS_Name"].isin(selected))]
+
+    def partition_latest_two():
+        frame = pd.concat([partitions[int(y)] for y in latest_two], ignore_index=True)
+        return frame[frame["IPEDS_Name"].isin(selected)]
+
+    frame = filtered()
+    latest = frame[frame["Year"] == years[-1]]
+
+    def kpi_lookup():
+        return [get_metric_value(latest, uni, metric) for metric in kpi_metrics for uni in selected]
+
+    def rank_traces():
+        if agency in ("TIMES", "QS"):
+            return rank_band_figure(frame, rank_col, f"{agency} Rank", selected, color_map)
+        return rank_line_figure(frame, rank_col, f"{agency} Rank", color_map)
+
+    return len(selected), {
+        "filter": filtered,
+        "filter_2y": filtered_latest_two,
+        "partition_2y": partition_latest_two,
+        "rank_parse": lambda: build_rank_range_df(df, rank_col),
+        "kpi_lookup": kpi_lookup,
+        "rank_traces": rank_traces,
+        "line_chart": lambda: build_line_chart(frame[["Year", "IPEDS_Name", chart_metric]], chart_metric, color_map, 400, None),
+        "distributions": lambda: compute_metric_distributions(df),
+    }
+
+
+def run_benchmark(scales, agencies, repeat=3, max_selected=200, data_dir="."):
+    templates = load_templates(data_dir)
+    templates = {agency: templates[agency] for agency in agencies}
+    results = []
+    for spec in scales:
+        uni_scale, year_scale = parse_scale(spec)
+        datasets = generate_datasets(uni_scale, year_scale, templates=templates)
+        for agency, df in datasets.items():
+            n_selected, stages = stage_functions(agency, df, max_selected)
+            for stage, func in stages.items():
+                results.append({
+                    "scale": spec,
+                    "agency": agency,
+                    "rows": len(df),
+                    "selected": n_selected,
+                    "stage": stage,
+                    "ms": time_stage(func, repeat),
+                })
+                print(f"  {spec:>6} {agency:<11}{stage:<14}{results[-1]['ms']:>10.1f} ms", flush=True)
+    return results
+
+
+def print_scaling(results, scales):
+    base = {(r["agency"], r["stage"]): r["ms"] for r in results if r["scale"] == scales[0]}
+    rows = {(r["agency"], r["stage"]): {} for r in results}
+    sizes = {}
+    for r in results:
+        rows[(r["agency"], r["stage"])][r["scale"]] = r["ms"]
+        sizes[(r["agency"], r["scale"])] = (r["rows"], r["selected"])
+
+    print("\nTable sizes (rows / selected institutions):")
+    for (agency, scale), (n_rows, n_selected) in sizes.items():
+        print(f"  {scale:>6} {agency:<11}{n_rows:>10,} / {n_selected:,}")
+
+    print("\nStage time in ms (growth vs. first scale):")
+    print(f"  {'agency':<11}{'stage':<14}" + "".join(f"{s:>20}" for s in scales))
+    for (agency, stage), by_scale in rows.items():
+        cells = []
+        for s in scales:
+            ms = by_scale.get(s)
+            growth = ms / base[(agency, stage)] if base.get((agency, stage)) else float("nan")
+            cells.append(f"{ms:>10.1f} ({growth:>5.1f}x)")
+        print(f"  {agency:<11}{stage:<14}" + "".join(f"{c:>20}" for c in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard stages on synthetic data")
+    parser.add_argument("--scales", nargs="+", default=["1", "10", "100"],
+                        help="scale factors, e.g. 10 (institutions) or 10x5 (institutions x years)")
+    parser.add_argument("--agencies", nargs="+", default=list(RANK_COLUMNS), choices=list(RANK_COLUMNS))
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage (median is reported)")
+    parser.add_argument("--max-selected", type=int, default=200, help="cap on selected institutions")
+    args = parser.parse_args()
+
+    data_dir = os.path.dirname(os.path.abspath(__file__))
+    results = run_benchmark(args.scales, args.agencies, args.repeat, args.max_selected, data_dir)
+    print_scaling(results, args.scales)
+
+
+if __name__ == "__main__":
+    main()
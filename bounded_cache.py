@@ -0,0 +1,225 @@
+"""Process-wide memoization with a memory budget, LRU order and TTL expiry.
+
+The dashboard's derived computations (filtered frames, KPI tables, figures,
+per-version indexes) are memoized here instead of in unbounded
+st.cache_data caches. Every entry is stored pickled, so its size is known
+exactly, and each hit returns a fresh copy the caller may modify (as
+st.cache_data does). When the entries of all functions together exceed the
+budget, the least recently used ones are evicted; entries older than their
+function's TTL are dropped on access.
+
+    RANKING_CACHE_MB=256       memory budget of the process (default 256)
+    RANKING_CACHE_TTL=3600     default TTL in seconds (default: none)
+
+Arguments whose name starts with "_" are not part of the key, as with
+st.cache_data; pass a version argument next to them. A function can also
+record which institutions an entry was built for (`selection`), so an edit
+to a peer group drops only the entries that covered that group, and cap its
+entries per value of one argument (`partition`, e.g. the tenant), so one
+busy tenant cannot evict another tenant's entries.
+"""
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BUDGET_MB = 256
+
+CacheStats = namedtuple("CacheStats", [
+    "budget_bytes",   # configured memory budget
+    "used_bytes",     # pickled size of all entries
+    "entries",        # number of entries
+    "hits",
+    "misses",
+    "evictions",      # entries dropped to stay within the budget or max_entries
+    "expirations",    # entries dropped because their TTL passed
+    "rejected",       # results larger than the whole budget, never stored
+    "invalidations",  # entries dropped by invalidate()
+    "functions",      # {function: {"entries", "bytes", "hits", "misses"}}
+])
+
+_Entry = namedtuple("_Entry", ["function", "payload", "created", "selection", "partition"])
+
+
+def _env_float(name, default):
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def _hash_value(value, digest):
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr(("DataFrame", list(value.columns), list(value.dtypes), value.shape)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        digest.update(repr(("Series", value.name, value.dtype, value.shape)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype, value.shape)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        digest.update(b"{")
+        for key in sorted(value, key=repr):
+            _hash_value(key, digest)
+            _hash_value(value[key], digest)
+        digest.update(b"}")
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = sorted(value, key=repr) if isinstance(value, (set, frozenset)) else value
+        digest.update(f"{type(value).__name__}[".encode())
+        for item in items:
+            _hash_value(item, digest)
+        digest.update(b"]")
+    elif value is None or isinstance(value, (str, bytes, int, float, bool, np.generic)):
+        digest.update(repr((type(value).__name__, value)).encode())
+    else:
+        digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class BoundedCache:
+    """LRU/TTL store of pickled results shared by every function memoized on it"""
+
+    def __init__(self, budget_bytes, default_ttl=None):
+        self.budget_bytes = budget_bytes
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()   # key -> _Entry, least recently used first
+        self._used = 0
+        self._by_function = {}          # name -> {"entries", "bytes", "hits", "misses"}
+        self._by_partition = {}         # (name, partition) -> entries, for max_entries
+        self._counts = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "rejected": 0, "invalidations": 0}
+        self._lock = threading.Lock()
+
+    def _function_stats(self, name):
+        return self._by_function.setdefault(name, {"entries": 0, "bytes": 0, "hits": 0, "misses": 0})
+
+    def _drop(self, key, reason):
+        entry = self._entries.pop(key)
+        self._used -= len(entry.payload)
+        stats = self._function_stats(entry.function)
+        stats["entries"] -= 1
+        stats["bytes"] -= len(entry.payload)
+        self._by_partition[(entry.function, entry.partition)] -= 1
+        self._counts[reason] += 1
+
+    def get(self, name, key, ttl):
+        """The cached result, or a miss marker"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and ttl is not None and time.monotonic() - entry.created > ttl:
+                self._drop(key, "expirations")
+                entry = None
+            stats = self._function_stats(name)
+            if entry is None:
+                self._counts["misses"] += 1
+                stats["misses"] += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self._counts["hits"] += 1
+            stats["hits"] += 1
+            payload = entry.payload
+        return pickle.loads(payload)
+
+    def put(self, name, key, value, max_entries=None, selection=None, partition=None):
+        """Store a result; `max_entries` caps the entries of this function with the same `partition`"""
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            if len(payload) > self.budget_bytes:
+                self._counts["rejected"] += 1
+                return
+            if key in self._entries:
+                self._drop(key, "evictions")
+                self._counts["evictions"] -= 1  # a concurrent recompute replaced it, nothing was lost
+            self._entries[key] = _Entry(name, payload, time.monotonic(), selection, partition)
+            self._used += len(payload)
+            stats = self._function_stats(name)
+            stats["entries"] += 1
+            stats["bytes"] += len(payload)
+            counted = (name, partition)
+            self._by_partition[counted] = self._by_partition.get(counted, 0) + 1
+            if max_entries is not None and self._by_partition[counted] > max_entries:
+                oldest = next(k for k, e in self._entries.items() if (e.function, e.partition) == counted)
+                self._drop(oldest, "evictions")
+            while self._used > self.budget_bytes:
+                self._drop(next(iter(self._entries)), "evictions")
+
+    def invalidate(self, institutions):
+        """Drop the entries built for a selection that contains all of `institutions`; returns how many"""
+        institutions = frozenset(institutions)
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if entry.selection is not None and institutions <= entry.selection
+            ]
+            for key in stale:
+                self._drop(key, "invalidations")
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key, "evictions")
+
+    def stats(self):
+        with self._lock:
+            return CacheStats(
+                self.budget_bytes, self._used, len(self._entries),
+                functions={name: dict(stats) for name, stats in self._by_function.items()},
+                **self._counts,
+            )
+
+
+_MISSING = object()
+
+DEFAULT_CACHE = BoundedCache(
+    int(_env_float("RANKING_CACHE_MB", DEFAULT_BUDGET_MB) * 1024 ** 2),
+    _env_float("RANKING_CACHE_TTL", None),
+)
+
+
+def cached(func=None, *, ttl=None, max_entries=None, selection=None, partition=None, cache=None):
+    """Memoize `func` in the shared budgeted cache (or `cache`).
+
+    `ttl` (seconds) falls back to the cache's default; `max_entries` caps
+    this function's entries on top of the shared byte budget, separately
+    for each value of the argument named by `partition`. `selection` names
+    the argument holding the institutions (a list, or a dict keyed by them)
+    the result is built for, for invalidate().
+    """
+    if func is None:
+        return functools.partial(
+            cached, ttl=ttl, max_entries=max_entries, selection=selection, partition=partition, cache=cache
+        )
+
+    store = cache or DEFAULT_CACHE
+    # Keyed by name, so a function redefined on every Streamlit rerun keeps its entries
+    name = f"{func.__module__}.{func.__qualname__}"
+    signature = inspect.signature(func)
+    hashed = [p for p in signature.parameters if not p.startswith("_")]
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        digest = hashlib.sha1(name.encode())
+        for param in hashed:
+            _hash_value(bound.arguments[param], digest)
+        key = digest.hexdigest()
+        entry_ttl = ttl if ttl is not None else store.default_ttl
+        value = store.get(name, key, entry_ttl)
+        if value is _MISSING:
+            value = func(*args, **kwargs)
+            institutions = frozenset(bound.arguments[selection]) if selection else None
+            store.put(name, key, value, max_entries, institutions, bound.arguments[partition] if partition else None)
+        return value
+
+    wrapper.cache = store
+    return wrapper
+
+
+def cache_stats(cache=None):
+    return (cache or DEFAULT_CACHE).stats()
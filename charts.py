@@ -0,0 +1,340 @@
+import matplotlib.colors as mcolors
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from analytics import build_rank_range_df, metric_label, percentile_column
+
+
+def rgba_with_opacity(color, alpha=0.15):
+    try:
+        # Convert to rgba using matplotlib
+        rgba = mcolors.to_rgba(color, alpha=alpha)
+        return f"rgba({int(rgba[0]*255)}, {int(rgba[1]*255)}, {int(rgba[2]*255)}, {rgba[3]})"
+    except:
+        # Fallback for any color conversion issues
+        return f"rgba(128, 128, 128, {alpha})"
+
+
+def add_forecast_traces(fig, forecast, universities, color_map, year_type=int):
+    """Dashed segment from each institution's latest value to its projection"""
+    if forecast is None:
+        return fig
+    for uni, row in forecast[forecast.index.isin(universities)].iterrows():
+        fig.add_trace(go.Scatter(
+            x=[year_type(row["Year"]), year_type(row["Forecast_Year"])],
+            y=[row["Value"], row["Forecast"]],
+            mode="lines+markers",
+            line=dict(color=color_map.get(uni), dash="dash"),
+            marker=dict(symbol=["circle", "circle-open"], size=8),
+            name=f"{uni} projection",
+            showlegend=False,
+            hovertemplate=f"{uni}<br>%{{x}}: %{{y:.1f}} (projected)<extra></extra>",
+        ))
+    return fig
+
+
+def build_line_chart(df, metric_col, color_map, height, dist, forecast=None):
+    df = df.copy()
+    df["Year"] = pd.to_numeric(df["Year"], errors="coerce")
+    df = df.sort_values("Year")
+    df["Year"] = df["Year"].astype(str)
+
+    pct_col = percentile_column(metric_col)
+    has_pct = pct_col in df.columns
+    fig = px.line(
+        df,
+        x="Year",
+        y=metric_col,
+        text=metric_col,
+        color="IPEDS_Name",
+        markers=True,
+        color_discrete_map=color_map,
+        hover_data={pct_col: ":.0f"} if has_pct else None,
+        labels={pct_col: "Percentile in year"} if has_pct else None
+    )
+    fig.update_traces(
+        textposition="top center",
+        texttemplate="%{text:.2f}",
+        textfont_size=10,
+        connectgaps=True
+    )
+    fig.update_layout(
+        height=height,
+        margin=dict(t=30, b=70, l=30, r=30),
+        title_font=dict(size=15, color="#333"),
+        title_x=0.0,
+        xaxis=dict(type='category'),
+        xaxis_title="Year",
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.35,
+            xanchor="center",
+            x=0.5,
+            font=dict(size=9),
+            bgcolor='rgba(0,0,0,0)',
+            title_text=None
+        )
+    )
+
+    # All-institutions mode: box stats per year behind the selected universities
+    if dist is not None:
+        fig.add_trace(go.Box(
+            x=dist["Year"].astype(str),
+            q1=dist["q1"],
+            median=dist["median"],
+            q3=dist["q3"],
+            lowerfence=dist["min"],
+            upperfence=dist["max"],
+            mean=dist["mean"],
+            name="All institutions",
+            marker_color="#B0B0B0",
+            fillcolor="rgba(176, 176, 176, 0.25)",
+        ))
+        fig.data = (fig.data[-1],) + fig.data[:-1]
+        fig.update_layout(xaxis=dict(type='category', categoryorder='category ascending'))
+
+    # Year labels are strings on this chart
+    return add_forecast_traces(fig, forecast, df["IPEDS_Name"].unique(), color_map, year_type=lambda y: str(int(y)))
+
+
+def rank_band_figure(df, metric_col, title, universities, color_map, forecast=None):
+    ranks = build_rank_range_df(df, metric_col)
+    ranks = ranks.sort_values("Year")
+
+    fig = go.Figure()
+
+    for uni in universities:
+        uni_df = ranks[ranks["IPEDS_Name"] == uni]
+        base_color = color_map.get(uni)
+
+        # High line 
+        fig.add_trace(go.Scatter(
+            x=uni_df["Year"],
+            y=uni_df["high"],
+            mode="lines",
+            line=dict(color=base_color),
+            name=f"{uni} range",
+            showlegend=True,
+        ))
+
+        #Low line with transparent fill
+        fig.add_trace(go.Scatter(
+            x=uni_df["Year"],
+            y=uni_df["low"],
+            mode="lines",
+            line=dict(color=base_color),
+            fill='tonexty',
+            fillcolor=rgba_with_opacity(base_color, alpha=0.15),
+            name=f"{uni} band",
+            showlegend=False
+        ))
+
+        # Hover on the band shows the published rank and its percentile in that year
+        pct_col = percentile_column(metric_col)
+        if pct_col in uni_df.columns:
+            fig.data[-2].update(
+                customdata=list(zip(uni_df[metric_col], uni_df[pct_col])),
+                hovertemplate=f"{uni}<br>%{{x}}: rank %{{customdata[0]}}<br>Percentile in year: %{{customdata[1]:.0f}}<extra></extra>",
+            )
+
+        #Text labels
+        fig.add_trace(go.Scatter(
+            x=uni_df["Year"],
+            y=(uni_df["low"] + uni_df["high"]) / 2,
+            mode="text",
+            text=uni_df[metric_col],
+            textposition="middle center",
+            textfont=dict(size=14, color="black"),
+            showlegend=False,
+            hoverinfo="skip"
+        ))
+
+    fig.update_layout(
+        title=title,
+        height=450,
+        margin=dict(t=30, b=30, l=30, r=30),
+        title_font=dict(size=15),
+        title_x=0.0,
+        xaxis=dict(type='category'),
+        yaxis_title="Rank",
+        yaxis_autorange="reversed",
+        legend=dict(orientation="h", y=-0.25, x=0.5, xanchor="center")
+    )
+    return add_forecast_traces(fig, forecast, universities, color_map)
+
+
+def rank_line_figure(df, metric_col, title, color_map, forecast=None):
+    pct_col = percentile_column(metric_col)
+    has_pct = pct_col in df.columns
+    fig = px.line(
+        df.sort_values("Year"),
+        x="Year",
+        y=metric_col,
+        color="IPEDS_Name",
+        markers=True,
+        text=metric_col,
+        color_discrete_map=color_map,
+        title=title,
+        hover_data={pct_col: ":.0f"} if has_pct else None,
+        labels={pct_col: "Percentile in year"} if has_pct else None
+    )
+    fig.update_traces(textposition="top center", texttemplate="%{text}")
+    fig.update_layout(
+        height=450,
+        margin=dict(t=30, b=30, l=30, r=30),
+        title_font=dict(size=15),
+        title_x=0.0,
+        xaxis=dict(type='category'),
+        yaxis_title="Rank",
+        yaxis_autorange="reversed",
+        legend=dict(orientation="h", y=-0.25, x=0.5, xanchor="center")
+    )
+    return add_forecast_traces(fig, forecast, df["IPEDS_Name"].unique(), color_map)
+
+
+def cross_agency_figure(rows, value_field, title, color_map):
+    """Aligned-panel rows as one line per institution and agency (`value_field` is Rank_mid or Score)"""
+    is_rank = value_field == "Rank_mid"
+    pct_field = "Rank_pct" if is_rank else "Score_pct"
+    long = rows.stack(level="Agency", future_stack=True).reset_index()
+    long = long[long[value_field].notna()]
+    fig = px.line(
+        long,
+        x="Year",
+        y=value_field,
+        color="IPEDS_Name",
+        line_dash="Agency",
+        symbol="Agency",
+        markers=True,
+        color_discrete_map=color_map,
+        title=title,
+        # Ranks are drawn at their band midpoint; the hover shows the published band
+        hover_data={pct_field: ":.0f", "Rank": is_rank},
+        labels={
+            pct_field: "Percentile in year", "Rank": "Published rank",
+            "Rank_mid": "Rank (band midpoint)", "Score": "Overall score"
+        }
+    )
+    fig.update_traces(connectgaps=True)
+    fig.update_layout(
+        height=450,
+        margin=dict(t=30, b=30, l=30, r=30),
+        title_font=dict(size=15),
+        title_x=0.0,
+        xaxis=dict(type='category', categoryorder='category ascending'),
+        yaxis_autorange="reversed" if is_rank else True,
+        legend=dict(orientation="h", y=-0.25, x=0.5, xanchor="center", title_text=None)
+    )
+    return fig
+
+
+def gender_bar_figure(gender_data):
+    """Male/female student ratio bars per year, one facet per institution"""
+    gender_melted = gender_data.melt(
+        id_vars=["Year", "IPEDS_Name"],
+        value_vars=["Male_Ratio", "Female_Ratio"],
+        var_name="Gender",
+        value_name="Percentage"
+    )
+    gender_melted["Year"] = gender_melted["Year"].astype(str)
+
+    fig = px.bar(
+        gender_melted,
+        x="Year",
+        y="Percentage",
+        color="Gender",
+        barmode="group",
+        facet_col="IPEDS_Name",
+        color_discrete_map={
+            "Male_Ratio": "#E10600",
+            "Female_Ratio": "#1F77B4"
+        },
+        text="Percentage",
+        title="👥 Gender Distribution"
+    )
+    fig.for_each_annotation(lambda a: a.update(text=a.text.split("=")[-1] if "=" in a.text else ""))
+    fig.update_traces(textposition="inside", insidetextanchor="middle", textfont_size=10)
+    fig.update_layout(
+        height=450,
+        margin=dict(t=30, b=20, l=30, r=30),
+        title_font=dict(size=15, color="#333"),
+        title_x=0.0,
+        xaxis_title="Year",
+        yaxis_title="Percentage",
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.35,
+            xanchor="center",
+            x=0.5,
+            font=dict(size=9),
+            bgcolor='rgba(0,0,0,0)',
+            title_text=None
+        )
+    )
+    return fig
+
+
+def correlation_heatmap(matrix, title):
+    """Correlation matrix of (agency, metric) columns, red for positive and blue for negative"""
+    labels = [metric_label(column) for column in matrix.columns]
+    fig = px.imshow(
+        matrix.to_numpy(),
+        x=labels,
+        y=labels,
+        zmin=-1,
+        zmax=1,
+        color_continuous_scale="RdBu_r",
+        aspect="auto",
+        title=title,
+        labels=dict(color="r")
+    )
+    fig.update_layout(
+        height=max(600, 14 * len(labels)),
+        margin=dict(t=40, b=30, l=30, r=30),
+        title_font=dict(size=15),
+        title_x=0.0,
+        xaxis=dict(tickfont=dict(size=9)),
+        yaxis=dict(tickfont=dict(size=9))
+    )
+    return fig
+
+
+def correlation_scatter(points, x_label, y_label, title, color_map, focal_name):
+    """Every institution of one year in gray, with the ones in `color_map` drawn on top and the focal one labeled"""
+    highlighted = points.index.isin(list(color_map))
+    others = points[~highlighted]
+    fig = go.Figure(go.Scatter(
+        x=others[x_label],
+        y=others[y_label],
+        mode="markers",
+        name="All institutions",
+        marker=dict(color="#C8C8C8", size=7),
+        text=others.index,
+        hovertemplate="%{text}<br>%{x}<br>%{y}<extra></extra>"
+    ))
+    for uni, color in color_map.items():
+        if uni not in points.index:
+            continue
+        fig.add_trace(go.Scatter(
+            x=[points.at[uni, x_label]],
+            y=[points.at[uni, y_label]],
+            mode="markers+text" if uni == focal_name else "markers",
+            name=uni,
+            marker=dict(color=color, size=16 if uni == focal_name else 12, line=dict(color="white", width=1)),
+            text=[uni],
+            textposition="top center",
+            hovertemplate="%{text}<br>%{x}<br>%{y}<extra></extra>"
+        ))
+    fig.update_layout(
+        height=500,
+        margin=dict(t=40, b=30, l=30, r=30),
+        title_font=dict(size=15),
+        title_x=0.0,
+        xaxis_title=x_label,
+        yaxis_title=y_label,
+        legend=dict(orientation="h", y=-0.2, x=0.5, xanchor="center", title_text=None)
+    )
+    return fig
@@ -0,0 +1,117 @@
+"""Stable institution colors, the same in every worker process and after restarts.
+
+Benchmark peers keep their hand-picked colors and the focal institution is
+always red. Every other institution of the dataset gets a preferred slot of
+PALETTE when the data is loaded: new names take the least used slot (ties
+broken by a digest of the name, never by Python's per-process salted
+hash()), and the slots are saved in .colors.json so later loads, with more
+or fewer institutions, keep the existing assignments. Identical views
+therefore get identical color maps, and their figures can be shared
+between sessions and processes.
+
+Within one chart, an institution whose slot is already taken by another
+selected institution moves to the next free slot.
+"""
+import hashlib
+import json
+import os
+from collections import Counter
+
+COLOR_FILE = ".colors.json"
+
+FOCAL_COLOR = "#E10600"  # Red
+
+# Hand-picked colors of the benchmark, aspirational and NJ peers
+FIXED_COLORS = {
+    # Benchmark Peers
+    "Clarkson University": "#FF7F0E",  # Orange
+    "Colorado School of Mines": "#2CA02C",  # Green
+    "Florida Institute of Technology": "#D62728",  # Red
+    "Illinois Institute of Technology": "#9467BD",  # Purple
+    "Michigan Technological University": "#8C564B",  # Brown
+    "Missouri University of Science and Technology": "#E377C2",  # Pink
+    "Rensselaer Polytechnic Institute": "#7F7F7F",  # Gray
+    "Stevens Institute of Technology": "#BCBD22",  # Yellow-Green
+    "Worcester Polytechnic Institute": "#17BECF",  # Cyan
+    # Aspirational Peers
+    "California Institute of Technology": "#FF9896",  # Light Red
+    "Carnegie Mellon University": "#98DF8A",  # Light Green
+    "Georgia Institute of Technology-Main Campus": "#FFBB78",  # Light Orange
+    "Massachusetts Institute of Technology": "#C5B0D5",  # Light Purple
+    # NJ Peers
+    "Montclair State University": "#C49C94",  # Tan
+    "Rowan University": "#F7B6D2",  # Light Pink
+    "Rutgers University-New Brunswick": "#1F77B4",  # Blue
+    "Rutgers University-Newark": "#C7C7C7",  # Light Gray
+    "Seton Hall University": "#DBDB8D"  # Light Yellow
+}
+
+# Colors of every other institution
+PALETTE = [
+    "#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
+    "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf",
+    "#aec7e8", "#ffbb78", "#98df8a", "#ff9896", "#c5b0d5",
+    "#c49c94", "#f7b6d2", "#c7c7c7", "#dbdb8d", "#9edae5"
+]
+
+
+def name_slot(name):
+    """PALETTE slot derived from the name alone, identical in every process"""
+    return int(hashlib.sha1(name.encode()).hexdigest(), 16) % len(PALETTE)
+
+
+def load_color_registry(data_dir="."):
+    try:
+        with open(os.path.join(data_dir, COLOR_FILE), encoding="utf-8") as f:
+            slots = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return {name: slot for name, slot in slots.items() if isinstance(slot, int) and 0 <= slot < len(PALETTE)}
+
+
+def update_color_registry(data_dir, names):
+    """{name: PALETTE slot} for `names` plus every name saved before; new names are saved too"""
+    slots = load_color_registry(data_dir)
+    new_names = sorted(set(names) - set(slots) - set(FIXED_COLORS))
+    if not new_names:
+        return slots
+    usage = Counter(slots.values())
+    for name in new_names:
+        preferred = name_slot(name)
+        # Least used slot first, then the one closest after the name's own slot
+        slot = min(range(len(PALETTE)), key=lambda s: (usage[s], (s - preferred) % len(PALETTE)))
+        slots[name] = slot
+        usage[slot] += 1
+    path = os.path.join(data_dir, COLOR_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(slots, f, indent=0, sort_keys=True)
+        os.replace(tmp_path, path)
+    except OSError:
+        # Read-only data directory: same slots, recomputed by every process from the same inputs
+        pass
+    return slots
+
+
+def assign_colors(registry, universities, focal_name):
+    """{university: color} for one chart; no two selected institutions share a palette color while slots remain"""
+    colors = {}
+    for uni in universities:
+        if uni == focal_name:
+            colors[uni] = FOCAL_COLOR
+        elif uni in FIXED_COLORS:
+            colors[uni] = FIXED_COLORS[uni]
+    taken = {color.lower() for color in colors.values()}
+    # Sorted, so the result does not depend on the order the names were selected in
+    for uni in sorted(set(universities) - set(colors)):
+        preferred = registry.get(uni, name_slot(uni))
+        for step in range(len(PALETTE)):
+            color = PALETTE[(preferred + step) % len(PALETTE)]
+            if color not in taken:
+                break
+        else:
+            color = PALETTE[preferred]  # more institutions than colors
+        colors[uni] = color
+        taken.add(color)
+    return {uni: colors[uni] for uni in universities}
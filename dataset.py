@@ -0,0 +1,222 @@
+"""Versioned dataset with hot reload of the source files.
+
+A Dataset bundles the four agency tables, their cross-agency panel, the
+tenants (tenants.py) and their peer files under a version string derived
+from the source files' modification times and sizes. The DatasetStore polls
+those files from a background thread; when they change it loads a new
+Dataset (and lets the app build its derived indexes for it) off the request
+path, then swaps it in with a single reference assignment.
+Reruns that already hold the previous Dataset finish on it.
+
+Peer files are watched separately: an edit (from the in-app editor or on
+disk) swaps in a Dataset with the same version and new peer groups, and
+reports the changed groups so only the caches built for them are dropped.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+from analytics import add_percentile_columns, build_aligned_panel
+from color_registry import update_color_registry
+from ingest import AGENCY_FILES, load_agency_tables
+from metric_registry import HEADLINE_SCORES, RANK_COLUMNS, lower_is_better
+from peer_groups import PeerGroups, save_peer_groups
+from tenants import DEFAULT_TENANT, TENANT_FILE, load_tenants, peer_files
+
+Dataset = namedtuple("Dataset", [
+    "version",          # short hash of the workbooks' and tenants.json's signature
+    "tables",           # {agency: DataFrame}
+    "tenants",          # {key: Tenant}
+    "default_tenant",   # key of the tenant served without ?tenant=
+    "peer_groups",      # {peer file: PeerGroups, or None when the file is missing}
+    "panel",            # AlignedPanel of every agency's rank and headline score per (IPEDS_Name, Year)
+    "colors",           # {institution: palette slot} from the persisted color registry
+    "loaded_at",        # time.time() when the load finished
+])
+
+
+def source_files(data_dir="."):
+    # A broken tenants.json is still watched; the reload reports the error
+    return list(AGENCY_FILES.values()) + [TENANT_FILE]
+
+
+def file_signature(data_dir, filenames):
+    """(file, mtime_ns, size) of every file; missing files are recorded as such"""
+    signature = []
+    for filename in filenames:
+        try:
+            stat = os.stat(os.path.join(data_dir, filename))
+            signature.append((filename, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append((filename, None, None))
+    return tuple(signature)
+
+
+def source_signature(data_dir="."):
+    return file_signature(data_dir, source_files(data_dir))
+
+
+def peer_signature(data_dir, tenants):
+    return file_signature(data_dir, peer_files(tenants))
+
+
+def signature_version(signature):
+    return hashlib.sha1(repr(signature).encode()).hexdigest()[:10]
+
+
+def load_peer_groups(data_dir=".", filename=DEFAULT_TENANT.peer_file):
+    try:
+        return PeerGroups.from_frame(pd.read_csv(os.path.join(data_dir, filename)))
+    except FileNotFoundError:
+        return None
+
+
+def peer_group_changes(before, after):
+    """{peer file: [PeerGroupChange]} between two {peer file: PeerGroups or None} maps"""
+    empty = PeerGroups({})
+    changes = {}
+    for filename in set(before) | set(after):
+        diff = (before.get(filename) or empty).diff(after.get(filename) or empty)
+        if diff:
+            changes[filename] = diff
+    return changes
+
+
+def load_dataset(data_dir=".", signature=None):
+    """Read every source file into a new Dataset"""
+    # Take the signature first: a file saved mid-load then shows up as a newer version
+    signature = signature or source_signature(data_dir)
+    tenants, default_tenant = load_tenants(data_dir)
+    tables = load_agency_tables(data_dir)
+    for agency, df in tables.items():
+        df["Year"] = df["Year"].astype(int)
+        df["IPEDS_Name"] = df["IPEDS_Name"].astype(str)
+        # Sorted once by Year (stable), so a year selection is a row slice (query_backend.year_bounds)
+        df = df.sort_values("Year", kind="stable", ignore_index=True)
+        # Percentiles are stored next to the values, so rendering only looks them up
+        tables[agency] = add_percentile_columns(df, [c for c in df.columns if lower_is_better(c)])
+    peer_groups = {filename: load_peer_groups(data_dir, filename) for filename in peer_files(tenants)}
+    panel = build_aligned_panel(tables, RANK_COLUMNS, HEADLINE_SCORES)
+    colors = update_color_registry(data_dir, set().union(*(set(df["IPEDS_Name"]) for df in tables.values())))
+    return Dataset(
+        signature_version(signature), tables, tenants, default_tenant, peer_groups, panel, colors, time.time()
+    )
+
+
+class DatasetStore:
+    """The current Dataset plus a watcher that swaps in a new one when the files change.
+
+    `on_reload(dataset)` runs on the watcher thread before the swap, so the
+    app can fill its caches for the new version while sessions keep using
+    the old one. `on_peer_change(dataset, changes)` does the same when only
+    peer files changed, with the changed groups per peer file. Loading and
+    both callbacks run outside the lock, which only guards the swap, so a
+    slow prewarm never holds up a peer group save. A failed reload (say, a
+    workbook saved half-way) keeps the current version and is reported in
+    `last_error`.
+    """
+
+    def __init__(self, data_dir=".", on_reload=None, on_peer_change=None, settle_seconds=1.0):
+        self.data_dir = data_dir
+        self.on_reload = on_reload
+        self.on_peer_change = on_peer_change
+        self.settle_seconds = settle_seconds
+        self.last_error = None
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._signature = source_signature(data_dir)
+        self._current = load_dataset(data_dir, self._signature)
+        self._peer_signature = peer_signature(data_dir, self._current.tenants)
+        self._watcher = None
+
+    def current(self):
+        return self._current
+
+    def check(self):
+        """Reload if any source file changed; True when a new version or new peer groups were swapped in"""
+        signature = source_signature(self.data_dir)
+        if signature == self._signature:
+            return self.refresh_peer_groups(self.settle_seconds)
+        # Wait for the files to stop changing before reading them
+        time.sleep(self.settle_seconds)
+        if source_signature(self.data_dir) != signature:
+            return False
+
+        try:
+            # Peer files saved while loading show up as a newer peer signature on the next check
+            tenants, _ = load_tenants(self.data_dir)
+            loaded_peer_signature = peer_signature(self.data_dir, tenants)
+            dataset = load_dataset(self.data_dir, signature)
+            if self.on_reload is not None:
+                self.on_reload(dataset)
+        except Exception as exc:
+            # Keep serving the current version; the next save triggers a new attempt
+            with self._lock:
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                self._signature = signature
+            return False
+
+        with self._lock:
+            if signature == self._signature:
+                return False
+            self._signature = signature
+            self._peer_signature = loaded_peer_signature
+            self._current = dataset
+            self.last_error = None
+            self.reloads += 1
+            return True
+
+    def refresh_peer_groups(self, settle_seconds=0):
+        """Re-read the peer files if they changed; the dataset version stays the same"""
+        signature = peer_signature(self.data_dir, self._current.tenants)
+        if signature == self._peer_signature:
+            return False
+        if settle_seconds:
+            time.sleep(settle_seconds)
+            if peer_signature(self.data_dir, self._current.tenants) != signature:
+                return False
+
+        current = self._current
+        try:
+            peer_groups = {filename: load_peer_groups(self.data_dir, filename) for filename in peer_files(current.tenants)}
+            dataset = current._replace(peer_groups=peer_groups)
+            changes = peer_group_changes(current.peer_groups, peer_groups)
+            if self.on_peer_change is not None and changes:
+                self.on_peer_change(dataset, changes)
+        except Exception as exc:
+            with self._lock:
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                self._peer_signature = signature
+            return False
+
+        with self._lock:
+            # Another refresh or a full reload swapped in first; the next check compares against it
+            if signature == self._peer_signature or self._current is not current:
+                return False
+            self._peer_signature = signature
+            self._current = dataset
+            self.last_error = None
+            return True
+
+    def save_peer_groups(self, peer_file, peer_groups):
+        """Write one peer file atomically and swap the new groups in right away"""
+        save_peer_groups(os.path.join(self.data_dir, peer_file), peer_groups)
+        self.refresh_peer_groups()
+
+    def watch(self, interval=5.0):
+        """Poll the source files every `interval` seconds on a daemon thread"""
+        if self._watcher is not None:
+            return self._watcher
+
+        def poll():
+            while True:
+                time.sleep(interval)
+                self.check()
+
+        self._watcher = threading.Thread(target=poll, name="dataset-watcher", daemon=True)
+        self._watcher.start()
+        return self._watcher
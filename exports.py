@@ -0,0 +1,117 @@
+"""Downloads of the current comparison as CSV, XLSX or Parquet.
+
+Rows arrive from the query backend as a stream of frames (one per year
+partition, or one per batch of SQLite rows; see query_backend.chunks) and
+each frame is written to the file as it arrives: CSV with pandas, XLSX
+through openpyxl's write-only workbook and Parquet as one row group per
+frame. The filtered table is never assembled in one piece. Parquet needs
+pyarrow and is only offered when it is installed.
+
+    python exports.py --format xlsx --years 2025 2026
+"""
+import argparse
+import io
+import os
+import time
+from itertools import chain
+
+import pandas as pd
+from openpyxl import Workbook
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "XLSX": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+if pq is not None:
+    EXPORT_FORMATS["Parquet"] = ("parquet", "application/vnd.apache.parquet")
+
+
+def _write_csv(frames, out):
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+    for i, frame in enumerate(frames):
+        frame.to_csv(text, header=i == 0, index=False)
+    text.flush()
+    text.detach()
+
+
+def _cell(value):
+    # openpyxl writes None as an empty cell; NaN would be written as the string "nan"
+    return None if pd.isna(value) else value
+
+
+def _write_xlsx(frames, out, sheet_name):
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name[:31])  # Excel's sheet-name limit
+    for i, frame in enumerate(frames):
+        if i == 0:
+            sheet.append(list(frame.columns))
+        for row in frame.itertuples(index=False, name=None):
+            sheet.append([_cell(value) for value in row])
+    workbook.save(out)
+
+
+def _parquet_table(frame, schema=None):
+    # Rank columns mix numbers and "201–250" bands; Parquet columns need one type
+    frame = frame.astype({c: "str" for c in frame.columns if frame[c].dtype == object})
+    return pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+
+
+def _write_parquet(frames, out):
+    writer = None
+    for frame in frames:
+        table = _parquet_table(frame, writer.schema if writer is not None else None)
+        if writer is None:
+            writer = pq.ParquetWriter(out, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+
+def export_bytes(frames, columns, fmt, sheet_name="Data"):
+    """The file contents of `frames` (an iterable of frames with `columns`) in `fmt`"""
+    frames = iter(frames)
+    first = next(frames, None)
+    # An empty selection still gets a file with the header row
+    head = first if first is not None else pd.DataFrame(columns=list(columns))
+    stream = chain([head], frames)
+    out = io.BytesIO()
+    if fmt == "CSV":
+        _write_csv(stream, out)
+    elif fmt == "XLSX":
+        _write_xlsx(stream, out, sheet_name)
+    elif fmt == "Parquet" and fmt in EXPORT_FORMATS:
+        _write_parquet(stream, out)
+    else:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+    return out.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time exports of every institution on the real workbooks")
+    parser.add_argument("--format", choices=[f.lower() for f in EXPORT_FORMATS], default="csv")
+    parser.add_argument("--years", type=int, nargs="*")
+    parser.add_argument("--backend", choices=["pandas", "sqlite"], default="pandas")
+    args = parser.parse_args()
+
+    from dataset import load_dataset
+    from query_backend import open_backend
+
+    data_dir = os.path.dirname(os.path.abspath(__file__))
+    dataset = load_dataset(data_dir)
+    backend = open_backend(dataset, args.backend, data_dir)
+    fmt = next(f for f in EXPORT_FORMATS if f.lower() == args.format)
+    for agency, df in dataset.tables.items():
+        years = args.years or backend.years(agency)
+        start = time.perf_counter()
+        data = export_bytes(backend.chunks(agency, set(df["IPEDS_Name"]), years), df.columns, fmt, agency)
+        print(f"{agency:<11} {len(data) / 1024:9.1f} KiB  {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
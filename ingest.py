@@ -0,0 +1,221 @@
+"""Cold-start ingestion of the agency workbooks.
+
+The four workbooks are parsed concurrently in a process pool with openpyxl's
+read-only streaming mode, keeping the columns the metric registry references
+plus every other numeric metric (for the percentiles and the correlation
+explorer); text columns nothing reads are dropped. Running the module
+compares wall-clock time with the sequential full-width pd.read_excel path:
+
+    python ingest.py --repeat 3
+
+Ingested tables can also be stored partitioned by year (one pickle per agency
+and year under .partitions/), so a reader that needs two years loads two
+files instead of parsing the whole workbook:
+
+    python ingest.py --partition --years 2025 2026
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from analytics import numeric_metric_frame
+from metric_registry import RANK_COLUMNS, referenced_columns
+
+AGENCY_FILES = {
+    "TIMES": "TIMES.xlsx",
+    "QS": "QS.xlsx",
+    "USN": "USN.xlsx",
+    "Washington": "Washington.xlsx",
+}
+
+SHEET_NAME = "Sheet1"
+
+PARTITION_DIR = ".partitions"
+PARTITION_FORMAT = 2  # bump when the ingested columns change, so old partitions are rebuilt
+
+
+def read_workbook_columns(path, columns=None, sheet_name=SHEET_NAME):
+    """Stream one sheet and keep only `columns` (missing ones are skipped; None keeps every named column)"""
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header = next(rows)
+        positions = {name: i for i, name in enumerate(header) if name is not None}
+        wanted = list(positions) if columns is None else [c for c in columns if c in positions]
+        indexes = [positions[c] for c in wanted]
+        data = [[row[i] if i < len(row) else None for i in indexes] for row in rows]
+    finally:
+        workbook.close()
+
+    df = pd.DataFrame(data, columns=wanted)
+    # Match pd.read_excel: blank cells are NaN and numeric columns get numeric dtypes
+    return df.fillna(value=float("nan")).infer_objects()
+
+
+def project_columns(df, agency):
+    """The referenced columns of an agency table, then every other column holding numeric metrics"""
+    referenced = [c for c in referenced_columns(agency) if c in df.columns]
+    numeric = [c for c in numeric_metric_frame(df).columns if c not in set(referenced)]
+    return df[referenced + numeric]
+
+
+def _read_agency(args):
+    agency, path = args
+    return agency, project_columns(read_workbook_columns(path), agency)
+
+
+def load_agency_tables(data_dir=".", max_workers=None):
+    """Parse all agency workbooks in parallel, projected to the referenced and numeric metric columns"""
+    jobs = [(agency, os.path.join(data_dir, filename)) for agency, filename in AGENCY_FILES.items()]
+    workers = max_workers or min(len(jobs), os.cpu_count() or 1)
+    tables = None
+    if workers > 1:
+        try:
+            # spawn, not fork: the caller may be a multi-threaded Streamlit server
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                tables = dict(pool.map(_read_agency, jobs))
+        except (OSError, RuntimeError):
+            # No process pool available (sandboxed or frozen interpreters)
+            tables = None
+    if tables is None:
+        # Single core: worker start-up would cost more than it saves
+        tables = dict(map(_read_agency, jobs))
+    return {agency: tables[agency] for agency in RANK_COLUMNS}
+
+
+def load_agency_tables_sequential(data_dir="."):
+    """The original path: every column of every workbook, one after another"""
+    return {
+        agency: pd.read_excel(os.path.join(data_dir, filename), sheet_name=SHEET_NAME)
+        for agency, filename in AGENCY_FILES.items()
+    }
+
+
+def partition_by_year(df):
+    """{year: rows of that year}, each partition indexed from 0"""
+    return {int(year): part.reset_index(drop=True) for year, part in df.groupby("Year", sort=True)}
+
+
+def _source_signature(path):
+    stat = os.stat(path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _manifest_path(partition_dir, agency):
+    return os.path.join(partition_dir, agency, "manifest.json")
+
+
+def read_manifest(partition_dir, agency):
+    try:
+        with open(_manifest_path(partition_dir, agency)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_partitions(agency, df, source_path, partition_dir=PARTITION_DIR):
+    """Store one agency table as a pickle per year plus a manifest of the source workbook"""
+    agency_dir = os.path.join(partition_dir, agency)
+    os.makedirs(agency_dir, exist_ok=True)
+    partitions = partition_by_year(df)
+    for year, part in partitions.items():
+        part.to_pickle(os.path.join(agency_dir, f"{year}.pkl"))
+    manifest = {
+        "format": PARTITION_FORMAT,
+        "source": _source_signature(source_path),
+        "years": sorted(partitions),
+        "columns": list(df.columns),
+    }
+    # The manifest goes last and atomically: a reader never sees it ahead of its partitions
+    tmp_path = _manifest_path(partition_dir, agency) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, _manifest_path(partition_dir, agency))
+    return manifest
+
+
+def ensure_partitions(data_dir=".", partition_dir=None):
+    """(Re)build the year partitions of every agency whose workbook changed; returns the manifests"""
+    partition_dir = partition_dir or os.path.join(data_dir, PARTITION_DIR)
+    manifests, stale = {}, []
+    for agency, filename in AGENCY_FILES.items():
+        source_path = os.path.join(data_dir, filename)
+        manifest = read_manifest(partition_dir, agency)
+        if (manifest is None or manifest.get("format") != PARTITION_FORMAT
+                or manifest["source"] != _source_signature(source_path)):
+            stale.append(agency)
+        else:
+            manifests[agency] = manifest
+    if stale:
+        tables = load_agency_tables(data_dir)
+        for agency in stale:
+            manifests[agency] = write_partitions(
+                agency, tables[agency], os.path.join(data_dir, AGENCY_FILES[agency]), partition_dir
+            )
+    return {agency: manifests[agency] for agency in RANK_COLUMNS}
+
+
+def load_agency_years(agency, years, data_dir=".", partition_dir=None):
+    """One agency table holding only `years`, read from their partitions alone"""
+    partition_dir = partition_dir or os.path.join(data_dir, PARTITION_DIR)
+    manifest = ensure_partitions(data_dir, partition_dir)[agency]
+    selected = {int(year) for year in years}
+    wanted = [year for year in manifest["years"] if year in selected]
+    if not wanted:
+        return pd.DataFrame(columns=manifest["columns"])
+    frames = [pd.read_pickle(os.path.join(partition_dir, agency, f"{year}.pkl")) for year in wanted]
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def _time(load, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = load()
+        timings.append(time.perf_counter() - start)
+    return result, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cold-start workbook loading strategies")
+    parser.add_argument("--data-dir", default=os.path.dirname(os.path.abspath(__file__)))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--partition", action="store_true",
+                        help="build the year partitions and time loading only --years from them")
+    parser.add_argument("--years", type=int, nargs="+", help="years to load from the partitions (default: latest two)")
+    args = parser.parse_args()
+
+    if args.partition:
+        start = time.perf_counter()
+        manifests = ensure_partitions(args.data_dir)
+        print(f"partitions ready in {time.perf_counter() - start:.2f}s")
+        for agency, manifest in manifests.items():
+            years = args.years or manifest["years"][-2:]
+            part, timings = _time(lambda: load_agency_years(agency, years, args.data_dir), args.repeat)
+            full, full_timings = _time(lambda: load_agency_years(agency, manifest["years"], args.data_dir), args.repeat)
+            print(f"{agency:<11} years {years}: {len(part):>5} rows, {part.memory_usage(deep=True).sum() / 1024:8.0f} KB, "
+                  f"{statistics.median(timings) * 1000:6.1f} ms   all {len(manifest['years'])} years: {len(full):>5} rows, "
+                  f"{full.memory_usage(deep=True).sum() / 1024:8.0f} KB, {statistics.median(full_timings) * 1000:6.1f} ms")
+        return
+
+    strategies = {
+        "sequential pd.read_excel": lambda: load_agency_tables_sequential(args.data_dir),
+        "in-process projected": lambda: load_agency_tables(args.data_dir, max_workers=1),
+        "parallel projected": lambda: load_agency_tables(args.data_dir, max_workers=len(AGENCY_FILES)),
+    }
+    for name, load in strategies.items():
+        tables, timings = _time(load, args.repeat)
+        shapes = ", ".join(f"{agency} {df.shape[0]}x{df.shape[1]}" for agency, df in tables.items())
+        print(f"{name:<26} median {statistics.median(timings):6.2f}s  min {min(timings):6.2f}s  ({shapes})")
+
+
+if __name__ == "__main__":
+    main()
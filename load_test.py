@@ -0,0 +1,255 @@
+"""Concurrent-session load test for the dashboard.
+
+Simulates N browser sessions against UNIVERSITY.py with Streamlit's AppTest.
+Every session replays a scripted walk (peer groups, years, NJ filter, agency
+sections and selections) and each rerun is timed. AppTest installs and
+clears a process-global Streamlit runtime on every run, so sessions sharing
+a process break each other; each session therefore runs in its own spawned
+process, all of them at once. The report lists rerun latency percentiles of
+the sessions that completed (failed sessions are counted and left out),
+the memory growth of the session processes and their derived caches. Each
+process has its own cache, so hits between sessions are not measured here.
+
+    python load_test.py --sessions 8 --rounds 2
+    python load_test.py --sessions 16 --json load_report.json
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from streamlit.testing.v1 import AppTest
+
+from bounded_cache import cache_stats
+
+APP_SCRIPT = "UNIVERSITY.py"
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+AGENCY_KEYS = ["times", "qs", "usn", "washington"]
+
+SEARCH_QUERIES = ["rutgers", "state", "tech", "saint", "new york", "u"]
+
+SessionResult = namedtuple("SessionResult", [
+    "session_id",
+    "reruns",       # [(step, seconds)]
+    "error",        # None when every rerun completed
+    "rss_start",    # MB, before the app was first run
+    "rss_end",
+    "cache",        # cache_counters() of the session's process
+    "cache_mb",     # cache_sizes_mb() of the session's process
+])
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except OSError:
+        # Peak RSS is the best we get off Linux (KB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 ** 2 if peak > 1024 ** 3 else peak / 1024
+
+
+def cache_sizes_mb():
+    stats = cache_stats()
+    return {name.rsplit(".", 1)[-1]: function["bytes"] / 1024 ** 2 for name, function in stats.functions.items()}
+
+
+def cache_counters():
+    stats = cache_stats()
+    return {
+        "budget_mb": stats.budget_bytes / 1024 ** 2,
+        "used_mb": stats.used_bytes / 1024 ** 2,
+        "entries": stats.entries,
+        "hits": stats.hits,
+        "misses": stats.misses,
+        "evictions": stats.evictions,
+        "expirations": stats.expirations,
+        "invalidations": stats.invalidations,
+    }
+
+
+def percentile(values, pct):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _widget(elements, label):
+    return next(e for e in elements if e.label == label)
+
+
+def session_script(at, rng):
+    """Yield (step name, action) pairs; each action mutates widgets before a rerun"""
+    peer_widget = _widget(at.sidebar.multiselect, "Select Peer Groups:")
+    peer_types = list(peer_widget.options)
+    years_widget = _widget(at.sidebar.multiselect, "Select Years")
+    all_years = list(years_widget.options)
+
+    yield "peer_groups", lambda: _widget(at.sidebar.multiselect, "Select Peer Groups:").set_value(
+        rng.sample(peer_types, rng.randint(1, len(peer_types)))
+    )
+    yield "years", lambda: _widget(at.sidebar.multiselect, "Select Years").set_value(
+        sorted(rng.sample(all_years, rng.randint(1, len(all_years))), key=int)
+    )
+    for key in AGENCY_KEYS:
+        yield f"{key}_show_all", lambda key=key: at.toggle(key=f"{key}_show_all").set_value(rng.random() < 0.5)
+        section_radio = at.radio(key=f"{key}_section")
+        for option in section_radio.options[1:]:
+            yield f"{key}_section", lambda key=key, option=option: at.radio(key=f"{key}_section").set_value(option)
+        yield f"{key}_search", lambda key=key: at.text_input(key=f"{key}_search").set_value(rng.choice(SEARCH_QUERIES))
+        yield f"{key}_selection", lambda key=key: _pick_extra(at.multiselect(key=f"{key}_optional_unis"), rng)
+    yield "nj_filter", lambda: _widget(at.sidebar.selectbox, "Include Only NJ Universities?").set_value(
+        rng.choice(["All", "Yes", "No"])
+    )
+
+
+def _pick_extra(widget, rng):
+    unpicked = [o for o in widget.options if o not in widget.value]
+    if unpicked:
+        widget.set_value(list(widget.value) + [rng.choice(unpicked)])
+
+
+def _replay(at, session_id, rounds, rng, reruns):
+    """Run the session's walk; the error message of the first failed rerun, or None"""
+    start = time.perf_counter()
+    at.run()
+    reruns.append(("initial", time.perf_counter() - start))
+    if at.exception:
+        return f"session {session_id} initial: {at.exception[0].message}"
+    for _ in range(rounds):
+        for step, action in session_script(at, rng):
+            action()
+            start = time.perf_counter()
+            at.run()
+            reruns.append((step, time.perf_counter() - start))
+            if at.exception:
+                return f"session {session_id} {step}: {at.exception[0].message}"
+    return None
+
+
+def run_session(session_id, rounds, timeout):
+    """One session, in the calling (spawned) process"""
+    # The app reads its workbooks relative to the working directory
+    os.chdir(APP_DIR)
+    rss_start = current_rss_mb()
+    reruns = []
+    try:
+        at = AppTest.from_file(APP_SCRIPT, default_timeout=timeout)
+        error = _replay(at, session_id, rounds, random.Random(session_id), reruns)
+    except Exception as exc:
+        error = f"session {session_id}: {exc!r}"
+    return SessionResult(session_id, reruns, error, rss_start, current_rss_mb(), cache_counters(), cache_sizes_mb())
+
+
+def run_load_test(sessions, rounds, timeout=120):
+    wall_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=sessions, mp_context=get_context("spawn")) as pool:
+        futures = [pool.submit(run_session, i, rounds, timeout) for i in range(sessions)]
+        outcomes = []
+        for i, future in enumerate(futures):
+            try:
+                outcomes.append(future.result())
+            except Exception as exc:
+                # The session's process died (out of memory, killed)
+                outcomes.append(SessionResult(i, [], f"session {i}: {exc!r}", float("nan"), float("nan"), {}, {}))
+    wall = time.perf_counter() - wall_start
+
+    completed = [o for o in outcomes if o.error is None]
+    # A failed session's reruns time the failure, not the app
+    results = [rerun for o in completed for rerun in o.reruns]
+    latencies = [seconds for _, seconds in results]
+    by_step = {}
+    for step, seconds in results:
+        by_step.setdefault(step, []).append(seconds)
+    growth = [o.rss_end - o.rss_start for o in completed]
+    cache = {}
+    for o in completed:
+        for key, value in o.cache.items():
+            # Every process has the same budget; the other counters add up
+            cache[key] = value if key == "budget_mb" else cache.get(key, 0) + value
+    cache_mb = {}
+    for o in completed:
+        for name, size in o.cache_mb.items():
+            cache_mb[name] = max(cache_mb.get(name, 0.0), size)
+
+    return {
+        "sessions": sessions,
+        "failed_sessions": len(outcomes) - len(completed),
+        "rounds": rounds,
+        "reruns": len(latencies),
+        "wall_seconds": wall,
+        "reruns_per_second": len(latencies) / wall if wall else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 50) * 1000,
+            "p90": percentile(latencies, 90) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "max": max(latencies, default=float("nan")) * 1000,
+            "mean": statistics.fmean(latencies) * 1000 if latencies else float("nan"),
+        },
+        "step_p50_ms": {step: percentile(values, 50) * 1000 for step, values in sorted(by_step.items())},
+        # Per session process, from before the first run to the end of its walk
+        "rss_mb": {
+            "start": statistics.fmean(o.rss_start for o in completed) if completed else float("nan"),
+            "end": statistics.fmean(o.rss_end for o in completed) if completed else float("nan"),
+            "growth": statistics.fmean(growth) if growth else float("nan"),
+            "max_growth": max(growth, default=float("nan")),
+        },
+        "cache_mb": cache_mb,                  # largest per process
+        "cache": cache,                        # summed over the processes
+        "errors": [o.error for o in outcomes if o.error is not None],
+    }
+
+
+def print_report(report):
+    print(f"\n{report['sessions']} sessions x {report['rounds']} rounds, {report['failed_sessions']} failed: "
+          f"{report['reruns']} reruns of the completed sessions in {report['wall_seconds']:.1f}s "
+          f"({report['reruns_per_second']:.2f} reruns/s)")
+    print("Rerun latency (ms): " + "  ".join(f"{k}={v:.0f}" for k, v in report["latency_ms"].items()))
+    print("Median latency per step (ms):")
+    for step, value in report["step_p50_ms"].items():
+        print(f"  {step:<24}{value:>8.0f}")
+    rss = report["rss_mb"]
+    print(f"RSS per session process (MB): start={rss['start']:.0f} end={rss['end']:.0f} "
+          f"growth={rss['growth']:+.0f} max growth={rss['max_growth']:+.0f}")
+    cache = report["cache"]
+    if not cache:
+        cache = dict.fromkeys(["used_mb", "budget_mb", "entries", "hits", "misses", "evictions", "expirations"], 0)
+    print(f"Cache, all processes: {cache['used_mb']:.1f} MB (budget {cache['budget_mb']:.0f} MB each), {cache['entries']} entries, "
+          f"{cache['hits']} hits, {cache['misses']} misses, {cache['evictions']} evictions, "
+          f"{cache['expirations']} expirations")
+    print("Cache size per function, largest process (MB):")
+    for name, size in sorted(report["cache_mb"].items(), key=lambda item: -item[1]):
+        print(f"  {name:<32}{size:>8.2f}")
+    if report["errors"]:
+        print(f"{len(report['errors'])} session error(s):")
+        for error in report["errors"]:
+            print(f"  {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent dashboard sessions")
+    parser.add_argument("--sessions", type=int, default=4, help="number of concurrent sessions")
+    parser.add_argument("--rounds", type=int, default=1, help="times each session replays its script")
+    parser.add_argument("--timeout", type=float, default=120, help="per-rerun timeout in seconds")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = run_load_test(args.sessions, args.rounds, args.timeout)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    raise SystemExit(1 if report["errors"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Metric registry: the columns each agency tab shows as KPIs and charts."""
+
+# Overall rank column of each agency table
+RANK_COLUMNS = {
+    "TIMES": "Times_Rank",
+    "QS": "QS_Rank",
+    "USN": "Rank",
+    "Washington": "Washington_Rank"
+}
+
+# Columns shown in the KPI boxes of each agency tab
+KPI_METRICS = {
+    "TIMES": {
+        "Times_Rank": "🏅 Rank",
+        "Overall": "📊 Overall Score",
+        "Teaching": "📖 Teaching",
+        "Research_Quality": "🔬 Research Quality",
+        "Research_Environment": "🏛️ Research Environment",
+        "International_Students": "🌍 Intl. Students %",
+        "No_of_students_per_staff": "👩‍🏫 Student/Staff Ratio",
+        "No_of_FTE_Students": "🎓 FTE Students"
+    },
+    "QS": {
+        "QS_Rank": "🏅 QS Rank",
+        "Overall_Score": "📊 Overall Score",
+        "Academic_Reputation": "🎓 Academic Reputation",
+        "Employer_Reputation": "🏢 Employer Reputation",
+        "Citations_per_Faculty": "📖 Citations/Faculty",
+        "Faculty_Student_Ratio": "👩‍🏫 Faculty-Student Ratio",
+        "Employment_Outcomes": "💼 Employment Outcomes",
+        "Sustainability_Score": "🌱 Sustainability Score"
+    },
+    "USN": {
+        "Rank": "🏅 USN_Rank",
+        "Peer_assessment_score": "🤝 Peer Assessment",
+        "Actual_graduation_rate": "🎓 Graduation Rate", 
+        "Average_first_year_retention_rate": "📚 First-Year Retention",
+        "Faculty_resources_rank": "🏫 Faculty Resources Rank",
+        "Financial_resources_rank": "💰 Financial Resources Rank",
+        "Pell_Graduation_Rate": "🎓 Pell Grad Rate",
+        "College_grad_income_benefit_(%)": "💼 Income Benefit"
+    },
+    "Washington": {
+        "Washington_Rank": "🏅 Washington_Rank",
+        "8-year_graduation_rate": "🎓 8-Year_Graduation_Rate",
+        "Pell/non-Pell_graduation_gap": "📚 Pell_vs_Non-Pell_Grad_Gap",
+        "Affordability_rank": "💸 Affordability_Rank",  
+        "Earnings_after_9_years": "💼 Earnings_after_9_years",
+        "Service-oriented_majors_%": "🔬 Service-Oriented_Majors_%",  
+        "Work-study_service_%": "🎓 Work-Study_Service %",  
+        "Net_price_rank": "🏆 Net_Price_Rank"
+    }
+}
+
+# Columns drawn as line charts in the agency tab sections
+CHART_METRICS = {
+    "TIMES": [
+        "Teaching", "Research_Quality", "Research_Environment",
+        "International_Outlook", "Industry"
+    ],
+    "QS": [
+        "Academic_Reputation", "Citations_per_Faculty",
+        "International_Student_Ratio", "International_Faculty_Ratio"
+    ],
+    "USN": [
+        "Graduation_and_retention_rank", "Pell_Graduation_Rate", "Percent_of_full-time_faculty",
+        "Faculty_resources_rank", "Top_10%_of_HS_Class", "%_students_submitting_SAT_scores",
+        "Alumni_Giving"
+    ],
+    "Washington": [
+        "8-year_graduation_rate", "Pell/non-Pell_graduation_gap", "Actual_vs._predicted_Pell_enrollment",
+        "Net_price_of_attendance_for_families_below_$75,000_income", "Research_expenditures_(M)",
+        "Science_&_engineering_PhDs_awarded", "Bachelor's_to_PhD_rank", "Faculty_receiving_significant_awards",
+        "Work-study_service_%", "Service-oriented_majors_%", "AmeriCorps/Peace_Corps_rank", "ROTC_rank"
+    ]
+}
+
+# Published methodology weights (%) of the pillars behind each overall score
+PILLAR_WEIGHTS = {
+    "TIMES": {
+        "Teaching": 29.5,
+        "Research_Quality": 30,
+        "Research_Environment": 29,
+        "International_Outlook": 7.5,
+        "Industry": 4
+    },
+    "QS": {
+        "Academic_Reputation": 30,
+        "Employer_Reputation": 15,
+        "Citations_per_Faculty": 20,
+        "Faculty_Student_Ratio": 10,
+        "International_Faculty_Ratio": 5,
+        "International_Student_Ratio": 5,
+        "International_Research_Network": 5,
+        "Employment_Outcomes": 5,
+        "Sustainability_Score": 5
+    }
+}
+
+# Overall score column whose published rank the gap-to-target panel maps to
+OVERALL_SCORE_COLUMNS = {
+    "TIMES": "Overall",
+    "QS": "Overall_Score"
+}
+
+# Headline score of each agency, first column with a value wins (the USN column was renamed
+# in the 2026 workbook); Washington Monthly publishes no overall score
+HEADLINE_SCORES = {
+    "TIMES": ["Overall"],
+    "QS": ["Overall_Score"],
+    "USN": ["Overall_Score", "Overall_scores"]
+}
+
+# Metrics where a smaller value is better, besides every column named like a rank
+LOWER_IS_BETTER = {"No_of_students_per_staff", "Net_price_of_attendance_for_families_below_$75,000_income"}
+
+# Identity columns every agency table needs for filtering
+BASE_COLUMNS = ["Year", "IPEDS_Name", "New_Jersey_University"]
+
+# Columns charted outside CHART_METRICS (the TIMES gender bars)
+EXTRA_COLUMNS = {
+    "TIMES": ["Male_Ratio", "Female_Ratio"]
+}
+
+
+def referenced_columns(agency):
+    """Every column of an agency table the dashboard reads, in first-use order"""
+    columns = BASE_COLUMNS + [RANK_COLUMNS[agency]] + list(KPI_METRICS[agency]) \
+        + CHART_METRICS[agency] + list(PILLAR_WEIGHTS.get(agency, {})) + EXTRA_COLUMNS.get(agency, []) \
+        + HEADLINE_SCORES.get(agency, [])
+    return list(dict.fromkeys(columns))
+
+
+def lower_is_better(column):
+    """Whether a smaller value of the column ranks an institution higher"""
+    return "rank" in column.lower() or column in LOWER_IS_BETTER
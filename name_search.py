@@ -0,0 +1,122 @@
+"""Prefix index over institution names for the search-as-you-type pickers.
+
+Names are normalized (case, accents, punctuation, "St."/"Saint") and split
+into words. Every prefix of every word maps to the institutions that have
+such a word, so a query matches when each of its words starts some word of
+the name or an alias: "rutgers newark" finds "Rutgers University-Newark" and
+"njit" finds "New Jersey Institute of Technology" through its acronym.
+The pickers send only the top matches to the browser, not the full list.
+
+    python name_search.py "rutgers newark" njit "saint johns"
+"""
+import argparse
+import os
+import re
+import time
+import unicodedata
+from itertools import chain, islice
+
+# Hand-kept aliases the acronyms and word prefixes do not cover
+ALIASES = {
+    "California Institute of Technology": ["Caltech"],
+    "Georgia Institute of Technology-Main Campus": ["Georgia Tech"],
+    "Rensselaer Polytechnic Institute": ["Rensselaer"],
+    "Rutgers University-New Brunswick": ["RU New Brunswick"],
+    "Rutgers University-Newark": ["RU Newark"],
+    "Stevens Institute of Technology": ["Stevens Tech"],
+    "Missouri University of Science and Technology": ["Missouri S&T"],
+}
+
+ACRONYM_STOPWORDS = {"of", "the", "and", "at", "in", "for"}
+
+_WORD_FORMS = {"st": "saint", "univ": "university"}
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text):
+    """Lower-case ASCII words: "St. John's University-New York" -> "saint johns university new york" """
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode().lower()
+    text = text.replace("'", "").replace("&", " and ")
+    return " ".join(_WORD_FORMS.get(word, word) for word in _NON_WORD.sub(" ", text).split())
+
+
+def acronym(words):
+    initials = "".join(word[0] for word in words if word not in ACRONYM_STOPWORDS)
+    return initials if len(initials) >= 2 else None
+
+
+class NameIndex:
+    """Word-prefix index of institution names plus their aliases and acronyms"""
+
+    def __init__(self, names, aliases=None):
+        aliases = aliases or {}
+        # Ids follow the display order of ties: shorter names first, then alphabetical
+        self.names = sorted(set(names), key=lambda name: (len(name), name))
+        self.normalized = [normalize(name) for name in self.names]
+        self._prefixes = {}
+        self._words = {}   # whole word -> institutions having it
+        for i, (name, normalized) in enumerate(zip(self.names, self.normalized)):
+            words = set(normalized.split())
+            short = acronym(normalized.split())
+            if short:
+                words.add(short)
+            for alias in list(ALIASES.get(name, ())) + list(aliases.get(name, ())):
+                alias_words = normalize(alias).split()
+                words.update(alias_words)
+                words.add("".join(alias_words))
+            for word in words:
+                self._words.setdefault(word, set()).add(i)
+                for end in range(1, len(word) + 1):
+                    self._prefixes.setdefault(word[:end], set()).add(i)
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query, allowed=None, limit=20):
+        """Up to `limit` names matching every word of `query`, best first, restricted to `allowed`"""
+        words = normalize(query).split()
+        if not words:
+            return []
+        candidates = sorted((self._prefixes.get(word, set()) for word in set(words)), key=len)
+        matches = candidates[0].intersection(*candidates[1:])
+        if allowed is not None:
+            matches = {i for i in matches if self.names[i] in allowed}
+        phrase = " ".join(words)
+
+        def starts(i):
+            return self.normalized[i].startswith(phrase)
+
+        # Best first: every query word is a whole word (or alias/acronym), then the name starts
+        # with the query, then shorter names. Broad one-letter queries stop once `limit` are found.
+        exact = matches.intersection(*(self._words.get(word, set()) for word in words))
+        ranked = sorted(exact, key=lambda i: (not starts(i), i))
+        rest = sorted(matches - exact)
+        ranked += islice(chain((i for i in rest if starts(i)), (i for i in rest if not starts(i))), limit)
+        return [self.names[i] for i in ranked[:limit]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time institution-name searches on the real workbooks")
+    parser.add_argument("queries", nargs="*", default=["rutgers newark", "njit", "saint johns", "u", "georgia tech"])
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    from dataset import load_dataset
+
+    dataset = load_dataset(os.path.dirname(os.path.abspath(__file__)))
+    names = set().union(*(set(df["IPEDS_Name"]) for df in dataset.tables.values()))
+    start = time.perf_counter()
+    index = NameIndex(names)
+    print(f"indexed {len(index)} names in {(time.perf_counter() - start) * 1000:.1f} ms")
+    for query in args.queries:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            matches = index.search(query, limit=args.limit)
+        per_query_us = (time.perf_counter() - start) / args.repeat * 1e6
+        print(f"{query!r:<18} {per_query_us:8.1f} us  {matches[:5]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Peer groups of one peer file, indexed by group.
+
+A peer file (peer.csv by default) lists PEER_TYPE,PEER_NAME rows. PeerGroups
+keeps them as {group: members} in file order, so the sidebar reads a group
+with a dict lookup instead of a scan of the frame. Names the dataset does
+not know (a typo in a hand-edited file) are reported by unknown_members().
+The in-app editor changes one group at a time and writes the file back
+atomically; diff() tells which groups an edit touched, so only the caches
+built for those groups are dropped.
+"""
+import os
+from collections import namedtuple
+
+import pandas as pd
+
+PEER_COLUMNS = ["PEER_TYPE", "PEER_NAME"]
+
+# One changed group: its members before and after the edit (empty when added or removed)
+PeerGroupChange = namedtuple("PeerGroupChange", ["group", "before", "after"])
+
+
+class PeerGroups:
+    """{group: members} in file order"""
+
+    def __init__(self, groups):
+        self.groups = {group: tuple(dict.fromkeys(members)) for group, members in groups.items()}
+
+    @classmethod
+    def from_frame(cls, df):
+        groups = {}
+        for group, name in zip(df["PEER_TYPE"], df["PEER_NAME"]):
+            groups.setdefault(str(group).strip(), []).append(str(name).strip())
+        return cls(groups)
+
+    def to_frame(self):
+        rows = [(group, name) for group, members in self.groups.items() for name in members]
+        return pd.DataFrame(rows, columns=PEER_COLUMNS)
+
+    def types(self):
+        return sorted(self.groups)
+
+    def members(self, groups):
+        """Members of `groups`, each once, in file order"""
+        return list(dict.fromkeys(name for group in groups for name in self.groups.get(group, ())))
+
+    def unknown_members(self, universe):
+        """Members that are not institutions of the dataset"""
+        universe = set(universe)
+        return sorted({name for members in self.groups.values() for name in members if name not in universe})
+
+    def with_group(self, group, members, universe, previous_name=None):
+        """A copy with `group` set to `members` (renamed from `previous_name`), validated against `universe`"""
+        group = group.strip()
+        if not group:
+            raise ValueError("A peer group needs a name.")
+        if not members:
+            raise ValueError(f"Peer group '{group}' needs at least one institution.")
+        unknown = sorted(set(members) - set(universe))
+        if unknown:
+            raise ValueError(f"Not institutions of the dataset: {', '.join(unknown)}")
+        if group != previous_name and group in self.groups:
+            raise ValueError(f"A peer group named '{group}' already exists.")
+        groups = {}
+        for name, current in self.groups.items():
+            # A renamed group keeps its position in the file
+            if name == previous_name or name == group:
+                groups[group] = members
+            else:
+                groups[name] = current
+        groups.setdefault(group, members)
+        return PeerGroups(groups)
+
+    def without_group(self, group):
+        return PeerGroups({name: members for name, members in self.groups.items() if name != group})
+
+    def diff(self, other):
+        """PeerGroupChange for every group whose members differ between self and `other`"""
+        changes = []
+        for group in dict.fromkeys(list(self.groups) + list(other.groups)):
+            before, after = self.groups.get(group, ()), other.groups.get(group, ())
+            if before != after:
+                changes.append(PeerGroupChange(group, before, after))
+        return changes
+
+
+def save_peer_groups(path, peer_groups):
+    """Write the peer file through a temp file and os.replace, so readers never see half of it"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    # peer.csv ships with CRLF line endings; keep them
+    peer_groups.to_frame().to_csv(tmp_path, index=False, lineterminator="\r\n")
+    os.replace(tmp_path, path)
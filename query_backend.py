@@ -0,0 +1,389 @@
+"""Query backends behind the dashboard's filter, KPI and series lookups.
+
+Both backends answer the same questions for a dataset version:
+
+    backend.frame(agency, universities, years, columns=None)   # rows of those institutions and years
+    backend.chunks(agency, universities, years, columns=None)  # the same rows as a stream of frames
+    backend.years(agency)                                       # years present in the agency table
+    backend.peer_groups(peer_file)                              # PEER_TYPE/PEER_NAME rows, or None
+
+PandasBackend slices the in-memory tables, which are sorted by Year, at each
+year's row bounds.
+SQLiteBackend stores the agency tables and peer files in one local SQLite file
+indexed on (IPEDS_Name, Year) and (Year, metric), so several worker processes
+and the report tooling read the same data without each holding a copy of every
+year. Rows come back in the same order and with the same dtypes either way.
+
+The file is rebuilt (atomically) when the dataset version changes; a peer
+group edit only rewrites the peer tables (update_peer_groups). Compare
+per-query latency and per-worker memory of the two with:
+
+    python query_backend.py --repeat 20
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import statistics
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from metric_registry import CHART_METRICS, KPI_METRICS, RANK_COLUMNS
+from tenants import DEFAULT_TENANT
+
+SQLITE_FILE = ".ranking.sqlite"
+SQLITE_SCHEMA = "3"  # bump when write_sqlite or the ingested columns change, so old files are rebuilt
+
+BACKENDS = ("pandas", "sqlite")
+
+CHUNK_ROWS = 500  # rows per frame of a SQLite chunks() stream
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def year_bounds(df):
+    """{year: (start, stop)} row span of each year in a table sorted by Year"""
+    years = df["Year"].to_numpy()
+    present = np.unique(years)
+    starts = np.searchsorted(years, present, side="left")
+    stops = np.searchsorted(years, present, side="right")
+    return {int(year): (int(start), int(stop)) for year, start, stop in zip(present, starts, stops)}
+
+
+class PandasBackend:
+    """Filters the Dataset's tables in memory, touching only the selected years' rows.
+
+    The tables come sorted by Year (load_dataset), so each year is one row
+    span; a run of consecutive years is a single iloc slice of the table
+    rather than a copy.
+    """
+
+    def __init__(self, dataset):
+        self.version = dataset.version
+        self._tables = {}
+        self._bounds = {}
+        for agency, df in dataset.tables.items():
+            if not df["Year"].is_monotonic_increasing:
+                df = df.sort_values("Year", kind="stable", ignore_index=True)
+            self._tables[agency] = df
+            self._bounds[agency] = year_bounds(df)
+        self._peer_groups = dataset.peer_groups
+
+    def update_peer_groups(self, peer_groups):
+        self._peer_groups = peer_groups
+
+    def years(self, agency):
+        return sorted(self._bounds[agency])
+
+    def _spans(self, agency, years):
+        # Row spans of the selected years, adjacent spans merged
+        bounds = self._bounds[agency]
+        spans = []
+        for year in sorted(set(years)):
+            if year not in bounds:
+                continue
+            start, stop = bounds[year]
+            if spans and spans[-1][1] == start:
+                spans[-1] = (spans[-1][0], stop)
+            else:
+                spans.append((start, stop))
+        return spans
+
+    def frame(self, agency, universities, years, columns=None):
+        df = self._tables[agency]
+        slices = [df.iloc[start:stop] for start, stop in self._spans(agency, years)]
+        if not slices:
+            frame = df.iloc[0:0]
+        else:
+            frame = pd.concat(slices) if len(slices) > 1 else slices[0]
+        frame = frame[frame["IPEDS_Name"].isin(universities)]
+        return frame if columns is None else frame[list(columns)]
+
+    def chunks(self, agency, universities, years, columns=None):
+        # One frame per selected year
+        df = self._tables[agency]
+        bounds = self._bounds[agency]
+        for year in sorted(set(years)):
+            if year in bounds:
+                start, stop = bounds[year]
+                frame = df.iloc[start:stop]
+                frame = frame[frame["IPEDS_Name"].isin(universities)]
+                if not frame.empty:
+                    yield frame if columns is None else frame[list(columns)]
+
+    def peer_groups(self, peer_file):
+        groups = self._peer_groups.get(peer_file)
+        return None if groups is None else groups.to_frame()
+
+
+class SQLiteBackend:
+    """Parameterized queries against the indexed SQLite copy of one dataset version.
+
+    Connections are per thread (Streamlit runs each session on its own
+    thread); a file replaced by a newer version stays readable through the
+    connections that already have it open.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        meta = dict(self._execute("SELECT key, value FROM meta").fetchall())
+        self.version = meta["version"]
+        self._dtypes = {}
+        for agency, name, dtype in self._execute("SELECT agency, name, dtype FROM columns ORDER BY agency, position"):
+            self._dtypes.setdefault(agency, {})[name] = dtype
+        self._years = {
+            agency: [int(y) for (y,) in self._execute(f"SELECT DISTINCT Year FROM {_quote(agency)} ORDER BY Year")]
+            for agency in self._dtypes
+        }
+
+    @classmethod
+    def build(cls, dataset, path):
+        """Open the file for `dataset.version`, writing it first when it is missing or stale"""
+        if read_sqlite_version(path) != dataset.version:
+            write_sqlite(dataset, path)
+        backend = cls(path)
+        backend.update_peer_groups(dataset.peer_groups)
+        return backend
+
+    def update_peer_groups(self, peer_groups):
+        """Rewrite the peer tables in place (one transaction) when they differ from `peer_groups`"""
+        digest = _peer_digest(peer_groups)
+        if self._execute("SELECT value FROM meta WHERE key = 'peers'").fetchone() == (digest,):
+            return
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:
+                _write_peer_groups(conn, peer_groups)
+        finally:
+            conn.close()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            self._local.conn = conn
+        return conn
+
+    def _execute(self, sql, params=()):
+        return self._connection().execute(sql, params)
+
+    def years(self, agency):
+        return list(self._years[agency])
+
+    def _select(self, agency, universities, years, columns):
+        # One JSON parameter per list: no SQL text built from values, no bound-parameter limit
+        sql = (
+            f"SELECT {', '.join(_quote(c) for c in columns)} FROM {_quote(agency)} "
+            "WHERE Year IN (SELECT value FROM json_each(?)) "
+            "AND IPEDS_Name IN (SELECT value FROM json_each(?)) "
+            "ORDER BY Year, rowid"
+        )
+        return self._execute(sql, (json.dumps([int(y) for y in years]), json.dumps(list(universities))))
+
+    def frame(self, agency, universities, years, columns=None):
+        dtypes = self._dtypes[agency]
+        columns = list(dtypes) if columns is None else list(columns)
+        return _build_frame(self._select(agency, universities, years, columns).fetchall(), columns, dtypes)
+
+    def chunks(self, agency, universities, years, columns=None, chunk_rows=CHUNK_ROWS):
+        # Batches of the cursor, so only chunk_rows rows are held at a time
+        dtypes = self._dtypes[agency]
+        columns = list(dtypes) if columns is None else list(columns)
+        cursor = self._select(agency, universities, years, columns)
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                return
+            yield _build_frame(rows, columns, dtypes)
+
+    def peer_groups(self, peer_file):
+        present = self._execute("SELECT present FROM peer_files WHERE peer_file = ?", (peer_file,)).fetchone()
+        if not present or not present[0]:
+            return None
+        rows = self._execute(
+            "SELECT PEER_TYPE, PEER_NAME FROM peer_groups WHERE peer_file = ? ORDER BY position", (peer_file,)
+        ).fetchall()
+        return _build_frame(rows, ["PEER_TYPE", "PEER_NAME"], {"PEER_TYPE": "str", "PEER_NAME": "str"})
+
+
+def _build_frame(rows, columns, dtypes):
+    # SQLite keeps each value's own type; rebuild every column with its pandas dtype (NULL -> NaN)
+    values = list(zip(*rows)) if rows else [()] * len(columns)
+    data = {}
+    for column, column_values in zip(columns, values):
+        dtype = dtypes[column]
+        if dtype == "object":
+            data[column] = pd.Series([np.nan if v is None else v for v in column_values], dtype=object)
+        elif dtype in ("str", "string"):
+            data[column] = pd.Series(column_values, dtype=dtype)
+        else:
+            data[column] = np.array(column_values, dtype=dtype)
+    return pd.DataFrame(data, columns=columns)
+
+
+def _column_values(series):
+    # Python scalars for sqlite3, NULL for missing values
+    values = series.tolist()
+    return [None if v is None or (isinstance(v, float) and np.isnan(v)) else v for v in values]
+
+
+def read_sqlite_version(path):
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    except sqlite3.Error:
+        return None
+    try:
+        meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        return meta.get("version") if meta.get("schema") == SQLITE_SCHEMA else None
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+
+
+def _peer_digest(peer_groups):
+    groups = sorted((f, None if g is None else list(g.groups.items())) for f, g in peer_groups.items())
+    return hashlib.sha1(repr(groups).encode()).hexdigest()[:10]
+
+
+def _write_peer_groups(conn, peer_groups):
+    conn.execute("DELETE FROM peer_groups")
+    conn.execute("DELETE FROM peer_files")
+    for peer_file, groups in peer_groups.items():
+        conn.execute("INSERT INTO peer_files VALUES (?, ?)", (peer_file, groups is not None))
+        if groups is None:
+            continue
+        rows = [(group, name) for group, members in groups.groups.items() for name in members]
+        conn.executemany(
+            "INSERT INTO peer_groups VALUES (?, ?, ?, ?)",
+            [(peer_file, i, group, name) for i, (group, name) in enumerate(rows)],
+        )
+    conn.execute("INSERT OR REPLACE INTO meta VALUES ('peers', ?)", (_peer_digest(peer_groups),))
+
+
+def write_sqlite(dataset, path):
+    """Write the dataset's agency tables and peer files to `path`, replacing it atomically"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("CREATE TABLE columns (agency TEXT, position INTEGER, name TEXT, dtype TEXT)")
+        for agency, df in dataset.tables.items():
+            # Untyped columns: "201–250" rank bands and numbers share a column without conversion
+            conn.execute(f"CREATE TABLE {_quote(agency)} ({', '.join(_quote(c) for c in df.columns)})")
+            conn.executemany(
+                f"INSERT INTO {_quote(agency)} VALUES ({', '.join('?' * len(df.columns))})",
+                zip(*(_column_values(df[c]) for c in df.columns)),
+            )
+            conn.executemany(
+                "INSERT INTO columns VALUES (?, ?, ?, ?)",
+                [(agency, i, c, str(dtype)) for i, (c, dtype) in enumerate(df.dtypes.items())],
+            )
+            conn.execute(f"CREATE INDEX {_quote(f'{agency}_name_year')} ON {_quote(agency)} (IPEDS_Name, Year)")
+            for metric in [RANK_COLUMNS[agency]] + list(CHART_METRICS[agency]):
+                if metric in df.columns:
+                    conn.execute(
+                        f"CREATE INDEX {_quote(f'{agency}_year_{metric}')} ON {_quote(agency)} (Year, {_quote(metric)})"
+                    )
+
+        conn.execute("CREATE TABLE peer_groups (peer_file TEXT, position INTEGER, PEER_TYPE TEXT, PEER_NAME TEXT)")
+        conn.execute("CREATE TABLE peer_files (peer_file TEXT PRIMARY KEY, present INTEGER)")
+        conn.execute("CREATE INDEX peer_groups_file ON peer_groups (peer_file, position)")
+        _write_peer_groups(conn, dataset.peer_groups)
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [("schema", SQLITE_SCHEMA), ("version", dataset.version)])
+        conn.commit()
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    # Readers see either the old file or the complete new one
+    os.replace(tmp_path, path)
+
+
+def open_backend(dataset, kind="pandas", data_dir="."):
+    if kind == "pandas":
+        return PandasBackend(dataset)
+    if kind == "sqlite":
+        return SQLiteBackend.build(dataset, os.path.join(data_dir, SQLITE_FILE))
+    raise ValueError(f"unknown query backend {kind!r} (expected one of {', '.join(BACKENDS)})")
+
+
+# --- Benchmark: per-query latency and per-worker memory ---
+
+
+def _current_rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+
+
+def benchmark_queries(backend, selection, repeat):
+    """Median ms per query kind: the tab filter (all years, latest two), the KPI row and one chart series"""
+    timings = {"filter_all": [], "filter_2y": [], "kpi": [], "series": []}
+    for _ in range(repeat):
+        for agency in RANK_COLUMNS:
+            years = backend.years(agency)
+            metric = CHART_METRICS[agency][0]
+            kpi_metrics = list(KPI_METRICS[agency])
+            queries = {
+                "filter_all": lambda: backend.frame(agency, selection, years),
+                "filter_2y": lambda: backend.frame(agency, selection, years[-2:]),
+                "kpi": lambda: backend.frame(agency, selection, years[-1:], ["IPEDS_Name"] + kpi_metrics),
+                "series": lambda: backend.frame(agency, selection, years, ["Year", "IPEDS_Name", metric]),
+            }
+            for kind, query in queries.items():
+                start = time.perf_counter()
+                query()
+                timings[kind].append(time.perf_counter() - start)
+    return {kind: statistics.median(values) * 1000 for kind, values in timings.items()}
+
+
+def _worker(kind, data_dir, repeat, results):
+    # A fresh process per backend: what one extra Streamlit or report worker would pay
+    from dataset import load_dataset
+
+    baseline = _current_rss_mb()
+    if kind == "pandas":
+        backend = PandasBackend(load_dataset(data_dir))
+    else:
+        backend = SQLiteBackend(os.path.join(data_dir, SQLITE_FILE))
+    peers = backend.peer_groups(DEFAULT_TENANT.peer_file)
+    selection = [DEFAULT_TENANT.focal] + ([] if peers is None else peers["PEER_NAME"].tolist())
+    latency = benchmark_queries(backend, selection, repeat)
+    results.put((kind, latency, _current_rss_mb() - baseline))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the pandas and SQLite query backends")
+    parser.add_argument("--data-dir", default=os.path.dirname(os.path.abspath(__file__)))
+    parser.add_argument("--repeat", type=int, default=20, help="runs of each query per agency (median is reported)")
+    args = parser.parse_args()
+
+    from dataset import load_dataset
+
+    start = time.perf_counter()
+    write_sqlite(load_dataset(args.data_dir), os.path.join(args.data_dir, SQLITE_FILE))
+    size_mb = os.path.getsize(os.path.join(args.data_dir, SQLITE_FILE)) / 1024 ** 2
+    print(f"{SQLITE_FILE} written in {time.perf_counter() - start:.2f}s ({size_mb:.1f} MB)")
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    for kind in BACKENDS:
+        worker = context.Process(target=_worker, args=(kind, args.data_dir, args.repeat, results))
+        worker.start()
+        kind, latency, rss_mb = results.get()
+        worker.join()
+        cells = "  ".join(f"{name} {ms:6.2f} ms" for name, ms in latency.items())
+        print(f"{kind:<7} {cells}  worker memory +{rss_mb:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
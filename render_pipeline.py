@@ -0,0 +1,153 @@
+"""Concurrent figure construction for one rerun of the dashboard.
+
+A view's figures do not depend on each other, so instead of drawing each
+one where it is built, the page submits the builder to a FigurePipeline and
+leaves a placeholder behind; flush() then draws each figure in submission
+order into its placeholder on the script thread, the only one allowed to
+call Streamlit. Every figure gets a FigureTiming, so the page can show what
+was built, waited for and rendered.
+
+By default the builders (cache lookups, or plotly express on a miss) run
+inline at submit. They are pure Python, so threads mostly contend for the
+GIL with the script thread and with other sessions' reruns; a builder pool
+(RANKING_RENDER_WORKERS > 0) only pays off where the builds wait on
+something else. The benchmark compares the two.
+
+st.plotly_chart serializes each figure with plotly.io.to_json. Plotly
+already turns NumPy arrays into base64 typed arrays in to_dict(), so the
+JSON left to encode is small; on those payloads plotly's "orjson" engine is
+slower than the stdlib one because it re-walks the dict first (see the
+benchmark). PLOTLY_JSON_ENGINE picks the engine, "json" by default.
+
+    RANKING_RENDER_WORKERS=0      figure builder threads (default 0: built inline)
+    RANKING_PLOTLY_JSON=json      plotly.io JSON engine: json, orjson or auto
+
+    python render_pipeline.py --repeat 5
+"""
+import argparse
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import plotly.io as pio
+
+RENDER_WORKERS = int(os.environ.get("RANKING_RENDER_WORKERS", "0"))
+PLOTLY_JSON_ENGINE = os.environ.get("RANKING_PLOTLY_JSON", "json")
+
+FigureTiming = namedtuple("FigureTiming", [
+    "name",
+    "build_seconds",    # in the pool: cache lookup or construction
+    "wait_seconds",     # script thread blocked on the figure in flush()
+    "render_seconds",   # st.plotly_chart, including plotly's to_dict and JSON encoding
+])
+
+# One pool per process, shared by every session's reruns (None: build inline)
+_POOL = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix="figure-builder") if RENDER_WORKERS else None
+
+
+def configure_plotly_json(engine=PLOTLY_JSON_ENGINE):
+    pio.json.config.default_engine = engine
+
+
+def _timed(build):
+    start = time.perf_counter()
+    figure = build()
+    return figure, time.perf_counter() - start
+
+
+class FigurePipeline:
+    """Figures of one rerun, built inline or on the shared pool and drawn in submission order"""
+
+    def __init__(self, pool=None):
+        self._pool = pool or _POOL
+        self._pending = []   # (name, future, render)
+        self.timings = []
+
+    def submit(self, name, build, render):
+        """Run `build()` now or start it on the pool; `render(figure)` runs on the calling thread in flush()"""
+        if self._pool is None:
+            future = Future()
+            try:
+                future.set_result(_timed(build))
+            except Exception as exc:
+                future.set_exception(exc)
+        else:
+            future = self._pool.submit(_timed, build)
+        self._pending.append((name, future, render))
+
+    def flush(self):
+        """Draw every submitted figure; a builder's exception is raised here, as if it had run inline"""
+        pending, self._pending = self._pending, []
+        for name, future, render in pending:
+            start = time.perf_counter()
+            figure, build_seconds = future.result()
+            waited = time.perf_counter() - start
+            start = time.perf_counter()
+            render(figure)
+            self.timings.append(FigureTiming(name, build_seconds, waited, time.perf_counter() - start))
+        return self.timings
+
+
+def summarize(timings):
+    """(seconds the script thread spent waiting for and drawing figures, seconds of building)"""
+    script = sum(t.wait_seconds + t.render_seconds for t in timings)
+    building = sum(t.build_seconds for t in timings)
+    return script, building
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time figure builds and JSON engines on the real workbooks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--institutions", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=RENDER_WORKERS or 4, help="builder threads to compare against")
+    args = parser.parse_args()
+
+    from analytics import percentile_column
+    from charts import build_line_chart, gender_bar_figure, rank_band_figure
+    from color_registry import assign_colors
+    from dataset import load_dataset
+    from metric_registry import CHART_METRICS
+    from query_backend import open_backend
+
+    dataset = load_dataset(os.path.dirname(os.path.abspath(__file__)))
+    backend = open_backend(dataset)
+    universities = sorted(set(dataset.tables["TIMES"]["IPEDS_Name"]))[:args.institutions]
+    color_map = assign_colors(dataset.colors, universities, universities[0])
+    frame = backend.frame("TIMES", universities, backend.years("TIMES"))
+    builders = [
+        lambda metric=metric: build_line_chart(
+            frame[["Year", "IPEDS_Name", metric, percentile_column(metric)]], metric, color_map, 400, None
+        )
+        for metric in CHART_METRICS["TIMES"]
+    ] + [
+        lambda: rank_band_figure(frame, "Times_Rank", "TIMES Rank", universities, color_map),
+        lambda: gender_bar_figure(frame[["Year", "IPEDS_Name", "Male_Ratio", "Female_Ratio"]]),
+    ]
+
+    def best_ms(run):
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            run()
+            times.append((time.perf_counter() - start) * 1000)
+        return min(times)
+
+    print(f"{len(builders)} TIMES figures for {len(universities)} institutions, {os.cpu_count()} CPUs")
+    print(f"  built one after another  {best_ms(lambda: [build() for build in builders]):8.1f} ms")
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        print(f"  built on {args.workers} threads       "
+              f"{best_ms(lambda: [f.result() for f in [pool.submit(build) for build in builders]]):8.1f} ms")
+
+    specs = [build().to_dict() for build in builders]
+    for engine in ["json", "orjson"]:
+        try:
+            ms = best_ms(lambda: [pio.to_json(spec, validate=False, engine=engine) for spec in specs])
+        except ValueError as exc:
+            print(f"  to_json {engine:<7} unavailable ({exc})")
+            continue
+        print(f"  to_json {engine:<7}          {ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
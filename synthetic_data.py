@@ -0,0 +1,123 @@
+"""Schema-faithful synthetic TIMES/QS/USN/Washington datasets for scale testing.
+
+Each synthetic table keeps the real workbook's columns, dtypes and value formats
+("201–250" rank bands, "1501+", "7%", "7,148", missing values, NJ flags) by
+bootstrapping every metric column from the real data, while the number of
+institutions and years is multiplied by the requested scale factors. The real
+institutions are kept so NJIT and the peer groups still resolve.
+
+    python synthetic_data.py --uni-scale 10 --year-scale 2 --out synthetic_10x
+"""
+import argparse
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from analytics import NON_METRIC_COLUMNS
+from ingest import AGENCY_FILES, SHEET_NAME
+
+# Columns that hold the institution's display name in each workbook
+NAME_COLUMNS = ["IPEDS_Name", "Institution", "Institution_Name", "Name"]
+
+
+def load_templates(data_dir="."):
+    return {
+        agency: pd.read_excel(os.path.join(data_dir, filename), sheet_name=SHEET_NAME)
+        for agency, filename in AGENCY_FILES.items()
+    }
+
+
+def scaled_years(years, year_scale):
+    years = sorted(int(y) for y in years)
+    extra = len(years) * (year_scale - 1)
+    return list(range(years[0] - extra, years[0])) + years
+
+
+def synthesize_agency(template, uni_scale=1, year_scale=1, seed=0):
+    """Synthetic table for one agency, ~uni_scale * year_scale times the template's rows"""
+    rng = np.random.default_rng(seed)
+    template = template.reset_index(drop=True)
+
+    real_unis = template["IPEDS_Name"].astype(str).unique()
+    n_unis = int(len(real_unis) * uni_scale)
+    synthetic_names = [f"Synthetic University {i:06d}" for i in range(n_unis - len(real_unis))]
+    universities = np.concatenate([real_unis, np.array(synthetic_names, dtype=object)])
+
+    years = scaled_years(template["Year"].unique(), year_scale)
+    # Same (institution, year) density as the real table
+    coverage = len(template) / (len(real_unis) * template["Year"].nunique())
+    present = rng.random((len(universities), len(years))) < coverage
+    uni_idx, year_idx = np.nonzero(present)
+    n_rows = len(uni_idx)
+
+    # Identity columns come from one template row per institution so names,
+    # states and NJ flags stay consistent across its years
+    identity_cols = [c for c in template.columns if c in NON_METRIC_COLUMNS and c != "Year"]
+    first_rows = template.drop_duplicates("IPEDS_Name").set_index("IPEDS_Name")
+    identity_rows = np.concatenate([
+        first_rows.index.get_indexer(real_unis),
+        rng.integers(0, len(first_rows), len(synthetic_names)),
+    ])
+    identity = first_rows.reset_index()[identity_cols].iloc[identity_rows[uni_idx]].reset_index(drop=True)
+
+    data = {}
+    for col in template.columns:
+        if col == "Year":
+            data[col] = np.array(years)[year_idx]
+        elif col in identity_cols:
+            data[col] = identity[col].to_numpy()
+        else:
+            # Bootstrap the real column: keeps its formats, spread and NaN rate
+            data[col] = template[col].to_numpy()[rng.integers(0, len(template), n_rows)]
+
+    synthetic = pd.DataFrame(data, columns=template.columns)
+    names = universities[uni_idx]
+    for col in NAME_COLUMNS:
+        if col in synthetic.columns:
+            synthetic[col] = names
+    synthetic_ids = (900000 + uni_idx).astype(float)
+    real_mask = uni_idx < len(real_unis)
+    for col in ["IPEDS_ID", "IPEDS_ID.1", "UnitID"]:
+        if col in synthetic.columns:
+            synthetic[col] = np.where(real_mask, identity[col].to_numpy(dtype=float), synthetic_ids)
+    return synthetic.astype(template.dtypes.to_dict(), errors="ignore")
+
+
+def generate_datasets(uni_scale=1, year_scale=1, seed=0, templates=None, data_dir="."):
+    templates = templates if templates is not None else load_templates(data_dir)
+    return {
+        agency: synthesize_agency(template, uni_scale, year_scale, seed + i)
+        for i, (agency, template) in enumerate(templates.items())
+    }
+
+
+def write_datasets(datasets, out_dir, data_dir="."):
+    """Write workbooks (plus peer.csv) laid out like the app's data directory"""
+    os.makedirs(out_dir, exist_ok=True)
+    for agency, df in datasets.items():
+        df.to_excel(os.path.join(out_dir, AGENCY_FILES[agency]), sheet_name=SHEET_NAME, index=False)
+    shutil.copy(os.path.join(data_dir, "peer.csv"), os.path.join(out_dir, "peer.csv"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic ranking workbooks")
+    parser.add_argument("--uni-scale", type=float, default=10, help="multiplier on the number of institutions")
+    parser.add_argument("--year-scale", type=int, default=1, help="multiplier on the number of years")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=os.path.dirname(os.path.abspath(__file__)),
+                        help="directory with the real workbooks used as templates")
+    parser.add_argument("--out", required=True, help="output directory")
+    args = parser.parse_args()
+
+    datasets = generate_datasets(args.uni_scale, args.year_scale, args.seed, data_dir=args.data_dir)
+    for agency, df in datasets.items():
+        print(f"{agency:<12}{len(df):>10,} rows  {df['IPEDS_Name'].nunique():>8,} institutions  "
+              f"{df['Year'].nunique():>4} years")
+    write_datasets(datasets, args.out, args.data_dir)
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Tenants: the focal institution, default comparator and peer file of each campus.
+
+One deployment serves several campuses over the same dataset. The built-in
+tenant is NJIT; more are declared in tenants.json and picked with
+?tenant=<key> in the URL:
+
+    {
+      "default": "njit",
+      "tenants": {
+        "rutgers-newark": {
+          "focal": "Rutgers University-Newark",
+          "comparator": "New Jersey Institute of Technology",
+          "peer_file": "peer_rutgers_newark.csv",
+          "short_name": "RU-Newark"
+        }
+      }
+    }
+
+Only "focal" is required; the comparator defaults to none, the peer file to
+peer.csv and the short name to the focal institution's name.
+"""
+import json
+import os
+from collections import namedtuple
+
+TENANT_FILE = "tenants.json"
+
+Tenant = namedtuple("Tenant", ["key", "focal", "comparator", "peer_file", "short_name"])
+
+DEFAULT_TENANT = Tenant(
+    key="njit",
+    focal="New Jersey Institute of Technology",
+    comparator="Rutgers University-New Brunswick",
+    peer_file="peer.csv",
+    short_name="NJIT",
+)
+
+
+def load_tenants(data_dir="."):
+    """({key: Tenant}, default key), with the built-in NJIT tenant unless the config overrides it"""
+    tenants = {DEFAULT_TENANT.key: DEFAULT_TENANT}
+    default_key = DEFAULT_TENANT.key
+    try:
+        with open(os.path.join(data_dir, TENANT_FILE)) as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        return tenants, default_key
+
+    for key, entry in config.get("tenants", {}).items():
+        tenants[key] = Tenant(
+            key=key,
+            focal=entry["focal"],
+            comparator=entry.get("comparator"),
+            peer_file=entry.get("peer_file", DEFAULT_TENANT.peer_file),
+            short_name=entry.get("short_name", entry["focal"]),
+        )
+    default_key = config.get("default", default_key)
+    if default_key not in tenants:
+        raise ValueError(f"{TENANT_FILE}: default tenant {default_key!r} is not defined")
+    return tenants, default_key
+
+
+def peer_files(tenants):
+    return sorted({tenant.peer_file for tenant in tenants.values()})
@@ -0,0 +1,26 @@
+from bounded_cache import BoundedCache, cached
+
+
+def test_busy_tenant_keeps_other_tenants_entries():
+    cache = BoundedCache(budget_bytes=64 * 1024 ** 2)
+
+    @cached(max_entries=3, partition="tenant_key", cache=cache)
+    def view(tenant_key, n):
+        return (tenant_key, n)
+
+    view("quiet", 0)
+    view("quiet", 1)
+    for n in range(50):
+        view("busy", n)
+
+    misses = cache.stats().misses
+    assert view("quiet", 0) == ("quiet", 0)
+    assert view("quiet", 1) == ("quiet", 1)
+    assert cache.stats().misses == misses
+
+    # The busy tenant is held to its own cap, oldest entries first
+    assert cache.stats().entries == 2 + 3
+    view("busy", 49)
+    assert cache.stats().misses == misses
+    view("busy", 0)
+    assert cache.stats().misses == misses + 1